@@ -1,10 +1,11 @@
 # accounts/authentication.py
 from rest_framework.authentication import BaseAuthentication
 from rest_framework import exceptions
-from .models import UserToken
 from django.utils import timezone
 from django.conf import settings
 
+from .token_cache import resolve_token, schedule_purge
+
 
 class DatabaseTokenAuthentication(BaseAuthentication):
     """Authenticate using a token stored in the database.
@@ -13,23 +14,21 @@ class DatabaseTokenAuthentication(BaseAuthentication):
     `Authorization: Token <token>` (and generally will take the last
     whitespace-separated segment as the token). If no Authorization
     header is present, returns None so other auth backends can run.
+
+    Resolved tokens are cached (see accounts.token_cache), so repeat
+    requests with the same token don't query the database.
     """
 
     def authenticate(self, request):
         auth_header = request.headers.get("Authorization")
         token_value = None
 
-        print(f"[DatabaseTokenAuthentication] authenticate() called")
-        print(f"  Authorization header: {auth_header[:50] if auth_header else 'None'}...")
-
         if auth_header:
             # Accept any scheme; take the last space-separated part as the token
             parts = auth_header.split()
             if len(parts) == 0:
-                print(f"  No parts found in Authorization header")
                 return None
             token_value = parts[-1]
-            print(f"  Extracted token: {token_value[:20]}...")
         else:
             # Development-friendly fallback: allow token via query param or X-Auth-Token
             # This is only enabled when DEBUG=True to aid debugging missing/early header races.
@@ -42,28 +41,21 @@ class DatabaseTokenAuthentication(BaseAuthentication):
                 if not token_value:
                     token_value = request.headers.get('X-Auth-Token')
             else:
-                print(f"  No Authorization header and not DEBUG mode")
                 return None
 
         # If no token was provided, do not authenticate here; allow other
         # authentication backends to run or allow anonymous access for read-only endpoints.
         if not token_value:
-            print(f"  No token value found")
             return None
 
-        print(f"  Looking up token in database...")
-        try:
-            user_token = UserToken.objects.get(token=token_value)
-            print(f"  [OK] Token found! User: {user_token.user}")
-        except UserToken.DoesNotExist:
-            print(f"  [ERROR] Token not found in database")
+        resolved = resolve_token(token_value)
+        if resolved is None:
             raise exceptions.AuthenticationFailed("Invalid token")
+        user, user_token = resolved
 
         if user_token.expires_at < timezone.now():
-            # Remove expired token and reject
-            print(f"  [ERROR] Token expired")
-            user_token.delete()
+            # Expired tokens are deleted in bulk in the background
+            schedule_purge()
             raise exceptions.AuthenticationFailed("Token expired")
 
-        print(f"  [OK] Authentication successful!")
-        return (user_token.user, user_token)
+        return (user, user_token)
@@ -9,8 +9,13 @@ try:
     CELERY_AVAILABLE = True
 except ImportError:
     CELERY_AVAILABLE = False
-    # Fallback decorator if celery not installed
+    # Fallback decorator if celery not installed: `.delay()` queues the task in
+    # the database job queue (utils.jobs) for `manage.py runworker`
     def shared_task(func):
+        def delay(*args, **kwargs):
+            from utils.jobs import enqueue
+            return enqueue(func, *args, **kwargs)
+        func.delay = delay
         return func
 
 from django.contrib.auth.models import User
@@ -7,7 +7,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from django.contrib.auth import get_user_model
 from accounts.models import OTPVerification
-from accounts.email_tasks import send_otp_email
+from accounts.email_tasks import CELERY_AVAILABLE, send_otp_email
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,14 +15,16 @@ User = get_user_model()
 
 
 def send_otp_async(otp_id):
-    """Send OTP email - handles both Celery and sync execution"""
+    """Send OTP email in the background via Celery, or right away without it.
+
+    Without Celery the code is mailed in the request rather than through the
+    database job queue, so signup keeps working when no `runworker` process
+    is deployed.
+    """
     try:
-        # Check if send_otp_email is a Celery task
-        if hasattr(send_otp_email, 'delay'):
-            # Use Celery async
+        if CELERY_AVAILABLE:
             send_otp_email.delay(otp_id)
         else:
-            # Call directly (sync)
             send_otp_email(otp_id)
     except Exception as e:
         logger.error(f'Error sending OTP email: {str(e)}')
@@ -0,0 +1,29 @@
+"""
+Keep the authentication cache (accounts.token_cache) in step with tokens and
+users.
+"""
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import UserToken
+from .token_cache import forget_tokens, forget_user
+
+
+@receiver(post_delete, sender=UserToken)
+def forget_deleted_token(sender, instance, **kwargs):
+    forget_tokens(instance.token)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def forget_saved_user(sender, instance, created, **kwargs):
+    if created:
+        return
+    # set_password() leaves the raw password on the instance until save() finishes
+    forget_user(instance.pk, tokens=getattr(instance, '_password', None) is not None)
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def forget_deleted_user(sender, instance, **kwargs):
+    # Before the delete cascade detaches the user's tokens
+    forget_user(instance.pk, tokens=True)
@@ -1,3 +1,60 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.test import APIRequestFactory
+
+from .authentication import DatabaseTokenAuthentication
+from .models import UserToken
+from .token_cache import purge_expired_tokens, token_key
+
+
+class TokenAuthenticationCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username='token', email='token@e.com', password='pass', role='individual',
+        )
+        self.token = UserToken.objects.create(user=self.user, expires_at=timezone.now() + timedelta(days=1))
+
+    def authenticate(self, token=None):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token or self.token.token}')
+        return DatabaseTokenAuthentication().authenticate(request)
+
+    def test_repeat_requests_authenticate_without_queries(self):
+        self.assertEqual(self.authenticate()[0], self.user)
+        with self.assertNumQueries(0):
+            user, user_token = self.authenticate()
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user_token.pk, self.token.pk)
+
+    def test_deleted_tokens_stop_working(self):
+        self.authenticate()
+        self.token.delete()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate()
+
+    def test_password_change_drops_cached_tokens(self):
+        self.authenticate()
+        self.assertIsNotNone(cache.get(token_key(self.token.token)))
+        self.user.set_password('new-pass')
+        self.user.save()
+        self.assertIsNone(cache.get(token_key(self.token.token)))
+
+    def test_expired_tokens_are_purged_in_bulk(self):
+        expired = UserToken.objects.create(user=self.user, expires_at=timezone.now() - timedelta(minutes=1))
+        with mock.patch('accounts.token_cache.submit_task') as submit:
+            for _ in range(2):
+                with self.assertRaisesMessage(exceptions.AuthenticationFailed, 'Token expired'):
+                    self.authenticate(expired.token)
+        submit.assert_called_once_with(purge_expired_tokens)
+        self.assertTrue(UserToken.objects.filter(pk=expired.pk).exists())
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate('not-a-token')
 
-# Create your tests here.
+        self.assertEqual(purge_expired_tokens(), 1)
+        self.assertEqual(list(UserToken.objects.values_list('pk', flat=True)), [self.token.pk])
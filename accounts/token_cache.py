@@ -0,0 +1,109 @@
+"""
+Cache behind ``DatabaseTokenAuthentication``.
+
+A token resolves to its row's id, user id and expiry, cached under
+``auth:token:<sha256 of the token>`` so raw tokens never appear in cache keys,
+and the user is cached under ``auth:user:<id>``. Both live for
+``AUTH_TOKEN_CACHE_TTL`` seconds (default 60) and a token entry never outlives
+the token, so a request carrying a recently seen token authenticates without
+touching the database.
+
+Entries are dropped when a token is deleted (logout, the expired token purge)
+and when a user is saved or deleted; changing a password also drops every
+token entry of that user (see ``accounts.signals``).
+
+Expired tokens are not deleted by the request that presents them: at most
+once every ``AUTH_TOKEN_PURGE_INTERVAL`` seconds (default 3600) such a request
+schedules ``purge_expired_tokens`` on the task executor.
+"""
+import hashlib
+import logging
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from utils.executor import submit_task
+
+from .models import UserToken
+
+logger = logging.getLogger(__name__)
+
+TTL = getattr(settings, 'AUTH_TOKEN_CACHE_TTL', 60)
+PURGE_INTERVAL = getattr(settings, 'AUTH_TOKEN_PURGE_INTERVAL', 3600)
+PURGE_BATCH_SIZE = 1000
+
+
+def token_key(token_value):
+    return 'auth:token:' + hashlib.sha256(str(token_value).lower().encode()).hexdigest()
+
+
+def user_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def resolve_token(token_value):
+    """(user, UserToken) for ``token_value``, expired or not; None if unknown."""
+    entry = cache.get(token_key(token_value))
+    if entry is not None:
+        user = cache.get(user_key(entry['user_id']))
+        if user is not None:
+            user_token = UserToken(
+                id=entry['id'],
+                user_id=entry['user_id'],
+                token=token_value,
+                expires_at=datetime.fromtimestamp(entry['expires_at'], tz=dt_timezone.utc),
+            )
+            user_token.user = user
+            return user, user_token
+
+    try:
+        user_token = UserToken.objects.select_related('user').get(token=token_value)
+    except (UserToken.DoesNotExist, ValidationError, ValueError):
+        return None
+    if user_token.user is None:
+        return None
+
+    timeout = min(TTL, (user_token.expires_at - timezone.now()).total_seconds())
+    if timeout > 0:
+        cache.set(token_key(token_value), {
+            'id': user_token.id,
+            'user_id': user_token.user_id,
+            'expires_at': user_token.expires_at.timestamp(),
+        }, timeout)
+        cache.set(user_key(user_token.user_id), user_token.user, TTL)
+    return user_token.user, user_token
+
+
+def forget_tokens(*token_values):
+    cache.delete_many([token_key(value) for value in token_values])
+
+
+def forget_user(user_id, tokens=False):
+    """Drop the cached user, and with ``tokens`` every cached token of theirs."""
+    keys = [user_key(user_id)]
+    if tokens:
+        keys.extend(token_key(value) for value in UserToken.objects.filter(user_id=user_id).values_list('token', flat=True))
+    cache.delete_many(keys)
+
+
+def purge_expired_tokens(now=None):
+    """Delete expired tokens in batches. Returns the number deleted."""
+    expired = UserToken.objects.filter(expires_at__lt=now or timezone.now())
+    deleted = 0
+    while True:
+        batch = list(expired.values_list('pk', flat=True)[:PURGE_BATCH_SIZE])
+        if not batch:
+            break
+        deleted += UserToken.objects.filter(pk__in=batch).delete()[1].get(UserToken._meta.label, 0)
+    if deleted:
+        logger.info('Purged %s expired token(s)', deleted)
+    return deleted
+
+
+def schedule_purge():
+    """Queue ``purge_expired_tokens`` unless one ran within the purge interval."""
+    if cache.add('auth:purge_expired', 1, PURGE_INTERVAL):
+        submit_task(purge_expired_tokens)
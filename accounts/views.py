@@ -192,10 +192,10 @@ def login_view(request):
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def logout_view(request):
-    auth_header = request.headers.get("Authorization", "")
-    if auth_header.startswith("Token "):
-        token_value = auth_header.split(" ")[1]
-        UserToken.objects.filter(token=token_value).delete()
+    # Deleting the token also drops it from the authentication cache
+    user_token = request.auth
+    if isinstance(user_token, UserToken):
+        UserToken.objects.filter(pk=user_token.pk).delete()
     return Response({"success": True, "message": "Logged out successfully"})
 
 
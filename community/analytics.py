@@ -196,7 +196,7 @@ class CommunityAnalytics:
         # Daily campaign metrics
         daily_metrics = EngagementLog.objects.filter(
             created_at__gte=period_start,
-            metadata__has_key='campaign_id'
+            campaign__isnull=False
         ).annotate(
             date=TruncDate('created_at')
         ).values('date', 'action_type').annotate(
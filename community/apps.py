@@ -11,8 +11,29 @@ class CommunityConfig(AppConfig):
         except Exception:
             pass
         
-        # Import engagement signals for auto-logging
+        # Import engagement signals for auto-logging and wire the engagement
+        # event bus subscribers to written logs
         try:
             from . import engagement_signals  # noqa: F401
+            from . import events
+            events.connect()
+        except Exception:
+            pass
+
+        # Keep denormalized engagement counters on Post up to date
+        try:
+            from . import counter_signals  # noqa: F401
+        except Exception:
+            pass
+
+        # Keep fan-out feed timelines in sync with posts and follows
+        try:
+            from . import timeline_signals  # noqa: F401
+        except Exception:
+            pass
+
+        # Invalidate cached feed responses by bumping their versions
+        try:
+            from . import feed_cache_signals  # noqa: F401
         except Exception:
             pass
@@ -0,0 +1,154 @@
+"""
+Cached display data for the people serializers render.
+
+``AuthorSummary`` keeps one small dict per user under ``author:<user id>``
+for ``AUTHOR_SUMMARY_TTL`` seconds (default 3600)::
+
+    {'id': 7, 'name': 'Ada Obi', 'avatar': '/media/avatars/ada.png',
+     'role': None, 'verified': False,
+     'profile': {'full_name': 'Ada Obi', 'bio': '', 'country': 'NG',
+                 'company_name': '', 'industry': '', 'phone': ''}}
+
+The display name fallbacks, the avatar lookup and the binary-blob check on
+avatars all run once, when the summary is built. ``get_many`` fetches a whole
+page of authors with one cache round trip and loads the misses (with their
+profiles) in one query. Summaries are dropped on commit when the user or their
+profile is saved (see ``community.signals``).
+
+``avatar`` is stored as the stored URL or media path; serializers make
+relative paths absolute for the request.
+"""
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from .identity import profile_of, role_of, verified_of
+
+logger = logging.getLogger(__name__)
+
+PROFILE_FIELDS = ('full_name', 'bio', 'country', 'company_name', 'industry')
+
+
+def is_binary_like(value):
+    """True for raw bytes and for strings that look like an image blob."""
+    if value is None:
+        return False
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return True
+    if not isinstance(value, str):
+        return False
+    if '\u0000' in value or 'JFIF' in value or 'ICC_PROFILE' in value:
+        return True
+    non_print = sum(1 for ch in value if ord(ch) < 32 or ord(ch) > 126)
+    return non_print / max(1, len(value)) > 0.3
+
+
+def related_user(obj, field):
+    """The user on ``obj.<field>`` if it is already loaded, else its id."""
+    if getattr(type(obj), field).is_cached(obj):
+        return getattr(obj, field)
+    return getattr(obj, f'{field}_id')
+
+
+class AuthorSummary:
+    """Per-user name, avatar, role and verified badge."""
+
+    TTL = getattr(settings, 'AUTHOR_SUMMARY_TTL', 3600)
+
+    @staticmethod
+    def cache_key(user_id):
+        return f'author:{user_id}'
+
+    @classmethod
+    def get(cls, user):
+        """Summary of ``user`` (an instance or an id), or None if there's no such user."""
+        if user is None:
+            return None
+        return cls.get_many([user]).get(getattr(user, 'pk', user))
+
+    @classmethod
+    def get_many(cls, users):
+        """``{user id: summary}`` for users given as instances or ids."""
+        by_id = {getattr(user, 'pk', user): user for user in users if user is not None}
+        if not by_id:
+            return {}
+
+        keys = {cls.cache_key(user_id): user_id for user_id in by_id}
+        try:
+            cached = cache.get_many(list(keys))
+        except Exception:
+            logger.warning('Could not read author summaries', exc_info=True)
+            cached = {}
+        summaries = {keys[key]: summary for key, summary in cached.items()}
+
+        missing = [user_id for user_id in by_id if user_id not in summaries]
+        if not missing:
+            return summaries
+
+        loaded = {user_id: by_id[user_id] for user_id in missing if hasattr(by_id[user_id], 'pk')}
+        to_fetch = [user_id for user_id in missing if user_id not in loaded]
+        if to_fetch:
+            loaded.update(get_user_model().objects.filter(pk__in=to_fetch).select_related('profile').in_bulk())
+
+        built = {user_id: cls.build(user) for user_id, user in loaded.items()}
+        try:
+            cache.set_many({cls.cache_key(user_id): summary for user_id, summary in built.items()}, cls.TTL)
+        except Exception:
+            logger.warning('Could not store author summaries', exc_info=True)
+        summaries.update(built)
+        return summaries
+
+    @classmethod
+    def forget(cls, *user_ids):
+        keys = [cls.cache_key(user_id) for user_id in set(user_ids) if user_id]
+        if keys:
+            cache.delete_many(keys)
+
+    @classmethod
+    def build(cls, user):
+        profile = profile_of(user)
+        summary = {
+            'id': user.pk,
+            'name': cls._display_name(user, profile),
+            'avatar': cls._avatar(user, profile),
+            'role': role_of(user),
+            'verified': bool(verified_of(user)),
+            'profile': None,
+        }
+        if profile is not None:
+            summary['profile'] = {field: getattr(profile, field, '') or '' for field in PROFILE_FIELDS}
+            summary['profile']['phone'] = getattr(profile, 'phone', '') or getattr(profile, 'contact_phone', '') or ''
+        return summary
+
+    @staticmethod
+    def _display_name(user, profile):
+        if profile is not None:
+            full = getattr(profile, 'full_name', None) or getattr(profile, 'name', None)
+            if full:
+                return full
+        full = getattr(user, 'full_name', None)
+        if full:
+            return full
+        first = getattr(user, 'first_name', '')
+        last = getattr(user, 'last_name', '')
+        if first or last:
+            return f"{first} {last}".strip()
+        return getattr(user, 'username', None) or getattr(user, 'email', None) or str(user)
+
+    @staticmethod
+    def _avatar(user, profile):
+        avatar = None
+        if profile is not None:
+            avatar = getattr(profile, 'avatar_url', None) or getattr(profile, 'avatar', None)
+        if not avatar:
+            avatar = getattr(user, 'avatar_url', None) or getattr(user, 'avatar', None)
+        if avatar and not isinstance(avatar, str):
+            try:
+                avatar = avatar.url
+            except Exception:
+                avatar = None
+        if not avatar or is_binary_like(avatar):
+            return None
+        return avatar
@@ -0,0 +1,69 @@
+"""
+Signal handlers that keep the denormalized counters on ``Post`` in step with
+reactions, comments, bookmarks and mentions.
+"""
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import PostReaction, Comment, PostBookmark
+from .engagement import MentionLog
+from .counters import adjust_counters, adjust_reaction
+
+
+@receiver(pre_save, sender=PostReaction)
+def remember_previous_reaction(sender, instance, **kwargs):
+    """Record the stored reaction type so a type switch can move the breakdown."""
+    instance._previous_reaction_type = None
+    if instance.pk and not instance._state.adding:
+        instance._previous_reaction_type = (
+            PostReaction.objects.filter(pk=instance.pk).values_list('reaction_type', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=PostReaction)
+def count_reaction_saved(sender, instance, created, **kwargs):
+    if created:
+        adjust_reaction(instance.post_id, instance.reaction_type, 1)
+        return
+    previous = getattr(instance, '_previous_reaction_type', None)
+    if previous and previous != instance.reaction_type:
+        adjust_reaction(instance.post_id, previous, -1)
+        adjust_reaction(instance.post_id, instance.reaction_type, 1)
+
+
+@receiver(post_delete, sender=PostReaction)
+def count_reaction_deleted(sender, instance, **kwargs):
+    adjust_reaction(instance.post_id, instance.reaction_type, -1)
+
+
+@receiver(post_save, sender=Comment)
+def count_comment_saved(sender, instance, created, **kwargs):
+    if created:
+        adjust_counters(instance.post_id, comments_count=1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_comment_deleted(sender, instance, **kwargs):
+    adjust_counters(instance.post_id, comments_count=-1)
+
+
+@receiver(post_save, sender=PostBookmark)
+def count_bookmark_saved(sender, instance, created, **kwargs):
+    if created:
+        adjust_counters(instance.post_id, bookmarks_count=1)
+
+
+@receiver(post_delete, sender=PostBookmark)
+def count_bookmark_deleted(sender, instance, **kwargs):
+    adjust_counters(instance.post_id, bookmarks_count=-1)
+
+
+@receiver(post_save, sender=MentionLog)
+def count_mention_saved(sender, instance, created, **kwargs):
+    if created:
+        adjust_counters(instance.post_id, mentions_count=1)
+
+
+@receiver(post_delete, sender=MentionLog)
+def count_mention_deleted(sender, instance, **kwargs):
+    adjust_counters(instance.post_id, mentions_count=-1)
@@ -0,0 +1,127 @@
+"""
+Denormalized engagement counters for community posts.
+
+Reactions, comments, bookmarks and mentions are counted once, on write, into
+columns on ``Post`` so the feed ranker and serializers never have to run
+COUNT queries per post. Increments use ``F()`` expressions so concurrent
+writers don't lose updates; the per-type reaction breakdown is a JSON column
+and is updated under a row lock.
+
+``reconcile_post_counters`` recomputes everything from the related tables and
+repairs any drift (bulk ``QuerySet.update`` calls, raw SQL, crashes between
+the write and the counter update).
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, IntegerField, Value
+from django.db.models.functions import Coalesce, Greatest
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = ('reactions_count', 'comments_count', 'bookmarks_count', 'mentions_count')
+
+
+def adjust_counters(post_id, **deltas):
+    """Atomically add ``deltas`` (e.g. ``comments_count=1``) to a post's counters."""
+    from .models import Post
+
+    updates = {
+        field: Greatest(F(field) + delta, Value(0))
+        for field, delta in deltas.items()
+        if delta
+    }
+    if post_id and updates:
+        Post.objects.filter(pk=post_id).update(**updates)
+
+
+def adjust_reaction(post_id, reaction_type, delta):
+    """Move the total and per-type reaction counters of a post by ``delta``."""
+    from .models import Post
+
+    if not post_id or not reaction_type or not delta:
+        return
+    with transaction.atomic():
+        post = Post.objects.select_for_update().filter(pk=post_id).only('id', 'reaction_breakdown').first()
+        if post is None:
+            return
+        breakdown = dict(post.reaction_breakdown or {})
+        count = max(int(breakdown.get(reaction_type, 0)) + delta, 0)
+        if count:
+            breakdown[reaction_type] = count
+        else:
+            breakdown.pop(reaction_type, None)
+        Post.objects.filter(pk=post_id).update(
+            reaction_breakdown=breakdown,
+            reactions_count=Greatest(F('reactions_count') + delta, Value(0)),
+        )
+
+
+def _count_subquery(model, **filters):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(post=OuterRef('pk'), **filters)
+            .order_by()
+            .values('post')
+            .annotate(c=Count('pk'))
+            .values('c'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def reconcile_post_counters(queryset=None, batch_size=500, dry_run=False):
+    """Recompute the counters for ``queryset`` (all posts by default).
+
+    Returns the number of posts whose stored counters had drifted.
+    """
+    from .models import Post, PostReaction, Comment, PostBookmark
+    from .engagement import MentionLog
+
+    if queryset is None:
+        queryset = Post.objects.all()
+
+    annotated = queryset.order_by('pk').annotate(
+        actual_reactions=_count_subquery(PostReaction),
+        actual_comments=_count_subquery(Comment),
+        actual_bookmarks=_count_subquery(PostBookmark),
+        actual_mentions=_count_subquery(MentionLog),
+    ).only('id', 'reaction_breakdown', *COUNTER_FIELDS)
+
+    repaired = 0
+    batch = []
+    for post in annotated.iterator(chunk_size=batch_size):
+        breakdown = {}
+        if post.actual_reactions:
+            rows = PostReaction.objects.filter(post_id=post.pk).values('reaction_type').order_by().annotate(c=Count('pk'))
+            breakdown = {row['reaction_type']: row['c'] for row in rows}
+
+        if (
+            post.reactions_count == post.actual_reactions
+            and post.comments_count == post.actual_comments
+            and post.bookmarks_count == post.actual_bookmarks
+            and post.mentions_count == post.actual_mentions
+            and (post.reaction_breakdown or {}) == breakdown
+        ):
+            continue
+
+        repaired += 1
+        post.reactions_count = post.actual_reactions
+        post.comments_count = post.actual_comments
+        post.bookmarks_count = post.actual_bookmarks
+        post.mentions_count = post.actual_mentions
+        post.reaction_breakdown = breakdown
+        batch.append(post)
+
+        if len(batch) >= batch_size:
+            if not dry_run:
+                Post.objects.bulk_update(batch, ['reaction_breakdown', *COUNTER_FIELDS])
+            batch = []
+
+    if batch and not dry_run:
+        Post.objects.bulk_update(batch, ['reaction_breakdown', *COUNTER_FIELDS])
+
+    if repaired:
+        logger.info('Reconciled engagement counters on %s posts', repaired)
+    return repaired
@@ -0,0 +1,133 @@
+"""
+Coalescing queue of posts whose ranking needs recomputing.
+
+Views, reactions and comments only record the post id here. A background
+flusher drains the queue every ``COMMUNITY_RANKING_FLUSH_INTERVAL`` seconds
+(default 30) and re-ranks the whole set in one batch, so a post is re-scored
+at most once per interval however many times it was touched.
+
+The queue is a Redis set when Redis is configured for community ranking
+(shared by all worker processes), otherwise a process-local set.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = getattr(settings, 'COMMUNITY_RANKING_FLUSH_INTERVAL', 30)
+DRAIN_CHUNK = 1000
+
+
+class DirtyIdQueue:
+    """Coalescing set of ids drained periodically by a background thread.
+
+    ``process(ids)`` handles a drained batch and returns how many ids it
+    handled. The flusher thread is started by the first ``mark`` in a
+    process, so importing the queue never spawns it.
+    """
+
+    def __init__(self, process, name='dirty-id', client=None, key='community:dirty_ids', interval=FLUSH_INTERVAL):
+        self.process = process
+        self.name = name
+        self.client = client
+        self.key = key
+        self.interval = interval
+        self._ids = set()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def mark(self, item_id):
+        """Record that ``item_id`` needs processing."""
+        if not item_id:
+            return
+        try:
+            if self.client is not None:
+                self.client.sadd(self.key, int(item_id))
+            else:
+                with self._lock:
+                    self._ids.add(int(item_id))
+        except Exception:
+            logger.warning('Could not queue %s for %s', item_id, self.name, exc_info=True)
+            return
+        self._ensure_worker()
+
+    def drain(self):
+        """Remove and return every queued id."""
+        if self.client is not None:
+            ids = set()
+            while True:
+                chunk = self.client.spop(self.key, DRAIN_CHUNK)
+                if not chunk:
+                    break
+                ids.update(int(member) for member in chunk)
+            return ids
+        with self._lock:
+            ids, self._ids = self._ids, set()
+        return ids
+
+    def pending(self):
+        if self.client is not None:
+            return int(self.client.scard(self.key))
+        return len(self._ids)
+
+    def flush(self):
+        """Process every queued id once. Returns the number processed."""
+        ids = self.drain()
+        if not ids:
+            return 0
+        try:
+            return self.process(ids)
+        except Exception:
+            logger.exception('%s flush of %s ids failed; re-queueing', self.name, len(ids))
+            for item_id in ids:
+                self.mark(item_id)
+            return 0
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name=f'{self.name}-flusher', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        from django.db import close_old_connections
+
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+def rerank_dirty_posts(ids):
+    """Re-rank the queued posts in one batch."""
+    from .feed import FeedRanker
+
+    return FeedRanker.rerank_posts(ids)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_dirty_post_queue():
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                from .ranking_index import get_redis_client
+                _queue = DirtyIdQueue(
+                    rerank_dirty_posts, name='dirty-post', client=get_redis_client(), key='community:dirty_posts',
+                )
+    return _queue
+
+
+def mark_post_dirty(post_id):
+    get_dirty_post_queue().mark(post_id)
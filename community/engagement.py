@@ -90,7 +90,8 @@ class CommunityEngagementLog(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        ordering = ['-created_at']
+        # No default ordering: analytics scans are date-bounded aggregates
+        # (see utils.log_archive.bounded); listings order explicitly
         indexes = [
             models.Index(fields=['user', '-created_at']),
             models.Index(fields=['action_type', '-created_at']),
@@ -134,16 +135,42 @@ class CommunityEngagementLog(models.Model):
             metadata=metadata
         )
         
-        # Clear related caches
-        if post:
-            cache.delete(f'post_engagement:{post.id}')
-        if comment:
-            cache.delete(f'comment_engagement:{comment.id}')
-        if user:
-            cache.delete(f'user_activity:{user.id}')
+        # Same hook the bulk ingestion pipeline fires; the engagement bus
+        # subscribers (cache invalidation, ranking, reputation, notifications)
+        # run from it
+        from utils.ingestion import rows_ingested
+        rows_ingested.send(sender=cls, instances=[log])
         
         return log
     
+    @classmethod
+    def enqueue(cls, user, action_type, post=None, comment=None, group=None,
+                mentioned_user=None, metadata=None, on_saved=None, needs_pk=False):
+        """
+        Log an engagement action through the buffered ingestion pipeline.
+
+        Same arguments as ``log_engagement`` but the row is written in a bulk
+        insert shortly after the request instead of inside it. ``on_saved`` is
+        called with the saved log once it has a primary key; ``needs_pk``
+        makes sure the log reaches ``rows_ingested`` receivers with one.
+
+        Returns:
+            The (not yet saved) CommunityEngagementLog instance
+        """
+        from utils.ingestion import ingest_pipeline
+
+        log = cls(
+            user=user,
+            action_type=action_type,
+            post=post,
+            comment=comment,
+            group=group,
+            mentioned_user=mentioned_user,
+            metadata=metadata or {},
+        )
+        ingest_pipeline.submit(log, on_saved=on_saved, needs_pk=needs_pk)
+        return log
+
     @classmethod
     def get_user_engagement_metrics(cls, user, days=30):
         """
@@ -384,45 +411,14 @@ class UserReputation(models.Model):
     
     def update_reputation(self):
         """
-        Recalculate reputation score and activity level.
+        Recalculate reputation score and activity level from the daily
+        action buckets (see ``community.reputation``).
         """
-        from django.db.models import Count, Q
-        
-        # Get engagement metrics from last 30 days
-        logs = CommunityEngagementLog.objects.filter(
-            user=self.user,
-            created_at__gte=timezone.now() - timedelta(days=30)
-        )
-        
-        # Calculate score components
-        like_score = logs.filter(action_type__in=['like_post', 'like_comment']).count() * 1
-        comment_score = logs.filter(action_type__in=['comment_post', 'reply_comment']).count() * 5
-        mention_score = logs.filter(action_type='mention_user').count() * 10
-        group_score = logs.filter(action_type='join_group').count() * 3
-        share_score = logs.filter(action_type='share_post').count() * 7
+        from .reputation import refresh_reputations
         
-        self.reputation_score = like_score + comment_score + mention_score + group_score + share_score
-        
-        # Determine activity level based on action count
-        action_count = logs.count()
-        if action_count == 0:
-            self.activity_level = 'inactive'
-        elif action_count < 10:
-            self.activity_level = 'novice'
-        elif action_count < 50:
-            self.activity_level = 'active'
-        elif action_count < 200:
-            self.activity_level = 'power_user'
-        else:
-            self.activity_level = 'community_leader'
-        
-        # Award badges based on achievements
-        self.badges = self._calculate_badges()
-        
-        self.save(update_fields=['reputation_score', 'activity_level', 'badges', 'updated_at'])
-        
-        # Clear cache
-        cache.delete(f'user_reputation:{self.user.id}')
+        refresh_reputations([self.user_id])
+        self.refresh_from_db(fields=['reputation_score', 'activity_level', 'badges',
+                                     'total_engagement_actions', 'updated_at'])
     
     def _calculate_badges(self):
         """
@@ -456,6 +452,35 @@ class UserReputation(models.Model):
         return list(set(badges))  # Remove duplicates
 
 
+class UserActionBucket(models.Model):
+    """
+    Per-user, per-action daily engagement counts.
+    
+    Incremented as engagement events are written and read by the reputation
+    scorer (see ``community.reputation``), so a recompute costs a handful of
+    rows per action instead of a scan of the user's raw logs. Buckets older
+    than the scoring window are pruned.
+    """
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='action_buckets'
+    )
+    day = models.DateField()
+    action_type = models.CharField(max_length=32)
+    count = models.IntegerField(default=0)
+    
+    class Meta:
+        unique_together = ('user', 'day', 'action_type')
+        indexes = [
+            models.Index(fields=['day']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} {self.day} {self.action_type}: {self.count}"
+
+
 class EngagementNotification(models.Model):
     """
     Tracks engagement notifications sent to users.
@@ -1,19 +1,21 @@
 """
 Signal handlers for engagement logging.
 
-Automatically logs engagement actions when:
+Automatically emits one engagement event (see ``community.events``) when:
 - PostReaction objects are created/deleted
 - Comment objects are created
 - CommentReaction objects are created/deleted
 - Users are mentioned
 - Group memberships are created/deleted
+
+Ranking, reputation, notifications and cache invalidation are subscribers of
+the event bus and run once the event has been written.
 """
 
-from django.db.models.signals import post_save, post_delete, pre_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.utils import timezone
-from .engagement import CommunityEngagementLog, MentionLog, UserReputation, EngagementNotification
-from .notification_service import NotificationService
+from .engagement import MentionLog, UserReputation
+from .events import emit_engagement
 
 
 @receiver(post_save, sender='community.PostReaction')
@@ -22,33 +24,14 @@ def log_post_like(sender, instance, created, **kwargs):
     Log when a user likes a post.
     """
     if created:
-        # Log the like action
-        CommunityEngagementLog.log_engagement(
-            user=instance.user,
-            action_type='like_post',
+        emit_engagement(
+            instance.user,
+            'like_post',
             post=instance.post,
             metadata={
                 'reaction_type': instance.reaction_type,
-            }
+            },
         )
-        
-        # Update post's ranking
-        instance.post.update_ranking()
-        
-        # Send notification to post author
-        if instance.post.author and instance.post.author != instance.user:
-            engagement_log = CommunityEngagementLog.objects.filter(
-                user=instance.user,
-                action_type='like_post',
-                post=instance.post
-            ).latest('created_at')
-            
-            EngagementNotification.create_and_notify(
-                notification_type='post_liked',
-                user=instance.post.author,
-                triggered_by=instance.user,
-                engagement_log=engagement_log
-            )
 
 
 @receiver(post_delete, sender='community.PostReaction')
@@ -56,14 +39,7 @@ def log_post_unlike(sender, instance, **kwargs):
     """
     Log when a user unlikes a post.
     """
-    CommunityEngagementLog.log_engagement(
-        user=instance.user,
-        action_type='unlike_post',
-        post=instance.post,
-    )
-    
-    # Update post's ranking
-    instance.post.update_ranking()
+    emit_engagement(instance.user, 'unlike_post', post=instance.post)
 
 
 @receiver(post_save, sender='community.Comment')
@@ -80,60 +56,29 @@ def log_comment_post(sender, instance, created, **kwargs):
         else:
             action_type = 'comment_post'
         
-        engagement_log = CommunityEngagementLog.log_engagement(
-            user=instance.author,
-            action_type=action_type,
+        emit_engagement(
+            instance.author,
+            action_type,
             post=instance.post,
             comment=instance,
             metadata={
                 'content_preview': instance.content[:100],
-            }
+            },
         )
         
-        # Update post's ranking
-        instance.post.update_ranking()
-        
-        # Extract and log mentions
+        # Extract and log mentions (the mentioned users are notified by the bus)
         mentions = MentionLog.create_from_text(
             instance.content,
             comment=instance,
             mentioned_by=instance.author
         )
-        
-        # Send notifications for mentions
         for mention in mentions:
-            CommunityEngagementLog.log_engagement(
-                user=instance.author,
-                action_type='mention_user',
+            emit_engagement(
+                instance.author,
+                'mention_user',
                 comment=instance,
                 mentioned_user=mention.mentioned_user,
             )
-            
-            # Notify mentioned user
-            EngagementNotification.create_and_notify(
-                notification_type='comment_mentioned',
-                user=mention.mentioned_user,
-                triggered_by=instance.author,
-                engagement_log=engagement_log
-            )
-        
-        # Notify post author (if not replying to their own comment)
-        if instance.post.author and instance.post.author != instance.author:
-            EngagementNotification.create_and_notify(
-                notification_type='post_commented',
-                user=instance.post.author,
-                triggered_by=instance.author,
-                engagement_log=engagement_log
-            )
-        
-        # Notify parent comment author if this is a reply
-        if instance.parent_comment and instance.parent_comment.author != instance.author:
-            EngagementNotification.create_and_notify(
-                notification_type='comment_replied',
-                user=instance.parent_comment.author,
-                triggered_by=instance.author,
-                engagement_log=engagement_log
-            )
 
 
 @receiver(post_save, sender='community.CommentReaction')
@@ -142,33 +87,14 @@ def log_comment_like(sender, instance, created, **kwargs):
     Log when a user likes a comment.
     """
     if created:
-        # Log the like action
-        CommunityEngagementLog.log_engagement(
-            user=instance.user,
-            action_type='like_comment',
+        emit_engagement(
+            instance.user,
+            'like_comment',
             comment=instance.comment,
             metadata={
-                'post_id': instance.comment.post.id,
-            }
+                'post_id': instance.comment.post_id,
+            },
         )
-        
-        # Update post's ranking (comment engagement affects post ranking)
-        instance.comment.post.update_ranking()
-        
-        # Send notification to comment author
-        if instance.comment.author and instance.comment.author != instance.user:
-            engagement_log = CommunityEngagementLog.objects.filter(
-                user=instance.user,
-                action_type='like_comment',
-                comment=instance.comment
-            ).latest('created_at')
-            
-            EngagementNotification.create_and_notify(
-                notification_type='comment_liked',
-                user=instance.comment.author,
-                triggered_by=instance.user,
-                engagement_log=engagement_log
-            )
 
 
 @receiver(post_delete, sender='community.CommentReaction')
@@ -176,14 +102,7 @@ def log_comment_unlike(sender, instance, **kwargs):
     """
     Log when a user unlikes a comment.
     """
-    CommunityEngagementLog.log_engagement(
-        user=instance.user,
-        action_type='unlike_comment',
-        comment=instance.comment,
-    )
-    
-    # Update post's ranking
-    instance.comment.post.update_ranking()
+    emit_engagement(instance.user, 'unlike_comment', comment=instance.comment)
 
 
 @receiver(post_save, sender='community.GroupMembership')
@@ -192,13 +111,13 @@ def log_group_join(sender, instance, created, **kwargs):
     Log when a user joins a group.
     """
     if created:
-        CommunityEngagementLog.log_engagement(
-            user=instance.user,
-            action_type='join_group',
+        emit_engagement(
+            instance.user,
+            'join_group',
             group=instance.group,
             metadata={
                 'group_name': instance.group.name,
-            }
+            },
         )
 
 
@@ -207,13 +126,13 @@ def log_group_leave(sender, instance, **kwargs):
     """
     Log when a user leaves a group.
     """
-    CommunityEngagementLog.log_engagement(
-        user=instance.user,
-        action_type='leave_group',
+    emit_engagement(
+        instance.user,
+        'leave_group',
         group=instance.group,
         metadata={
             'group_name': instance.group.name,
-        }
+        },
     )
 
 
@@ -226,25 +145,6 @@ def create_user_reputation(sender, instance, created, **kwargs):
         UserReputation.objects.get_or_create(user=instance)
 
 
-@receiver(post_save, sender='community.CommunityEngagementLog')
-def update_user_reputation(sender, instance, created, **kwargs):
-    """
-    Update user reputation when engagement happens.
-    
-    Runs periodically (could be async with Celery for performance).
-    """
-    if created and instance.user:
-        try:
-            reputation = UserReputation.objects.get(user=instance.user)
-            
-            # Update reputation every 10 engagements to avoid excessive updates
-            if instance.user.engagement_logs.count() % 10 == 0:
-                reputation.update_reputation()
-        except UserReputation.DoesNotExist:
-            # Create if doesn't exist
-            UserReputation.objects.create(user=instance.user)
-
-
 def connect_engagement_signals():
     """
     Connect all engagement signals.
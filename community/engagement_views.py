@@ -19,6 +19,7 @@ from django.utils import timezone
 from datetime import timedelta
 from .engagement import CommunityEngagementLog, UserReputation, EngagementNotification, MentionLog
 from .models import Post, Comment
+from utils.log_archive import bounded, retained_since
 from .engagement_serializers import (
     EngagementLogSerializer,
     EngagementMetricsSerializer,
@@ -44,7 +45,7 @@ class EngagementAnalyticsViewSet(viewsets.ModelViewSet):
     """
     
     permission_classes = [IsAuthenticated]
-    queryset = CommunityEngagementLog.objects.all()
+    queryset = CommunityEngagementLog.objects.order_by('-created_at')
     serializer_class = EngagementLogSerializer
     
     @action(detail=False, methods=['get'])
@@ -315,8 +316,9 @@ class EngagementAnalyticsViewSet(viewsets.ModelViewSet):
         days = int(request.query_params.get('days', 30))
         start_date = timezone.now() - timedelta(days=days)
         
-        # Get all engagement metrics
-        all_logs = CommunityEngagementLog.objects.filter(created_at__gte=start_date)
+        # Get all engagement metrics; archived months are no longer in the log table
+        counted_from = retained_since(CommunityEngagementLog, start_date)
+        all_logs = bounded(CommunityEngagementLog, counted_from)
         
         stats = {
             'total_engagements': all_logs.count(),
@@ -326,6 +328,8 @@ class EngagementAnalyticsViewSet(viewsets.ModelViewSet):
             'mentions': all_logs.filter(action_type='mention_user').count(),
             'group_activity': all_logs.filter(action_type__in=['join_group', 'leave_group']).count(),
             'period_days': days,
+            'counted_from': counted_from,
+            'range_truncated': counted_from > start_date,
         }
         
         return Response(stats)
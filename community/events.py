@@ -0,0 +1,205 @@
+"""
+Engagement event bus.
+
+Every engagement action (like, comment, mention, bookmark, group join, ...)
+is emitted exactly once with ``emit_engagement``. The single write is the
+``CommunityEngagementLog`` row, inserted in bulk by the ingestion pipeline;
+once a batch of rows is saved the bus hands it to each subscriber:
+
+- ``analytics``: invalidates the cached engagement summaries
+- ``ranking``: queues the touched posts for background re-ranking
+- ``reputation``: updates daily action buckets and queues the users for re-scoring
+- ``notifications``: notifies the author / mentioned user
+
+Subscribers take a list of saved logs. The set is configurable with the
+``COMMUNITY_ENGAGEMENT_SUBSCRIBERS`` setting (a mapping of name to dotted
+path) and can be changed at runtime with ``engagement_bus.subscribe`` /
+``unsubscribe``. A failing subscriber is logged and never affects the
+others or the write.
+"""
+import logging
+import threading
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+from utils.ingestion import rows_ingested
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUBSCRIBERS = {
+    'analytics': 'community.events.invalidate_engagement_caches',
+    'ranking': 'community.events.queue_posts_for_reranking',
+    'reputation': 'community.events.refresh_reputation',
+    'notifications': 'community.events.send_engagement_notifications',
+}
+
+
+class EngagementEventBus:
+    def __init__(self, subscribers=None):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._configured = subscribers is not None
+        for name, handler in (subscribers or {}).items():
+            self.subscribe(name, handler)
+
+    def _load_configured(self):
+        if self._configured:
+            return
+        with self._lock:
+            if self._configured:
+                return
+            paths = getattr(settings, 'COMMUNITY_ENGAGEMENT_SUBSCRIBERS', DEFAULT_SUBSCRIBERS)
+            for name, path in paths.items():
+                try:
+                    self._subscribers.setdefault(name, import_string(path))
+                except ImportError:
+                    logger.exception('Could not load engagement subscriber %s (%s)', name, path)
+            self._configured = True
+
+    def subscribe(self, name, handler):
+        """Register ``handler(events)`` under ``name``, replacing any previous one."""
+        if isinstance(handler, str):
+            handler = import_string(handler)
+        with self._lock:
+            self._subscribers[name] = handler
+
+    def unsubscribe(self, name):
+        with self._lock:
+            self._subscribers.pop(name, None)
+
+    def subscribers(self):
+        self._load_configured()
+        with self._lock:
+            return dict(self._subscribers)
+
+    def emit(self, user, action_type, post=None, comment=None, group=None,
+             mentioned_user=None, metadata=None):
+        """Record one engagement action. Returns the (possibly unsaved) log."""
+        from .engagement import CommunityEngagementLog
+
+        return CommunityEngagementLog.enqueue(
+            # Notifications point at the log, so it must arrive with its key
+            needs_pk=action_type in NOTIFIED_ACTIONS,
+            user=user,
+            action_type=action_type,
+            post=post,
+            comment=comment,
+            group=group,
+            mentioned_user=mentioned_user,
+            metadata=metadata,
+        )
+
+    def dispatch(self, events):
+        """Hand a batch of saved logs to every subscriber."""
+        if not events:
+            return
+        for name, handler in self.subscribers().items():
+            try:
+                handler(events)
+            except Exception:
+                logger.exception('Engagement subscriber %s failed on %s events', name, len(events))
+
+
+engagement_bus = EngagementEventBus()
+
+
+def emit_engagement(user, action_type, **kwargs):
+    return engagement_bus.emit(user, action_type, **kwargs)
+
+
+def _dispatch_saved_logs(sender, instances, **kwargs):
+    engagement_bus.dispatch(instances)
+
+
+def connect():
+    from .engagement import CommunityEngagementLog
+    rows_ingested.connect(_dispatch_saved_logs, sender=CommunityEngagementLog,
+                          dispatch_uid='community.engagement_bus')
+
+
+# ----------------------------------------------------------------------
+# Built-in subscribers
+# ----------------------------------------------------------------------
+def _post_id(log):
+    if log.post_id:
+        return log.post_id
+    if log.comment_id and log.comment is not None:
+        return log.comment.post_id
+    return None
+
+
+def invalidate_engagement_caches(events):
+    keys = set()
+    for log in events:
+        if log.post_id:
+            keys.add(f'post_engagement:{log.post_id}')
+        if log.comment_id:
+            keys.add(f'comment_engagement:{log.comment_id}')
+        if log.user_id:
+            keys.add(f'user_activity:{log.user_id}')
+    if keys:
+        cache.delete_many(list(keys))
+
+
+RANKED_ACTIONS = {
+    'like_post', 'unlike_post', 'comment_post', 'reply_comment',
+    'like_comment', 'unlike_comment', 'share_post', 'bookmark_post', 'unbookmark_post',
+}
+
+
+def queue_posts_for_reranking(events):
+    from .dirty_posts import mark_post_dirty
+
+    for post_id in {_post_id(log) for log in events if log.action_type in RANKED_ACTIONS}:
+        if post_id:
+            mark_post_dirty(post_id)
+
+
+def refresh_reputation(events):
+    """Add the events to the users' daily action buckets; the users are
+    re-scored in a batch by the dirty-user flusher (``community.reputation``)."""
+    from .reputation import record_actions
+
+    record_actions(events)
+
+
+NOTIFIED_ACTIONS = {'like_post', 'like_comment', 'comment_post', 'reply_comment', 'mention_user'}
+
+
+def _notifications_for(log):
+    """Yield ``(notification_type, recipient)`` pairs for one engagement log."""
+    if log.action_type == 'like_post' and log.post is not None:
+        yield 'post_liked', log.post.author
+    elif log.action_type == 'like_comment' and log.comment is not None:
+        yield 'comment_liked', log.comment.author
+    elif log.action_type in ('comment_post', 'reply_comment') and log.comment is not None:
+        post = log.post or log.comment.post
+        yield 'post_commented', post.author
+        parent = log.comment.parent_comment
+        if parent is not None:
+            yield 'comment_replied', parent.author
+    elif log.action_type == 'mention_user' and log.comment_id and log.mentioned_user is not None:
+        yield 'comment_mentioned', log.mentioned_user
+
+
+def send_engagement_notifications(events):
+    from .engagement import EngagementNotification
+
+    for log in events:
+        if log.pk is None:
+            if log.action_type in NOTIFIED_ACTIONS:
+                logger.warning('Skipping notifications for unsaved %s log', log.action_type)
+            continue
+        for notification_type, recipient in _notifications_for(log):
+            if recipient is None or recipient.pk == log.user_id:
+                continue
+            try:
+                EngagementNotification.create_and_notify(
+                    notification_type=notification_type,
+                    user=recipient,
+                    triggered_by=log.user,
+                    engagement_log=log,
+                )
+            except Exception:
+                logger.exception('Could not send %s notification for log %s', notification_type, log.pk)
@@ -3,16 +3,19 @@ from django.utils import timezone
 from datetime import timedelta
 import math
 
+from .visibility import ViewerSnapshot
+
+
 class FeedRanker:
     """Feed ranking algorithm manager."""
     
     @staticmethod
     def calculate_engagement_score(post):
         """Calculate an engagement score for a post based on reactions, comments, etc."""
-        # Get counts
-        reactions_count = post.reactions.count()
-        comments_count = post.comments.count()
-        bookmarks_count = post.bookmarks.count()
+        # Read the denormalized counters maintained on the post
+        reactions_count = post.reactions_count
+        comments_count = post.comments_count
+        bookmarks_count = post.bookmarks_count
         
         # Weight different types of engagement
         WEIGHTS = {
@@ -31,9 +34,9 @@ class FeedRanker:
         return score
 
     @staticmethod
-    def calculate_time_decay(post_date):
-        """Calculate time decay factor based on post age."""
-        now = timezone.now()
+    def calculate_time_decay(post_date, now=None):
+        """Calculate time decay factor based on post age at ``now`` (default: the current time)."""
+        now = now or timezone.now()
         age = now - post_date
         
         # Parameters for decay function
@@ -71,6 +74,87 @@ class FeedRanker:
             pass
         return 1.0
 
+    @classmethod
+    def calculate_ranking_score(cls, post, now=None):
+        """Return ``(engagement_score, ranking_score)`` for a post.
+
+        Only reads the post's denormalized counters and already-loaded
+        author/campaign relations, so it can be applied to whole batches.
+        """
+        engagement = cls.calculate_engagement_score(post)
+        time_decay = cls.calculate_time_decay(post.created_at, now=now)
+        return engagement, engagement * time_decay * cls.calculate_role_boost(post) * cls.calculate_sponsored_boost(post)
+
+    @classmethod
+    def rerank_recent(cls, since=None, batch_size=500, now=None):
+        """Re-score posts created or active since ``since`` (default: 7 days)."""
+        from .models import Post
+
+        now = now or timezone.now()
+        since = since or now - timedelta(days=7)
+        queryset = Post.objects.filter(Q(created_at__gte=since) | Q(last_activity_at__gte=since))
+        return cls.rerank_queryset(queryset, batch_size=batch_size, now=now)
+
+    @classmethod
+    def retire_stale(cls, since, batch_size=500):
+        """Zero the score of posts that are neither new nor active since ``since``.
+
+        ``rerank_recent`` stops re-scoring a post once it leaves the window, so
+        its stored score would otherwise stay frozen part-way through its decay
+        and keep outranking fresher posts. Returns the number of posts retired.
+        """
+        from .models import Post
+        from .ranking_index import get_ranking_index
+
+        stale = Post.objects.filter(created_at__lt=since, last_activity_at__lt=since).exclude(ranking_score=0).order_by()
+        index = get_ranking_index()
+        total = 0
+        while True:
+            post_ids = list(stale.values_list('pk', flat=True)[:batch_size])
+            if not post_ids:
+                break
+            total += Post.objects.filter(pk__in=post_ids).update(ranking_score=0)
+            for post_id in post_ids:
+                index.remove(post_id)
+        return total
+
+    @classmethod
+    def rerank_posts(cls, post_ids, batch_size=500, now=None):
+        """Re-score the given posts; used to drain the dirty-post queue."""
+        from .models import Post
+
+        if not post_ids:
+            return 0
+        return cls.rerank_queryset(Post.objects.filter(pk__in=list(post_ids)), batch_size=batch_size, now=now)
+
+    @classmethod
+    def rerank_queryset(cls, queryset, batch_size=500, now=None):
+        """Re-score ``queryset`` in batches and store the scores.
+
+        Each batch is scored in Python from the denormalized counters and
+        written back with a single ``bulk_update``, then pushed to the
+        ranking index. Returns the number of posts re-scored.
+        """
+        from .models import Post
+        from .ranking_index import get_ranking_index
+
+        now = now or timezone.now()
+        queryset = queryset.select_related('author', 'sponsor_campaign').order_by('pk')
+        index = get_ranking_index()
+        total = 0
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            for post in batch:
+                post.engagement_score, post.ranking_score = cls.calculate_ranking_score(post, now=now)
+            Post.objects.bulk_update(batch, ['engagement_score', 'ranking_score'], batch_size=batch_size)
+            index.update_many((post.id, post.ranking_score, post.created_at.timestamp()) for post in batch)
+            total += len(batch)
+            last_pk = batch[-1].pk
+        return total
+
     @staticmethod
     def calculate_relevance_score(post, user=None):
         """Calculate relevance score based on category tags and audience interaction."""
@@ -93,12 +177,13 @@ class FeedRanker:
             if matching_tags:
                 relevance += len(matching_tags) * 0.2
             
-            # Check group membership relevance
-            if post.group and user.community_group_memberships.filter(group=post.group).exists():
+            # Group membership and followed authors come from the cached snapshot
+            snapshot = ViewerSnapshot.for_user(user)
+            if post.group_id and snapshot.is_member(post.group_id):
                 relevance += 0.5
             
             # Author interaction history boost
-            if post.author and user.follower_relationships.filter(following=post.author).exists():
+            if post.author_id and snapshot.follows(post.author_id):
                 relevance += 0.3
                 
         except Exception:
@@ -127,12 +212,12 @@ class FeedRanker:
         """
         now = timezone.now()
         
-        # Annotate with engagement counts
+        # Engagement counts come from the denormalized counter columns
         queryset = queryset.annotate(
-            reaction_count=Count('reactions'),
-            comment_count=Count('comments'),
-            mention_count=Count('mentions'),
-            bookmark_count=Count('bookmarks'),
+            reaction_count=F('reactions_count'),
+            comment_count=F('comments_count'),
+            mention_count=F('mentions_count'),
+            bookmark_count=F('bookmarks_count'),
             
             # Calculate engagement score (include mentions)
             engagement_score=ExpressionWrapper(
@@ -193,10 +278,11 @@ class FeedRanker:
         from community.models import Post
         
         # Start with all public posts
+        group_ids = sorted(ViewerSnapshot.for_user(user).group_ids)
         queryset = Post.objects.filter(
             Q(feed_visibility='public_global') |
-            Q(feed_visibility='group_only', group__memberships__user=user)
-        ).distinct()
+            Q(feed_visibility='group_only', group_id__in=group_ids)
+        )
         
         # Apply any additional filters
         for key, value in filters.items():
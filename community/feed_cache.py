@@ -0,0 +1,149 @@
+"""
+Versioned response cache for feed pages and post details.
+
+Responses are cached per viewer under keys carrying two version numbers:
+
+- the global content generation, bumped whenever a post, comment, reaction,
+  bookmark or campaign is written
+- the viewer's visibility version, bumped when what they may see changes:
+  joining or leaving a group, following someone, their own posts, reactions
+  and bookmarks
+
+Writers never delete response keys. Bumping a counter is a single ``incr``
+that orphans every key built from the old value; those expire on their own.
+
+On a miss, the viewer's previous response for the same URL is served while it
+is younger than ``FEED_CACHE_STALE_TTL`` seconds and was built for their
+current visibility version, and one request rebuilds it in the background
+(stale-while-revalidate). Without a usable stale copy only the request holding
+the per-key lock builds the response; the others wait up to
+``FEED_CACHE_LOCK_WAIT`` seconds for it before building it themselves, so a
+cold key doesn't send every concurrent request to the database.
+"""
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from utils.executor import submit_task
+
+logger = logging.getLogger(__name__)
+
+
+class FeedCache:
+    """Read-through cache for per-viewer feed responses."""
+
+    TTL = getattr(settings, 'FEED_CACHE_TTL', 60)
+    STALE_TTL = getattr(settings, 'FEED_CACHE_STALE_TTL', 300)
+    LOCK_TIMEOUT = getattr(settings, 'FEED_CACHE_LOCK_TIMEOUT', 10)
+    LOCK_WAIT = getattr(settings, 'FEED_CACHE_LOCK_WAIT', 2.0)
+    POLL_INTERVAL = 0.05
+
+    GENERATION_KEY = 'feedcache:generation'
+
+    @staticmethod
+    def visibility_key(user_id):
+        return f'feedcache:visibility:{user_id}'
+
+    # ------------------------------------------------------------------
+    # Versions
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _initial_version():
+        # Clock based so a counter evicted from the cache never comes back
+        # with a value older keys were built from
+        return int(time.time() * 1000)
+
+    @classmethod
+    def _bump(cls, key):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, cls._initial_version(), None)
+        except Exception:
+            logger.warning('Could not bump feed cache version %s', key, exc_info=True)
+
+    @classmethod
+    def bump_generation(cls):
+        """Invalidate every cached feed response."""
+        cls._bump(cls.GENERATION_KEY)
+
+    @classmethod
+    def bump_visibility(cls, *user_ids):
+        """Invalidate the cached responses (and stale copies) of these viewers."""
+        for user_id in set(user_ids):
+            if user_id:
+                cls._bump(cls.visibility_key(user_id))
+
+    @classmethod
+    def versions(cls, user_id=None):
+        """(generation, visibility version) for a viewer; anonymous viewers use 0."""
+        keys = [cls.GENERATION_KEY]
+        if user_id:
+            keys.append(cls.visibility_key(user_id))
+        found = cache.get_many(keys)
+        for key in keys:
+            if key not in found:
+                cache.add(key, cls._initial_version(), None)
+                found[key] = cache.get(key)
+        return found[cls.GENERATION_KEY], found.get(keys[-1]) if user_id else 0
+
+    # ------------------------------------------------------------------
+    # Responses
+    # ------------------------------------------------------------------
+    @classmethod
+    def get_or_build(cls, request, build):
+        """Cached response data for ``request``, calling ``build()`` on a miss.
+
+        ``build`` must return picklable data that only depends on the
+        request's URL and user.
+        """
+        user = getattr(request, 'user', None)
+        user_id = user.id if user is not None and user.is_authenticated else None
+        try:
+            generation, visibility = cls.versions(user_id)
+        except Exception:
+            logger.warning('Feed cache unavailable', exc_info=True)
+            return build()
+
+        digest = hashlib.md5(request.build_absolute_uri().encode(), usedforsecurity=False).hexdigest()
+        viewer = user_id or 'anon'
+        key = f'feedcache:response:{generation}:{visibility}:{viewer}:{digest}'
+        last_key = f'feedcache:last:{viewer}:{digest}'
+        lock_key = f'{key}:lock'
+
+        cached = cache.get_many([key, last_key])
+        if key in cached:
+            return cached[key]
+        stale = cached.get(last_key)
+        if stale is not None and stale['visibility'] != visibility:
+            stale = None
+
+        if cache.add(lock_key, 1, cls.LOCK_TIMEOUT):
+            if stale is not None:
+                submit_task(cls._refresh, key, last_key, lock_key, visibility, build)
+                return stale['data']
+            return cls._refresh(key, last_key, lock_key, visibility, build)
+
+        if stale is not None:
+            return stale['data']
+        # Someone else is building this response; wait for theirs
+        deadline = time.monotonic() + cls.LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(cls.POLL_INTERVAL)
+            data = cache.get(key)
+            if data is not None:
+                return data
+        return build()
+
+    @classmethod
+    def _refresh(cls, key, last_key, lock_key, visibility, build):
+        try:
+            data = build()
+            cache.set(key, data, cls.TTL)
+            cache.set(last_key, {'visibility': visibility, 'data': data}, cls.STALE_TTL)
+            return data
+        finally:
+            cache.delete(lock_key)
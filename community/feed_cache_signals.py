@@ -0,0 +1,88 @@
+"""
+Signal handlers that bump the feed response cache versions (see
+``community.feed_cache``) after writes that change what feeds show, and drop
+the viewer snapshots (``community.visibility``) of users whose groups, follows
+or role changed.
+
+Bumps run on commit so a request can't rebuild a response from the old rows
+under the new version.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .feed_cache import FeedCache
+from .models import Comment, GroupMembership, Post, PostBookmark, PostReaction
+from .visibility import ViewerSnapshot
+
+# Background saves that don't change what a feed page shows
+RANKING_FIELDS = {'engagement_score', 'ranking_score', 'updated_at', 'last_activity_at'}
+
+
+def _forget_viewer(user_id):
+    def forget():
+        ViewerSnapshot.forget(user_id)
+        FeedCache.bump_visibility(user_id)
+    transaction.on_commit(forget)
+
+
+def _bump(*user_ids):
+    def bump():
+        FeedCache.bump_generation()
+        FeedCache.bump_visibility(*user_ids)
+    transaction.on_commit(bump)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= RANKING_FIELDS:
+        return
+    _bump(instance.author_id)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    _bump(instance.author_id)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    _bump(instance.author_id)
+
+
+@receiver(post_save, sender=PostReaction)
+@receiver(post_delete, sender=PostReaction)
+@receiver(post_save, sender=PostBookmark)
+@receiver(post_delete, sender=PostBookmark)
+def reaction_changed(sender, instance, **kwargs):
+    # The viewer's own user_reaction / is_bookmarked changed too
+    _bump(instance.user_id)
+
+
+@receiver(post_save, sender='promotions.SponsorCampaign')
+@receiver(post_delete, sender='promotions.SponsorCampaign')
+def campaign_changed(sender, instance, **kwargs):
+    _bump()
+
+
+@receiver(post_save, sender=GroupMembership)
+@receiver(post_delete, sender=GroupMembership)
+def membership_changed(sender, instance, **kwargs):
+    _forget_viewer(instance.user_id)
+
+
+@receiver(post_save, sender='accounts.Follow')
+@receiver(post_delete, sender='accounts.Follow')
+def follow_changed(sender, instance, **kwargs):
+    _forget_viewer(instance.follower_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    # Logins only touch last_login; anything else may have changed the role
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    user_id = instance.pk
+    transaction.on_commit(lambda: ViewerSnapshot.forget(user_id))
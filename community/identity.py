@@ -0,0 +1,89 @@
+"""
+Request-scoped identity resolution.
+
+Depending on the app a user's profile hangs off ``community_profile``,
+``profile`` or ``userprofile``. ``profile_of`` probes those once per user
+instance and remembers the answer, so serializers rendering many fields of the
+same author don't repeat the one-to-one lookups.
+
+``Identity.for_request`` bundles what the community permission classes ask
+about the requester: authentication, staff status, profile and community
+approval. It is built once per request and each part is loaded on first use,
+so a read-only request that never looks at the profile doesn't query for it.
+Serializers describe post and comment authors rather than the requester and
+go through ``community.author_summary`` instead.
+"""
+from django.utils.functional import cached_property
+
+PROFILE_ATTRS = ('community_profile', 'profile', 'userprofile')
+
+_MISSING = object()
+
+
+def profile_of(user):
+    """The user's profile under the first name that has one, or None."""
+    if user is None:
+        return None
+    profile = user.__dict__.get('_identity_profile', _MISSING)
+    if profile is _MISSING:
+        profile = None
+        for attr in PROFILE_ATTRS:
+            profile = getattr(user, attr, None)
+            if profile is not None:
+                break
+        user.__dict__['_identity_profile'] = profile
+    return profile
+
+
+def role_of(user):
+    profile = profile_of(user)
+    if profile is not None:
+        return getattr(profile, 'role', None)
+    return getattr(user, 'role', None) or None
+
+
+def verified_of(user):
+    profile = profile_of(user)
+    if profile is not None:
+        return getattr(profile, 'is_verified_corporate', False)
+    return False
+
+
+class Identity:
+    """What the current request knows about its user."""
+
+    def __init__(self, user):
+        self._source = user
+        self.user = user if user is not None and user.is_authenticated else None
+
+    @classmethod
+    def for_request(cls, request):
+        # Stored on the Django request so DRF's wrapper and the serializers'
+        # context share one instance
+        http_request = getattr(request, '_request', request)
+        user = getattr(request, 'user', None)
+        identity = getattr(http_request, '_identity', None)
+        if identity is None or identity._source is not user:
+            identity = http_request._identity = cls(user)
+        return identity
+
+    @property
+    def is_authenticated(self):
+        return self.user is not None
+
+    @cached_property
+    def is_staff(self):
+        return self.user is not None and bool(
+            getattr(self.user, 'is_staff', False) or getattr(self.user, 'is_superuser', False)
+        )
+
+    @cached_property
+    def profile(self):
+        return profile_of(self.user)
+
+    @cached_property
+    def community_approved(self):
+        if self.profile is not None:
+            return bool(getattr(self.profile, 'community_approved', False))
+        # Fallback: the user model itself may carry the flag
+        return bool(getattr(self.user, 'community_approved', False))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from community.counters import reconcile_post_counters
+from community.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Recompute denormalized reaction/comment/bookmark/mention counters on posts and repair drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--post-id', type=int, action='append', dest='post_ids',
+                            help='Only reconcile the given post (may be repeated)')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without writing')
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.all()
+        if options['post_ids']:
+            queryset = queryset.filter(pk__in=options['post_ids'])
+
+        repaired = reconcile_post_counters(
+            queryset,
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+
+        verb = 'would be repaired' if options['dry_run'] else 'repaired'
+        self.stdout.write(self.style.SUCCESS(f'{repaired} post(s) {verb}'))
@@ -0,0 +1,40 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from community.dirty_posts import get_dirty_post_queue
+from community.feed import FeedRanker
+
+
+class Command(BaseCommand):
+    help = ('Re-score recently active posts in batches so the stored ranking_score reflects time decay, '
+            'and zero the scores of posts that left the window')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window-hours', type=int, default=7 * 24,
+                            help='Re-score posts created or active within this many hours (default 168)')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Keep running and re-rank every N seconds (0 = run once)')
+        parser.add_argument('--dirty-only', action='store_true',
+                            help='Only drain the queue of posts touched by views and reactions')
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            now = timezone.now()
+            count = retired = 0
+            if not options['dirty_only']:
+                since = now - timedelta(hours=options['window_hours'])
+                count = FeedRanker.rerank_recent(since=since, batch_size=options['batch_size'], now=now)
+                retired = FeedRanker.retire_stale(since, batch_size=options['batch_size'])
+            count += get_dirty_post_queue().flush()
+            self.stdout.write(self.style.SUCCESS(
+                f'Re-ranked {count} post(s), retired {retired} in {time.monotonic() - started:.2f}s'
+            ))
+
+            if not options['interval']:
+                break
+            time.sleep(max(options['interval'] - (time.monotonic() - started), 0))
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.30 on 2026-10-17 05:35
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_counters(apps, schema_editor):
+    Post = apps.get_model('community', 'Post')
+    PostReaction = apps.get_model('community', 'PostReaction')
+    Comment = apps.get_model('community', 'Comment')
+    PostBookmark = apps.get_model('community', 'PostBookmark')
+    MentionLog = apps.get_model('community', 'MentionLog')
+
+    def totals(model):
+        rows = model.objects.values('post_id').order_by().annotate(c=Count('id'))
+        return {row['post_id']: row['c'] for row in rows}
+
+    comments = totals(Comment)
+    bookmarks = totals(PostBookmark)
+    mentions = totals(MentionLog)
+    breakdowns = {}
+    for row in PostReaction.objects.values('post_id', 'reaction_type').order_by().annotate(c=Count('id')):
+        breakdowns.setdefault(row['post_id'], {})[row['reaction_type']] = row['c']
+
+    batch = []
+    for post in Post.objects.only('id').iterator():
+        breakdown = breakdowns.get(post.id, {})
+        post.reaction_breakdown = breakdown
+        post.reactions_count = sum(breakdown.values())
+        post.comments_count = comments.get(post.id, 0)
+        post.bookmarks_count = bookmarks.get(post.id, 0)
+        post.mentions_count = mentions.get(post.id, 0)
+        batch.append(post)
+        if len(batch) >= 500:
+            Post.objects.bulk_update(batch, ['reaction_breakdown', 'reactions_count', 'comments_count', 'bookmarks_count', 'mentions_count'])
+            batch = []
+    if batch:
+        Post.objects.bulk_update(batch, ['reaction_breakdown', 'reactions_count', 'comments_count', 'bookmarks_count', 'mentions_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0002_group_banner_group_profile_picture_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='bookmarks_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='mentions_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reaction_breakdown',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reactions_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
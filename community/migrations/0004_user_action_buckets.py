@@ -0,0 +1,57 @@
+# Generated by Django 4.2.30 on 2026-10-17 05:58
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def backfill_buckets(apps, schema_editor):
+    CommunityEngagementLog = apps.get_model('community', 'CommunityEngagementLog')
+    UserActionBucket = apps.get_model('community', 'UserActionBucket')
+
+    since = timezone.now() - timedelta(days=getattr(settings, 'REPUTATION_WINDOW_DAYS', 30))
+    rows = (
+        CommunityEngagementLog.objects.filter(user__isnull=False, created_at__gte=since)
+        .annotate(day=TruncDate('created_at'))
+        .values('user_id', 'day', 'action_type').order_by().annotate(c=Count('id'))
+    )
+    batch = []
+    for row in rows.iterator():
+        batch.append(UserActionBucket(user_id=row['user_id'], day=row['day'],
+                                      action_type=row['action_type'], count=row['c']))
+        if len(batch) >= 500:
+            UserActionBucket.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        UserActionBucket.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('community', '0003_post_engagement_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserActionBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('action_type', models.CharField(max_length=32)),
+                ('count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='action_buckets', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day'], name='community_u_day_69f57e_idx')],
+                'unique_together': {('user', 'day', 'action_type')},
+            },
+        ),
+        migrations.RunPython(backfill_buckets, migrations.RunPython.noop),
+    ]
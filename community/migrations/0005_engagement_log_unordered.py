@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 06:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0004_user_action_buckets'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='communityengagementlog',
+            options={'verbose_name_plural': 'Community Engagement Logs'},
+        ),
+    ]
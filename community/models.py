@@ -208,6 +208,14 @@ class Post(models.Model):
     view_count = models.PositiveIntegerField(default=0)
     engagement_score = models.FloatField(default=0.0)
     ranking_score = models.FloatField(default=0.0)
+
+    # Denormalized engagement counters, maintained by community.counter_signals
+    # and repaired by the reconcile_post_counters management command
+    reactions_count = models.PositiveIntegerField(default=0)
+    reaction_breakdown = models.JSONField(default=dict, blank=True)
+    comments_count = models.PositiveIntegerField(default=0)
+    bookmarks_count = models.PositiveIntegerField(default=0)
+    mentions_count = models.PositiveIntegerField(default=0)
     
     # Sponsorship
     is_sponsored = models.BooleanField(default=False)
@@ -237,32 +245,42 @@ class Post(models.Model):
     def __str__(self):
         return f"{self.title or self.content[:50]} by {self.author_id}"
 
+    # Counters are only ever written through F() updates: community.counters,
+    # and utils.counter_buffer flushes for view_count
+    COUNTER_FIELDS = (
+        'reactions_count', 'reaction_breakdown', 'comments_count', 'bookmarks_count', 'mentions_count',
+        'view_count',
+    )
+
+    def save(self, *args, **kwargs):
+        # A full save of an existing post must not overwrite counters that were
+        # incremented by other requests after this instance was loaded.
+        if not self._state.adding and self.pk and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.COUNTER_FIELDS and f.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
     def update_ranking(self, save=True):
         """Update engagement and ranking scores."""
         from .feed import FeedRanker
         
-        # Calculate engagement score
-        self.engagement_score = FeedRanker.calculate_engagement_score(self)
-        
-        # Calculate final ranking incorporating all factors
-        time_decay = FeedRanker.calculate_time_decay(self.created_at)
-        role_boost = FeedRanker.calculate_role_boost(self)
-        sponsored_boost = FeedRanker.calculate_sponsored_boost(self)
-        
-        self.ranking_score = self.engagement_score * time_decay * role_boost * sponsored_boost
+        # Engagement, time decay, author role and sponsorship combined
+        self.engagement_score, self.ranking_score = FeedRanker.calculate_ranking_score(self)
         
         if save:
             self.save(update_fields=['engagement_score', 'ranking_score', 'updated_at'])
             self.cache_ranking()
     
     def increment_view(self):
-        """Increment view count and update ranking."""
-        Post.objects.filter(id=self.id).update(
-            view_count=F('view_count') + 1,
-            last_activity_at=timezone.now()
-        )
-        self.refresh_from_db(fields=['view_count', 'last_activity_at'])
-        self.update_ranking()
+        """Buffer a view and queue the post for background re-ranking."""
+        from utils.counter_buffer import counter_buffer
+        from .dirty_posts import mark_post_dirty
+
+        counter_buffer.incr(Post, self.id, 'view_count', touch='last_activity_at')
+        mark_post_dirty(self.id)
     
     def cache_ranking(self):
         """Cache ranking score for fast feed generation."""
@@ -284,11 +302,10 @@ class Post(models.Model):
             # Use Django's cache framework
             cache.set(cache_key, json.dumps(cache_data), timeout=3600)
             
-            # Cache the ranking score in memory
-            rankings = cache.get('post_rankings') or {}
-            rankings[str(self.id)] = self.ranking_score
-            cache.set('post_rankings', rankings, timeout=3600)
-            
+            # Record the score in the sorted ranking index (atomic per post)
+            from .ranking_index import get_ranking_index
+            get_ranking_index().update(self.id, self.ranking_score, self.created_at.timestamp())
+
         except Exception:
             # Log error but don't fail if caching is unavailable
             pass
@@ -297,16 +314,14 @@ class Post(models.Model):
     def get_feed_page(page=1, page_size=20, user=None, feed_type='global'):
         """Get a page of ranked posts from cache if available."""
         try:
-            # Get cached rankings
-            rankings = cache.get('post_rankings') or {}
-            
-            # Sort posts by ranking score
-            sorted_posts = sorted(rankings.items(), key=lambda x: float(x[1]), reverse=True)
-            
-            # Paginate
+            from .ranking_index import get_ranking_index
+            index = get_ranking_index()
+            index.maybe_evict()
+
+            # Read just the requested ranks from the sorted index
             start = (page - 1) * page_size
             end = start + page_size
-            page_post_ids = [post_id for post_id, _ in sorted_posts[start:end]]
+            page_post_ids = [post_id for post_id, _ in index.range(start, end)]
             
             # Try to get posts from cache
             posts = []
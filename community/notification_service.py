@@ -4,7 +4,8 @@ Engagement Notification Service
 Handles sending notifications for engagement actions (likes, comments, mentions)
 via in-app and email channels with role-based templates.
 
-Notifications are sent asynchronously using threading to avoid blocking requests.
+Notifications are delivered by a background job (utils.jobs, run by
+`manage.py runworker`) to avoid blocking requests.
 """
 
 from django.core.mail import send_mail
@@ -14,7 +15,6 @@ from django.utils import timezone
 from django.db.models import Count
 from notifications.models import Notification, NotificationPreference
 from datetime import timedelta
-import threading
 
 
 class NotificationService:
@@ -50,21 +50,16 @@ class NotificationService:
         """
         Send engagement notification via configured channels asynchronously.
         
-        Uses threading to send notifications in the background without blocking the request.
+        Queues a delivery job so the request isn't blocked.
         Respects user's notification preferences.
         """
-        # Start notification sending in a background thread
-        thread = threading.Thread(
-            target=cls._send_notifications_async,
-            args=(engagement_notification,),
-            daemon=True
-        )
-        thread.start()
+        from .tasks import AsyncTaskRunner, deliver_engagement_notification
+        AsyncTaskRunner.run(deliver_engagement_notification, engagement_notification.id)
     
     @classmethod
     def _send_notifications_async(cls, engagement_notification):
         """
-        Internal method that sends notifications in a background thread.
+        Internal method that sends notifications from a background worker.
         """
         try:
             user = engagement_notification.user
@@ -0,0 +1,192 @@
+"""
+Keyset (cursor) pagination helpers for community feeds and comment threads.
+
+Instead of ``OFFSET n`` the next page is fetched with a ``WHERE`` clause on
+the sort key of the last row returned, so every page costs O(page_size) no
+matter how deep the client has scrolled, and rows inserted or re-ranked while
+the client is scrolling don't shift later pages.
+
+Cursors are opaque URL-safe strings encoding the last row's sort key.
+
+Ranked feeds are the exception: their sort key moves while the client
+scrolls, so ``RankedFeedPaginator`` pages a snapshot of the order instead.
+"""
+import base64
+import json
+import uuid
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, FloatField, IntegerField, Q
+from django.db.models.functions import Cast, Floor
+from django.utils.dateparse import parse_datetime
+
+MAX_PAGE_SIZE = 100
+
+# Width of a ranking bucket. Within a bucket posts are ordered newest first.
+RANKING_BUCKET_SIZE = getattr(settings, 'COMMUNITY_FEED_RANKING_BUCKET', 1.0)
+
+# How many posts of a ranked feed the first page snapshots, and for how long
+# (longer than community.feed_cache serves a cached first page)
+RANKED_SNAPSHOT_SIZE = getattr(settings, 'COMMUNITY_FEED_SNAPSHOT_SIZE', 500)
+RANKED_SNAPSHOT_TTL = getattr(settings, 'COMMUNITY_FEED_SNAPSHOT_TTL', 30 * 60)
+
+
+def encode_cursor(values):
+    payload = [{'dt': v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Return the list of key values in ``token``, or None if it is invalid."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw.decode('utf-8'))
+        if not isinstance(payload, list):
+            return None
+        return [parse_datetime(v['dt']) if isinstance(v, dict) and 'dt' in v else v for v in payload]
+    except Exception:
+        return None
+
+
+def wants_pagination(request):
+    """True when the client asked for a page (older comment clients expect a bare list)."""
+    params = request.query_params
+    return any(params.get(name) for name in ('cursor', 'page', 'page_size'))
+
+
+def parse_page_size(request, default=20):
+    try:
+        size = int(request.query_params.get('page_size', default))
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+class KeysetPaginator:
+    """Paginate a queryset on an ordered tuple of columns.
+
+    ``ordering`` is a sequence of field names, each optionally prefixed with
+    ``-`` for descending order. The last field must be unique (normally
+    ``id``) so the key identifies a single row.
+    """
+
+    def __init__(self, ordering, page_size=20):
+        self.ordering = list(ordering)
+        self.page_size = page_size
+        self.fields = [name.lstrip('-') for name in self.ordering]
+
+    def _after(self, values):
+        """Build the ``WHERE`` clause selecting rows strictly after ``values``."""
+        condition = Q()
+        for position, name in enumerate(self.ordering):
+            field = self.fields[position]
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            clause = Q(**{f'{field}__{lookup}': values[position]})
+            for prev in range(position):
+                clause &= Q(**{self.fields[prev]: values[prev]})
+            condition |= clause
+        return condition
+
+    def paginate(self, queryset, cursor=None, page=None):
+        """Return ``(items, next_cursor)`` for the requested page.
+
+        ``cursor`` takes precedence. ``page`` (1-based) is kept for clients
+        that still send page numbers and falls back to an offset on the same
+        stable ordering.
+        """
+        queryset = queryset.order_by(*self.ordering)
+        values = decode_cursor(cursor)
+        if values is not None and len(values) == len(self.ordering):
+            queryset = queryset.filter(self._after(values))
+            offset = 0
+        else:
+            offset = (max(int(page or 1), 1) - 1) * self.page_size
+
+        rows = list(queryset[offset:offset + self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        next_cursor = None
+        if has_more and rows:
+            next_cursor = encode_cursor([getattr(rows[-1], field) for field in self.fields])
+        return rows, next_cursor
+
+
+class RankedFeedPaginator:
+    """Paginate a ranked post feed on (ranking bucket, created_at, id).
+
+    Scores are refreshed while clients scroll, so a cursor holding the last
+    row's live key would skip posts that moved above it and repeat posts that
+    moved below it. The first page instead stores the keys of the first
+    ``RANKED_SNAPSHOT_SIZE`` posts in the cache under a random token, and
+    cursors walk that snapshot. Each page is re-read from the queryset, so
+    posts deleted or hidden since the first page are left out.
+
+    Past the end of a full snapshot, or once it has expired, paging continues
+    on the live order after the last post shown; from there a post whose score
+    changes meanwhile can still be skipped or shown twice. Page numbers
+    without a cursor are offsets on the live order, as in ``KeysetPaginator``.
+    """
+
+    ordering = ['-ranking_bucket', '-created_at', '-id']
+
+    def __init__(self, page_size=20, snapshot_size=RANKED_SNAPSHOT_SIZE):
+        self.page_size = page_size
+        self.snapshot_size = max(snapshot_size, page_size)
+        self.keyset = KeysetPaginator(self.ordering, page_size=page_size)
+
+    @staticmethod
+    def snapshot_key(token):
+        return f'rankedfeed:{token}'
+
+    @staticmethod
+    def annotate(queryset):
+        return queryset.annotate(
+            ranking_bucket=Cast(
+                Floor(Cast(F('ranking_score'), FloatField()) / RANKING_BUCKET_SIZE),
+                IntegerField(),
+            )
+        )
+
+    def paginate(self, queryset, cursor=None, page=None):
+        """Return ``(items, next_cursor)`` for the requested page."""
+        queryset = self.annotate(queryset)
+        values = decode_cursor(cursor)
+        if values is not None and len(values) == len(self.ordering) + 2:
+            token, offset, *key = values
+            keys = cache.get(self.snapshot_key(token)) if token else None
+            if keys is not None and isinstance(offset, int) and 0 <= offset < len(keys):
+                return self._snapshot_page(queryset, token, keys, offset)
+            # The snapshot expired: carry on after the last post shown
+            return self.keyset.paginate(queryset, cursor=encode_cursor(key))
+        if values is None and max(int(page or 1), 1) == 1:
+            return self._first_page(queryset)
+        return self.keyset.paginate(queryset, cursor=cursor, page=page)
+
+    def _first_page(self, queryset):
+        rows = queryset.order_by(*self.ordering).values_list(*self.keyset.fields)[:self.snapshot_size]
+        keys = [list(row) for row in rows]
+        token = None
+        if len(keys) > self.page_size:
+            token = uuid.uuid4().hex
+            cache.set(self.snapshot_key(token), keys, RANKED_SNAPSHOT_TTL)
+        return self._snapshot_page(queryset, token, keys, 0)
+
+    def _snapshot_page(self, queryset, token, keys, offset):
+        window = keys[offset:offset + self.page_size]
+        found = queryset.in_bulk([key[-1] for key in window])
+        items = [found[key[-1]] for key in window if key[-1] in found]
+
+        end = offset + len(window)
+        next_cursor = None
+        if end < len(keys):
+            next_cursor = encode_cursor([token, end, *keys[end - 1]])
+        elif len(keys) >= self.snapshot_size and queryset.filter(self.keyset._after(keys[-1])).exists():
+            # Past the snapshot: continue on the live order
+            next_cursor = encode_cursor(keys[-1])
+        return items, next_cursor
@@ -1,5 +1,7 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
+from .identity import Identity
+
 
 class IsCommunityMember(BasePermission):
     """Permission used across community views.
@@ -12,31 +14,27 @@ class IsCommunityMember(BasePermission):
       `community_approved == True`. The permission checks common profile attribute
       names used across projects: `community_profile`, `profile`, `userprofile`.
     - Staff and superusers are always allowed.
+
+    The user's profile is resolved once per request (see ``community.identity``).
     """
 
     message = 'User does not have access to community features.'
 
     def has_permission(self, request, view):
-        user = request.user
-        if not user or not user.is_authenticated:
+        identity = Identity.for_request(request)
+        if not identity.is_authenticated:
             return False
 
         # Allow staff / superuser unconditionally
-        if getattr(user, 'is_staff', False) or getattr(user, 'is_superuser', False):
+        if identity.is_staff:
             return True
 
         # Allow safe/read-only methods for any authenticated user
         if request.method in SAFE_METHODS:
             return True
 
-        # For write operations require an approved community profile. Try common names.
-        for attr in ('community_profile', 'profile', 'userprofile'):
-            profile = getattr(user, attr, None)
-            if profile is not None:
-                return bool(getattr(profile, 'community_approved', False))
-
-        # Fallback: allow if user model itself carries the flag
-        return bool(getattr(user, 'community_approved', False))
+        # For write operations require an approved community profile
+        return identity.community_approved
 
 
 from django.apps import apps
@@ -58,17 +56,17 @@ class IsSubscribed(BasePermission):
     message = 'User must have an active subscription to perform this action.'
 
     def has_permission(self, request, view):
-        user = request.user
-        if not user or not user.is_authenticated:
+        identity = Identity.for_request(request)
+        if not identity.is_authenticated:
             return False
 
         # Staff and superusers bypass subscription checks
-        if getattr(user, 'is_staff', False) or getattr(user, 'is_superuser', False):
+        if identity.is_staff:
             return True
 
         logger = logging.getLogger(__name__)
 
         # For now, allow all authenticated users to comment
         # TODO: Re-enable subscription checks once subscription records are properly set up
-        logger.debug('IsSubscribed: allowing authenticated user %s to comment', user)
+        logger.debug('IsSubscribed: allowing authenticated user %s to comment', identity.user)
         return True
@@ -0,0 +1,228 @@
+"""
+Ranking index for community posts.
+
+Keeps ``post_id -> ranking_score`` in a sorted structure so feed pages can be
+read by rank without loading and sorting every score. When Redis is
+configured the index is a pair of sorted sets (one by ranking score, one by
+creation time for age-based eviction) and every update is a single atomic
+command. Otherwise a thread-safe in-process index with the same interface is
+used, which is enough for development and single-worker deployments.
+
+Settings:
+- ``COMMUNITY_RANKING_REDIS_URL`` (falls back to the ``REDIS_URL`` env var):
+  Redis connection string; leave unset to use the in-process index.
+- ``COMMUNITY_RANKING_MAX_AGE``: seconds a post stays in the index after it
+  was created (default 7 days).
+"""
+import bisect
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+EVICTION_INTERVAL = 60
+
+
+class _EvictionMixin:
+    _last_eviction = 0.0
+
+    def maybe_evict(self, interval=EVICTION_INTERVAL):
+        """Drop posts older than ``max_age``, at most once per ``interval`` seconds."""
+        now = time.time()
+        if now - self._last_eviction < interval:
+            return 0
+        self._last_eviction = now
+        try:
+            return self.evict_expired(now)
+        except Exception:
+            logger.warning('Ranking index eviction failed', exc_info=True)
+            return 0
+
+
+class InMemoryRankingIndex(_EvictionMixin):
+    """Process-local ranking index kept sorted with ``bisect``."""
+
+    def __init__(self, max_age=DEFAULT_MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._scores = {}    # post_id -> score
+        self._created = {}   # post_id -> created timestamp
+        self._order = []     # sorted list of (-score, post_id)
+
+    def _discard(self, post_id):
+        score = self._scores.pop(post_id, None)
+        self._created.pop(post_id, None)
+        if score is not None:
+            index = bisect.bisect_left(self._order, (-score, post_id))
+            if index < len(self._order) and self._order[index] == (-score, post_id):
+                del self._order[index]
+        return score
+
+    def _set(self, post_id, score, created_ts):
+        self._discard(post_id)
+        self._scores[post_id] = score
+        self._created[post_id] = created_ts
+        bisect.insort(self._order, (-score, post_id))
+
+    def update(self, post_id, score, created_ts=None):
+        post_id = int(post_id)
+        with self._lock:
+            if created_ts is None:
+                created_ts = self._created.get(post_id, time.time())
+            self._set(post_id, float(score), created_ts)
+
+    def update_many(self, entries):
+        """Set several scores at once from ``(post_id, score, created_ts)`` tuples."""
+        with self._lock:
+            for post_id, score, created_ts in entries:
+                self._set(int(post_id), float(score), created_ts)
+
+    def incr(self, post_id, delta):
+        post_id = int(post_id)
+        with self._lock:
+            created_ts = self._created.get(post_id, time.time())
+            score = self._scores.get(post_id, 0.0) + float(delta)
+            self._set(post_id, score, created_ts)
+            return score
+
+    def remove(self, post_id):
+        with self._lock:
+            self._discard(int(post_id))
+
+    def score(self, post_id):
+        return self._scores.get(int(post_id))
+
+    def range(self, start, stop):
+        """Return ``[(post_id, score), ...]`` for ranks ``start`` to ``stop`` (exclusive)."""
+        with self._lock:
+            return [(post_id, -neg) for neg, post_id in self._order[start:stop]]
+
+    def __len__(self):
+        return len(self._scores)
+
+    def evict_expired(self, now=None):
+        cutoff = (now or time.time()) - self.max_age
+        with self._lock:
+            expired = [pid for pid, ts in self._created.items() if ts < cutoff]
+            for post_id in expired:
+                self._discard(post_id)
+        return len(expired)
+
+    def clear(self):
+        with self._lock:
+            self._scores.clear()
+            self._created.clear()
+            self._order.clear()
+
+
+class RedisRankingIndex(_EvictionMixin):
+    """Ranking index stored in two Redis sorted sets."""
+
+    def __init__(self, client, key='community:post_rankings', max_age=DEFAULT_MAX_AGE):
+        self.client = client
+        self.key = key
+        self.created_key = f'{key}:created'
+        self.max_age = max_age
+
+    def update(self, post_id, score, created_ts=None):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zadd(self.key, {str(post_id): float(score)})
+        if created_ts is not None:
+            pipe.zadd(self.created_key, {str(post_id): float(created_ts)})
+        else:
+            pipe.zadd(self.created_key, {str(post_id): time.time()}, nx=True)
+        pipe.execute()
+
+    def update_many(self, entries):
+        scores, created = {}, {}
+        for post_id, score, created_ts in entries:
+            scores[str(post_id)] = float(score)
+            created[str(post_id)] = float(created_ts)
+        if not scores:
+            return
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zadd(self.key, scores)
+        pipe.zadd(self.created_key, created)
+        pipe.execute()
+
+    def incr(self, post_id, delta):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zincrby(self.key, float(delta), str(post_id))
+        pipe.zadd(self.created_key, {str(post_id): time.time()}, nx=True)
+        score, _ = pipe.execute()
+        return float(score)
+
+    def remove(self, post_id):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zrem(self.key, str(post_id))
+        pipe.zrem(self.created_key, str(post_id))
+        pipe.execute()
+
+    def score(self, post_id):
+        value = self.client.zscore(self.key, str(post_id))
+        return None if value is None else float(value)
+
+    def range(self, start, stop):
+        if stop <= start:
+            return []
+        rows = self.client.zrevrange(self.key, start, stop - 1, withscores=True)
+        return [(int(member), float(score)) for member, score in rows]
+
+    def __len__(self):
+        return int(self.client.zcard(self.key))
+
+    def evict_expired(self, now=None):
+        cutoff = (now or time.time()) - self.max_age
+        expired = self.client.zrangebyscore(self.created_key, '-inf', cutoff)
+        if not expired:
+            return 0
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zrem(self.key, *expired)
+        pipe.zrem(self.created_key, *expired)
+        pipe.execute()
+        return len(expired)
+
+    def clear(self):
+        self.client.delete(self.key, self.created_key)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_redis_client():
+    """Return a connected Redis client for community ranking data, or None."""
+    redis_url = getattr(settings, 'COMMUNITY_RANKING_REDIS_URL', None) or os.environ.get('REDIS_URL')
+    if not redis_url:
+        return None
+    try:
+        import redis
+        client = redis.Redis.from_url(redis_url)
+        client.ping()
+        return client
+    except Exception:
+        logger.warning('Redis unavailable for community ranking, using in-process structures', exc_info=True)
+        return None
+
+
+def _build_index():
+    max_age = getattr(settings, 'COMMUNITY_RANKING_MAX_AGE', DEFAULT_MAX_AGE)
+    client = get_redis_client()
+    if client is not None:
+        return RedisRankingIndex(client, max_age=max_age)
+    return InMemoryRankingIndex(max_age=max_age)
+
+
+def get_ranking_index():
+    """Return the process-wide ranking index, creating it on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = _build_index()
+    return _index
@@ -0,0 +1,165 @@
+"""
+Incremental reputation scoring.
+
+Each written engagement event bumps a ``UserActionBucket`` row keyed by
+(user, day, action) and marks the user dirty. A background flusher
+re-scores dirty users in one batch every ``COMMUNITY_REPUTATION_FLUSH_INTERVAL``
+seconds (default 60). A user is re-scored at most once per interval, from at
+most ``REPUTATION_WINDOW_DAYS`` (default 30) buckets per action, whatever the
+number of raw log rows.
+"""
+import logging
+import threading
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .dirty_posts import DirtyIdQueue
+
+logger = logging.getLogger(__name__)
+
+WINDOW_DAYS = getattr(settings, 'REPUTATION_WINDOW_DAYS', 30)
+FLUSH_INTERVAL = getattr(settings, 'COMMUNITY_REPUTATION_FLUSH_INTERVAL', 60)
+
+# Points per action in the window
+ACTION_WEIGHTS = {
+    'like_post': 1,
+    'like_comment': 1,
+    'comment_post': 5,
+    'reply_comment': 5,
+    'mention_user': 10,
+    'join_group': 3,
+    'share_post': 7,
+}
+
+# (minimum actions in the window, level), highest first
+ACTIVITY_LEVELS = (
+    (200, 'community_leader'),
+    (50, 'power_user'),
+    (10, 'active'),
+    (1, 'novice'),
+    (0, 'inactive'),
+)
+
+
+def window_start(today=None):
+    today = today or timezone.localdate()
+    return today - timedelta(days=WINDOW_DAYS - 1)
+
+
+def record_actions(logs):
+    """Add saved engagement logs to the daily buckets and queue their users."""
+    from .engagement import UserActionBucket
+
+    counts = Counter()
+    for log in logs:
+        if not log.user_id:
+            continue
+        created = log.created_at or timezone.now()
+        counts[(log.user_id, timezone.localdate(created), log.action_type)] += 1
+    if not counts:
+        return
+
+    for (user_id, day, action_type), amount in counts.items():
+        bucket = UserActionBucket.objects.filter(user_id=user_id, day=day, action_type=action_type)
+        if bucket.update(count=F('count') + amount):
+            continue
+        try:
+            with transaction.atomic():
+                UserActionBucket.objects.create(user_id=user_id, day=day, action_type=action_type, count=amount)
+        except IntegrityError:
+            # Created concurrently by another flusher
+            bucket.update(count=F('count') + amount)
+
+    queue = get_dirty_user_queue()
+    for user_id in {user_id for user_id, _, _ in counts}:
+        queue.mark(user_id)
+
+
+def activity_level_for(action_count):
+    for minimum, level in ACTIVITY_LEVELS:
+        if action_count >= minimum:
+            return level
+    return 'inactive'
+
+
+def refresh_reputations(user_ids, today=None):
+    """Re-score ``user_ids`` from their buckets. Returns the number updated."""
+    from .engagement import UserActionBucket, UserReputation
+
+    user_ids = {int(user_id) for user_id in user_ids if user_id}
+    if not user_ids:
+        return 0
+
+    totals = defaultdict(dict)
+    rows = (
+        UserActionBucket.objects.filter(user_id__in=user_ids, day__gte=window_start(today))
+        .values('user_id', 'action_type').annotate(total=Sum('count'))
+    )
+    for row in rows:
+        totals[row['user_id']][row['action_type']] = row['total']
+
+    existing = {r.user_id: r for r in UserReputation.objects.filter(user_id__in=user_ids)}
+    missing = [UserReputation(user_id=user_id) for user_id in user_ids - set(existing)]
+    if missing:
+        UserReputation.objects.bulk_create(missing, ignore_conflicts=True)
+        existing.update({r.user_id: r for r in UserReputation.objects.filter(user_id__in=[m.user_id for m in missing])})
+
+    now = timezone.now()
+    reputations = []
+    for user_id, reputation in existing.items():
+        actions = totals.get(user_id, {})
+        action_count = sum(actions.values())
+        reputation.reputation_score = sum(
+            ACTION_WEIGHTS.get(action_type, 0) * count for action_type, count in actions.items()
+        )
+        reputation.activity_level = activity_level_for(action_count)
+        reputation.total_engagement_actions = action_count
+        reputation.badges = reputation._calculate_badges()
+        reputation.updated_at = now
+        reputations.append(reputation)
+
+    UserReputation.objects.bulk_update(
+        reputations,
+        ['reputation_score', 'activity_level', 'badges', 'total_engagement_actions', 'updated_at'],
+        batch_size=500,
+    )
+    cache.delete_many([f'user_reputation:{user_id}' for user_id in existing])
+    return len(reputations)
+
+
+def prune_buckets(today=None):
+    """Delete buckets that have left the scoring window."""
+    from .engagement import UserActionBucket
+
+    return UserActionBucket.objects.filter(day__lt=window_start(today)).delete()[0]
+
+
+def refresh_dirty_users(ids):
+    """Re-score the queued users, pruning expired buckets once a day."""
+    today = timezone.localdate()
+    if cache.add(f'reputation:pruned:{today.isoformat()}', 1, 60 * 60 * 24):
+        prune_buckets(today)
+    return refresh_reputations(ids, today=today)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_dirty_user_queue():
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                from .ranking_index import get_redis_client
+                _queue = DirtyIdQueue(
+                    refresh_dirty_users, name='dirty-user', client=get_redis_client(),
+                    key='community:dirty_users', interval=FLUSH_INTERVAL,
+                )
+    return _queue
@@ -3,8 +3,31 @@ from django.db import models
 import json
 import logging
 from typing import Any
+from .author_summary import AuthorSummary, related_user
 from .models import Group, GroupMembership, Post, Comment
 
+
+class AuthorSummaryMixin:
+    """Render people from ``AuthorSummary``, memoized in the serializer context."""
+
+    def author_summary(self, obj, field='author'):
+        user = related_user(obj, field)
+        user_id = getattr(user, 'pk', user)
+        if user_id is None:
+            return None
+        summaries = self.context.setdefault('author_summaries', {})
+        if user_id not in summaries:
+            summaries[user_id] = AuthorSummary.get(user)
+        return summaries[user_id]
+
+    def author_avatar(self, summary):
+        avatar = summary['avatar'] if summary else None
+        request = self.context.get('request')
+        if request and avatar and avatar.startswith('/'):
+            return request.build_absolute_uri(avatar)
+        return avatar
+
+
 class CommunitySectionSerializer(serializers.ModelSerializer):
     image = serializers.ImageField(read_only=True)
 
@@ -192,13 +215,8 @@ class GroupSerializer(serializers.ModelSerializer):
                 return None
             creator = obj.created_by
             # Try to get full name from profile
-            name = None
-            for attr in ('profile', 'community_profile', 'userprofile'):
-                profile = getattr(creator, attr, None)
-                if profile:
-                    name = getattr(profile, 'full_name', None)
-                    if name:
-                        break
+            summary = AuthorSummary.get(creator)
+            name = summary['profile']['full_name'] if summary and summary['profile'] else None
             if not name:
                 name = (getattr(creator, 'first_name', '') + ' ' + getattr(creator, 'last_name', '')).strip()
             return name or creator.email or str(creator)
@@ -250,34 +268,12 @@ class SimpleUserSerializer(serializers.ModelSerializer):
 
     def get_profile(self, obj):
         try:
-            profile = getattr(obj, 'profile', None) or getattr(obj, 'community_profile', None) or None
-            if not profile:
+            summary = AuthorSummary.get(obj)
+            if not summary or not summary['profile']:
                 return None
-            avatar = getattr(profile, 'avatar_url', None) or getattr(profile, 'avatar', None) or None
-
-            # simple binary-like heuristic to avoid returning raw binary blobs
-            def _is_binary_like(v):
-                if v is None:
-                    return False
-                if isinstance(v, (bytes, bytearray, memoryview)):
-                    return True
-                if not isinstance(v, str):
-                    return False
-                if '\u0000' in v or 'JFIF' in v or 'ICC_PROFILE' in v:
-                    return True
-                non_print = sum(1 for ch in v if ord(ch) < 32 or ord(ch) > 126)
-                try:
-                    ratio = non_print / max(1, len(v))
-                except Exception:
-                    ratio = 0
-                return ratio > 0.3
-
-            if _is_binary_like(avatar):
-                avatar = None
-
             return {
-                'full_name': getattr(profile, 'full_name', None),
-                'avatar_url': avatar,
+                'full_name': summary['profile']['full_name'],
+                'avatar_url': summary['avatar'],
             }
         except Exception:
             return None
@@ -314,7 +310,52 @@ try:
 except Exception:
     pass
 
-class PostSerializer(serializers.ModelSerializer):
+class PostListSerializer(serializers.ListSerializer):
+    """Serialize a page of posts with a fixed number of queries.
+
+    Before rendering, the page's author summaries and the requesting
+    user's reactions and bookmarks are loaded in bulk and handed to the child
+    serializer, whose SerializerMethodFields read from those maps instead of
+    querying per post. Reaction and comment totals come from the post's
+    denormalized counters.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        posts = list(iterable)
+        self.child._batch = self._load_batch(posts)
+        try:
+            return [self.child.to_representation(post) for post in posts]
+        finally:
+            self.child._batch = None
+
+    def _load_batch(self, posts):
+        from .models import PostReaction, PostBookmark
+
+        batch = {'user_reactions': {}, 'bookmarked_ids': set()}
+        post_ids = [p.id for p in posts]
+        if not post_ids:
+            return batch
+
+        # Author summaries for the page in one cache round trip (misses in one query)
+        author_ids = {p.author_id for p in posts if p.author_id}
+        summaries = self.context.setdefault('author_summaries', {})
+        summaries.update(dict.fromkeys(author_ids))
+        summaries.update(AuthorSummary.get_many(author_ids))
+
+        request = self.context.get('request')
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            batch['user_reactions'] = dict(
+                PostReaction.objects.filter(post_id__in=post_ids, user=user).values_list('post_id', 'reaction_type')
+            )
+            batch['bookmarked_ids'] = set(
+                PostBookmark.objects.filter(post_id__in=post_ids, user=user).values_list('post_id', flat=True)
+            )
+        return batch
+
+
+class PostSerializer(AuthorSummaryMixin, serializers.ModelSerializer):
     # Author is set server-side from the authenticated user
     author = serializers.PrimaryKeyRelatedField(read_only=True)
     # allow frontend to omit group (general feed)
@@ -329,11 +370,19 @@ class PostSerializer(serializers.ModelSerializer):
     user_reaction = serializers.SerializerMethodField()
     comments_count = serializers.SerializerMethodField()
     bookmarks_count = serializers.SerializerMethodField()
+    is_bookmarked = serializers.SerializerMethodField()
+
+    # Populated by PostListSerializer while rendering a page of posts
+    _batch = None
 
     class Meta:
         model = Post
         fields = '__all__'
-        read_only_fields = ('author', 'is_sponsored', 'sponsored_campaign')
+        list_serializer_class = PostListSerializer
+        read_only_fields = (
+            'author', 'is_sponsored', 'sponsored_campaign',
+            'reactions_count', 'reaction_breakdown', 'mentions_count',
+        )
 
     def to_internal_value(self, data):
         """
@@ -480,120 +529,66 @@ class PostSerializer(serializers.ModelSerializer):
             return data
 
     def get_bookmarks_count(self, obj):
-        try:
-            return obj.bookmarks.count()
-        except Exception:
-            return 0
+        return getattr(obj, 'bookmarks_count', 0) or 0
 
     def get_author_name(self, obj):
         try:
-            user = getattr(obj, 'author', None)
-            # look for common profile attributes across apps
-            for attr in ('community_profile', 'profile', 'userprofile'):
-                profile = getattr(user, attr, None)
-                if profile:
-                    full = getattr(profile, 'full_name', None) or getattr(profile, 'name', None)
-                    if full:
-                        return full
-            # attempt to compose from first_name/last_name if available on user
-            first = getattr(user, 'first_name', '')
-            last = getattr(user, 'last_name', '')
-            if first or last:
-                return f"{first} {last}".strip()
-            # last fallback: username or email
-            return getattr(user, 'username', None) or getattr(user, 'email', None) or str(user)
+            summary = self.author_summary(obj)
+            return summary['name'] if summary else None
         except Exception:
             return None
 
     def get_author_avatar(self, obj):
         try:
-            user = getattr(obj, 'author', None)
-            avatar_url = None
-            avatar_obj = None
-            
-            # Try to get avatar from profile
-            for attr in ('community_profile', 'profile', 'userprofile'):
-                profile = getattr(user, attr, None)
-                if profile:
-                    avatar_url = getattr(profile, 'avatar_url', None)
-                    if avatar_url:
-                        return avatar_url
-                    avatar_obj = getattr(profile, 'avatar', None)
-                    if avatar_obj:
-                        break
-            
-            # Try to get avatar directly from user
-            if not avatar_obj:
-                avatar_url = getattr(user, 'avatar_url', None)
-                if avatar_url:
-                    return avatar_url
-                avatar_obj = getattr(user, 'avatar', None)
-            
-            # Build URL from avatar object if available
-            if avatar_obj and hasattr(avatar_obj, 'url'):
-                url = avatar_obj.url
-                request = self.context.get('request')
-                if request and isinstance(url, str) and url.startswith('/'):
-                    return request.build_absolute_uri(url)
-                return url
-            
-            return None
+            return self.author_avatar(self.author_summary(obj))
         except Exception:
             return None
 
     def get_author_role(self, obj):
         try:
-            user = getattr(obj, 'author', None)
-            for attr in ('community_profile', 'profile', 'userprofile'):
-                profile = getattr(user, attr, None)
-                if profile:
-                    return getattr(profile, 'role', None)
-            return getattr(user, 'role', None) or None
+            summary = self.author_summary(obj)
+            return summary['role'] if summary else None
         except Exception:
             return None
 
     def get_author_verified(self, obj):
         try:
-            user = getattr(obj, 'author', None)
-            for attr in ('community_profile', 'profile', 'userprofile'):
-                profile = getattr(user, attr, None)
-                if profile:
-                    return getattr(profile, 'is_verified_corporate', False)
-            return False
+            summary = self.author_summary(obj)
+            return summary['verified'] if summary else False
         except Exception:
             return False
 
     def get_reaction_counts(self, obj):
-        try:
-            counts = {}
-            for rtype, _ in getattr(obj, 'postreaction_set', []):
-                pass
-        except Exception:
-            pass
-        # safer: aggregate from related model
-        try:
-            qs = obj.reactions.values('reaction_type').order_by().annotate(count=models.Count('id'))
-            return {item['reaction_type']: item['count'] for item in qs}
-        except Exception:
-            return {}
+        # Per-type counts are kept on the post by community.counter_signals
+        return dict(getattr(obj, 'reaction_breakdown', None) or {})
 
     def get_user_reaction(self, obj):
         try:
             request = self.context.get('request')
             if not request or not request.user.is_authenticated:
                 return None
+            if self._batch is not None:
+                return self._batch['user_reactions'].get(obj.id)
             pr = obj.reactions.filter(user=request.user).first()
             return pr.reaction_type if pr else None
         except Exception:
             return None
 
-    def get_comments_count(self, obj):
+    def get_is_bookmarked(self, obj):
         try:
-            return obj.comments.count()
+            request = self.context.get('request')
+            if not request or not request.user.is_authenticated:
+                return False
+            if self._batch is not None:
+                return obj.id in self._batch['bookmarked_ids']
+            return obj.bookmarks.filter(user=request.user).exists()
         except Exception:
-            return 0
+            return False
+
+    def get_comments_count(self, obj):
+        return getattr(obj, 'comments_count', 0) or 0
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(AuthorSummaryMixin, serializers.ModelSerializer):
     # accept id fields from frontend and map them appropriately
     post_id = serializers.PrimaryKeyRelatedField(source='post', queryset=Post.objects.all(), write_only=True, required=False)
     parent_comment_id = serializers.PrimaryKeyRelatedField(source='parent_comment', queryset=Comment.objects.all(), write_only=True, required=False, allow_null=True)
@@ -617,121 +612,28 @@ class CommentSerializer(serializers.ModelSerializer):
 
     def get_author_name(self, obj):
         try:
-            user = getattr(obj, 'author', None)
-            for attr in ('community_profile', 'profile', 'userprofile'):
-                profile = getattr(user, attr, None)
-                if profile:
-                    full = getattr(profile, 'full_name', None) or getattr(profile, 'name', None)
-                    if full:
-                        return full
-            full = getattr(user, 'full_name', None)
-            if full:
-                return full
-            first = getattr(user, 'first_name', '')
-            last = getattr(user, 'last_name', '')
-            if first or last:
-                return f"{first} {last}".strip()
-            return getattr(user, 'username', None) or getattr(user, 'email', None) or str(user)
+            summary = self.author_summary(obj)
+            return summary['name'] if summary else None
         except Exception:
             return None
 
     def get_author_avatar(self, obj):
         try:
-            user = getattr(obj, 'author', None)
-            avatar_url = None
-            avatar_obj = None
-            
-            # Try to get avatar from profile
-            for attr in ('community_profile', 'profile', 'userprofile'):
-                profile = getattr(user, attr, None)
-                if profile:
-                    avatar_url = getattr(profile, 'avatar_url', None)
-                    if avatar_url:
-                        return avatar_url
-                    avatar_obj = getattr(profile, 'avatar', None)
-                    if avatar_obj:
-                        break
-            
-            # Try to get avatar directly from user
-            if not avatar_obj:
-                avatar_url = getattr(user, 'avatar_url', None)
-                if avatar_url:
-                    return avatar_url
-                avatar_obj = getattr(user, 'avatar', None)
-            
-            # Build URL from avatar object if available
-            if avatar_obj and hasattr(avatar_obj, 'url'):
-                url = avatar_obj.url
-                request = self.context.get('request')
-                if request and isinstance(url, str) and url.startswith('/'):
-                    return request.build_absolute_uri(url)
-                return url
-            
-            return None
+            return self.author_avatar(self.author_summary(obj))
         except Exception:
             return None
 
-    def to_representation(self, obj):
-        """Return sanitized representation for Comment to avoid leaking binary blobs.
-
-        Some profile avatar fields have contained raw binary (JFIF/ICC) in the DB which
-        previously made it into API JSON. Defensive sanitization mirrors PostSerializer's
-        approach but is scoped to fields commonly used by the frontend (author_avatar,
-        replied_to_name, etc.).
-        """
-        data = super().to_representation(obj)
-        logger = logging.getLogger(__name__)
-
-        def _is_binary_like(v: Any) -> bool:
-            # heuristic: presence of non-printable characters typical of binary blobs
-            if v is None:
-                return False
-            if isinstance(v, (bytes, bytearray, memoryview)):
-                return True
-            if not isinstance(v, str):
-                return False
-            # if the string contains many non-printable chars or the JFIF/ICC markers,
-            # treat it as binary-like
-            if '\u0000' in v or 'JFIF' in v or 'ICC_PROFILE' in v:
-                return True
-            # if more than 30% of chars are non-printable, consider it binary
-            non_print = sum(1 for ch in v if ord(ch) < 32 or ord(ch) > 126)
-            try:
-                ratio = non_print / max(1, len(v))
-            except Exception:
-                ratio = 0
-            return ratio > 0.3
-
-        try:
-            avat = data.get('author_avatar')
-            if _is_binary_like(avat):
-                post_id = getattr(obj, 'id', None)
-                logger.warning('Dropping binary-like author_avatar for comment=%s', post_id)
-                data['author_avatar'] = None
-        except Exception:
-            pass
-
-        return data
-
     def get_author_verified(self, obj):
         try:
-            user = getattr(obj, 'author', None)
-            for attr in ('community_profile', 'profile', 'userprofile'):
-                profile = getattr(user, attr, None)
-                if profile:
-                    return getattr(profile, 'is_verified_corporate', False)
-            return False
+            summary = self.author_summary(obj)
+            return summary['verified'] if summary else False
         except Exception:
             return False
 
     def get_author_role(self, obj):
         try:
-            user = getattr(obj, 'author', None)
-            for attr in ('community_profile', 'profile', 'userprofile'):
-                profile = getattr(user, attr, None)
-                if profile:
-                    return getattr(profile, 'role', None)
-            return getattr(user, 'role', None) or None
+            summary = self.author_summary(obj)
+            return summary['role'] if summary else None
         except Exception:
             return None
 
@@ -740,18 +642,8 @@ class CommentSerializer(serializers.ModelSerializer):
             parent = getattr(obj, 'parent_comment', None)
             if not parent:
                 return None
-            user = getattr(parent, 'author', None)
-            for attr in ('community_profile', 'profile', 'userprofile'):
-                profile = getattr(user, attr, None)
-                if profile:
-                    full = getattr(profile, 'full_name', None) or getattr(profile, 'name', None)
-                    if full:
-                        return full
-            first = getattr(user, 'first_name', '')
-            last = getattr(user, 'last_name', '')
-            if first or last:
-                return f"{first} {last}".strip()
-            return getattr(user, 'username', None) or getattr(user, 'email', None) or str(user)
+            summary = self.author_summary(parent)
+            return summary['name'] if summary else None
         except Exception:
             return None
 
@@ -935,7 +827,7 @@ except Exception:
     pass
 
 
-class OpportunityApplicationSerializer(serializers.ModelSerializer):
+class OpportunityApplicationSerializer(AuthorSummaryMixin, serializers.ModelSerializer):
     """Base serializer for opportunity applications"""
     applicant_name = serializers.CharField(source='applicant.username', read_only=True)
     applicant_email = serializers.EmailField(source='applicant.email', read_only=True)
@@ -961,19 +853,20 @@ class OpportunityApplicationSerializer(serializers.ModelSerializer):
     def get_applicant_profile(self, obj):
         """Get basic profile info for applicant"""
         try:
-            profile = getattr(obj.applicant, 'profile', None)
-            if profile:
+            summary = self.author_summary(obj, 'applicant')
+            if summary and summary['profile']:
+                profile = summary['profile']
                 return {
-                    'full_name': getattr(profile, 'full_name', ''),
-                    'bio': getattr(profile, 'bio', ''),
-                    'avatar_url': getattr(profile, 'avatar_url', '') or (str(getattr(profile, 'avatar', '')) if hasattr(profile, 'avatar') else ''),
+                    'full_name': profile['full_name'],
+                    'bio': profile['bio'],
+                    'avatar_url': summary['avatar'] or '',
                 }
             return {}
         except Exception:
             return {}
 
 
-class ApplicationDetailSerializer(serializers.ModelSerializer):
+class ApplicationDetailSerializer(AuthorSummaryMixin, serializers.ModelSerializer):
     """Detailed serializer for corporate dashboard - shows all application details"""
     applicant_name = serializers.CharField(source='applicant.username', read_only=True)
     applicant_email = serializers.EmailField(source='applicant.email', read_only=True)
@@ -1002,14 +895,15 @@ class ApplicationDetailSerializer(serializers.ModelSerializer):
     def get_applicant_profile(self, obj):
         """Get detailed profile info for applicant"""
         try:
-            profile = getattr(obj.applicant, 'profile', None)
-            if profile:
+            summary = self.author_summary(obj, 'applicant')
+            if summary and summary['profile']:
+                profile = summary['profile']
                 return {
-                    'full_name': getattr(profile, 'full_name', ''),
-                    'bio': getattr(profile, 'bio', ''),
-                    'avatar_url': getattr(profile, 'avatar_url', '') or (str(getattr(profile, 'avatar', '')) if hasattr(profile, 'avatar') else ''),
-                    'country': getattr(profile, 'country', ''),
-                    'company_name': getattr(profile, 'company_name', ''),
+                    'full_name': profile['full_name'],
+                    'bio': profile['bio'],
+                    'avatar_url': summary['avatar'] or '',
+                    'country': profile['country'],
+                    'company_name': profile['company_name'],
                 }
             return {}
         except Exception:
@@ -1024,7 +918,7 @@ except Exception:
     pass
 
 
-class CollaborationRequestSerializer(serializers.ModelSerializer):
+class CollaborationRequestSerializer(AuthorSummaryMixin, serializers.ModelSerializer):
     requester_name = serializers.CharField(source='requester.username', read_only=True)
     recipient_name = serializers.CharField(source='recipient.username', read_only=True)
     requester_email = serializers.EmailField(source='requester.email', read_only=True)
@@ -1045,15 +939,10 @@ class CollaborationRequestSerializer(serializers.ModelSerializer):
     def get_requester_profile(self, obj):
         """Get basic profile info for requester"""
         try:
-            profile = getattr(obj.requester, 'profile', None)
-            if profile:
-                return {
-                    'full_name': getattr(profile, 'full_name', ''),
-                    'company_name': getattr(profile, 'company_name', ''),
-                    'industry': getattr(profile, 'industry', ''),
-                    'country': getattr(profile, 'country', ''),
-                    'phone': getattr(profile, 'phone', '') or getattr(profile, 'contact_phone', ''),
-                }
+            summary = self.author_summary(obj, 'requester')
+            if summary and summary['profile']:
+                profile = summary['profile']
+                return {field: profile[field] for field in ('full_name', 'company_name', 'industry', 'country', 'phone')}
             return {}
         except Exception:
             return {}
@@ -1061,15 +950,10 @@ class CollaborationRequestSerializer(serializers.ModelSerializer):
     def get_recipient_profile(self, obj):
         """Get basic profile info for recipient"""
         try:
-            profile = getattr(obj.recipient, 'profile', None)
-            if profile:
-                return {
-                    'full_name': getattr(profile, 'full_name', ''),
-                    'company_name': getattr(profile, 'company_name', ''),
-                    'industry': getattr(profile, 'industry', ''),
-                    'country': getattr(profile, 'country', ''),
-                    'phone': getattr(profile, 'phone', '') or getattr(profile, 'contact_phone', ''),
-                }
+            summary = self.author_summary(obj, 'recipient')
+            if summary and summary['profile']:
+                profile = summary['profile']
+                return {field: profile[field] for field in ('full_name', 'company_name', 'industry', 'country', 'phone')}
             return {}
         except Exception:
             return {}
@@ -1257,10 +1141,10 @@ class CorporateVerificationSubmissionSerializer(serializers.Serializer):
 
 
 # Corporate Messaging Serializers
-class CorporateMessageSerializer(serializers.ModelSerializer):
-    sender_name = serializers.CharField(source='sender.profile.full_name', read_only=True)
+class CorporateMessageSerializer(AuthorSummaryMixin, serializers.ModelSerializer):
+    sender_name = serializers.SerializerMethodField()
     sender_email = serializers.CharField(source='sender.email', read_only=True)
-    recipient_name = serializers.CharField(source='recipient.profile.full_name', read_only=True)
+    recipient_name = serializers.SerializerMethodField()
     recipient_email = serializers.CharField(source='recipient.email', read_only=True)
     
     class Meta:
@@ -1270,6 +1154,16 @@ class CorporateMessageSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'sender_name', 'sender_email', 
                            'recipient_name', 'recipient_email']
 
+    def _profile_name(self, obj, field):
+        summary = self.author_summary(obj, field)
+        return summary['profile']['full_name'] if summary and summary['profile'] else None
+
+    def get_sender_name(self, obj):
+        return self._profile_name(obj, 'sender')
+
+    def get_recipient_name(self, obj):
+        return self._profile_name(obj, 'recipient')
+
 
 # Attach CorporateMessage model if available
 try:
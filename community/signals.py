@@ -1,9 +1,13 @@
+from django.conf import settings
 from django.dispatch import receiver
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from accounts.models import UserProfile
 
 from payments.models import Subscription
-from .models import CollaborationRequest
+from utils.pubsub import publish
+from .author_summary import AuthorSummary
+from .models import CollaborationRequest, Post
 
 @receiver(post_save, sender=Subscription)
 def handle_subscription_change(sender, instance, created, **kwargs):
@@ -130,64 +134,33 @@ def send_collaboration_notification(sender, instance, created, **kwargs):
         logger.warning(f"Failed to send collaboration notification: {e}")
 
 
-# Additional engagement logging signals
-from django.db.models.signals import post_delete
-import logging
-logger = logging.getLogger(__name__)
-
-try:
-    from .models import PostReaction, Comment, PostBookmark, GroupMembership, EngagementLog
-except Exception:
-    PostReaction = None
-    Comment = None
-    PostBookmark = None
-    GroupMembership = None
-    EngagementLog = None
-
-
-@receiver(post_save)
-def log_engagement_on_create(sender, instance, created, **kwargs):
-    try:
-        if not created:
-            return
-        if PostReaction is not None and sender == PostReaction:
-            try:
-                EngagementLog.objects.create(user=instance.user, action_type='like', post=instance.post, metadata={'reaction_type': getattr(instance, 'reaction_type', None)})
-            except Exception:
-                logger.exception('Failed to create engagement log for PostReaction')
-            return
-
-        if Comment is not None and sender == Comment:
-            try:
-                EngagementLog.objects.create(user=instance.author, action_type='comment', post=instance.post, comment=instance)
-            except Exception:
-                logger.exception('Failed to create engagement log for Comment')
-            return
-
-        if PostBookmark is not None and sender == PostBookmark:
-            try:
-                EngagementLog.objects.create(user=instance.user, action_type='bookmark', post=instance.post)
-            except Exception:
-                logger.exception('Failed to create engagement log for PostBookmark')
-            return
-
-        if GroupMembership is not None and sender == GroupMembership:
-            try:
-                EngagementLog.objects.create(user=instance.user, action_type='group_join', group=instance.group)
-            except Exception:
-                logger.exception('Failed to create engagement log for GroupMembership')
-            return
-    except Exception:
-        logger.exception('Unhandled error in log_engagement_on_create')
-
-
-@receiver(post_delete)
-def log_engagement_on_delete(sender, instance, **kwargs):
-    try:
-        if PostReaction is not None and sender == PostReaction:
-            try:
-                EngagementLog.objects.create(user=getattr(instance, 'user', None), action_type='unlike', post=getattr(instance, 'post', None))
-            except Exception:
-                logger.exception('Failed to create engagement log for PostReaction deletion')
-    except Exception:
-        logger.exception('Unhandled error in log_engagement_on_delete')
+@receiver(post_save, sender=Post)
+def push_new_public_post(sender, instance, created, **kwargs):
+    """Tell event stream clients about a new post in the global feed."""
+    if not created or instance.feed_visibility != 'public_global' or not instance.is_approved:
+        return
+    message = {
+        'type': 'post.created',
+        'id': instance.id,
+        'author_id': instance.author_id,
+        'group_id': instance.group_id,
+        'created_at': instance.created_at,
+    }
+    transaction.on_commit(lambda: publish('feed', message))
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def refresh_author_summary(sender, instance, **kwargs):
+    """Drop the cached author summary once profile changes are committed."""
+    user_id = instance.user_id
+    transaction.on_commit(lambda: AuthorSummary.forget(user_id))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def refresh_user_summary(sender, instance, update_fields=None, **kwargs):
+    # Logins only touch last_login, which summaries don't show
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    user_id = instance.pk
+    transaction.on_commit(lambda: AuthorSummary.forget(user_id))
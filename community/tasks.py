@@ -2,11 +2,12 @@
 Async tasks for community engagement.
 
 This module provides async task support for long-running operations.
-Currently uses threading; can be upgraded to Celery for production.
+Tasks are stored in the durable job queue (``utils.jobs``) and run by
+``manage.py runworker``, so they survive restarts and stay out of the
+request process. Task arguments must be JSON serialisable (pass ids).
 """
 
-import threading
-from django.conf import settings
+from utils.jobs import enqueue
 
 
 def send_notification_email_async(notification_id):
@@ -14,11 +15,11 @@ def send_notification_email_async(notification_id):
     Send a notification email asynchronously.
     
     Can be called with:
-    - threading.Thread if Celery not configured
+    - AsyncTaskRunner.run (durable job queue)
     - Celery shared_task if Celery is configured
     """
     try:
-        from .models import EngagementNotification
+        from .engagement import EngagementNotification
         from .notification_service import NotificationService
         
         notification = EngagementNotification.objects.get(id=notification_id)
@@ -32,7 +33,7 @@ def send_notification_in_app_async(notification_id):
     Send an in-app notification asynchronously.
     """
     try:
-        from .models import EngagementNotification
+        from .engagement import EngagementNotification
         from .notification_service import NotificationService
         
         notification = EngagementNotification.objects.get(id=notification_id)
@@ -59,7 +60,7 @@ def update_user_reputation_async(user_id):
     Update user reputation asynchronously.
     """
     try:
-        from .models import UserReputation
+        from .engagement import UserReputation
         
         reputation = UserReputation.objects.get(user_id=user_id)
         reputation.update_reputation()
@@ -67,27 +68,27 @@ def update_user_reputation_async(user_id):
         print(f"Error updating user reputation: {e}")
 
 
+def deliver_engagement_notification(notification_id):
+    """
+    Deliver an engagement notification over the user's enabled channels.
+    """
+    from .engagement import EngagementNotification
+    from .notification_service import NotificationService
+    
+    notification = EngagementNotification.objects.select_related('user', 'triggered_by').get(id=notification_id)
+    NotificationService._send_notifications_async(notification)
+
+
 class AsyncTaskRunner:
     """
     Helper class to run tasks asynchronously.
     
-    Supports both threading (default) and Celery (if configured).
+    Uses the durable job queue from ``utils.jobs``.
     """
     
     @staticmethod
     def run(task_func, *args, **kwargs):
         """
-        Run a task asynchronously.
-        
-        If Celery is configured, uses Celery; otherwise uses threading.
+        Queue a task for a background worker and return the Job.
         """
-        # Use threading by default (simple, works without external dependencies)
-        thread = threading.Thread(
-            target=task_func,
-            args=args,
-            kwargs=kwargs,
-            daemon=True
-        )
-        thread.start()
-        
-        return thread
+        return enqueue(task_func, *args, **kwargs)
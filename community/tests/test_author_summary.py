@@ -0,0 +1,41 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from accounts.models import UserProfile
+from community.author_summary import AuthorSummary
+
+
+class AuthorSummaryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(username=f'summary{i}', email=f'summary{i}@e.com', password='pass')
+            for i in range(3)
+        ]
+        self.profile, _ = UserProfile.objects.update_or_create(
+            user=self.users[0], defaults={'full_name': 'Ada Obi', 'avatar_url': '/media/avatars/ada.png'},
+        )
+
+    def test_get_many_loads_misses_in_one_query_then_hits_cache(self):
+        ids = [user.id for user in self.users]
+        with self.assertNumQueries(1):
+            summaries = AuthorSummary.get_many(ids)
+        self.assertEqual(summaries[ids[0]]['name'], 'Ada Obi')
+        self.assertEqual(summaries[ids[0]]['avatar'], '/media/avatars/ada.png')
+        self.assertEqual(summaries[ids[1]]['name'], 'summary1')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(AuthorSummary.get_many(ids), summaries)
+
+    def test_profile_save_refreshes_summary(self):
+        AuthorSummary.get(self.users[0].id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.full_name = 'Ada O.'
+            self.profile.save()
+        self.assertEqual(AuthorSummary.get(self.users[0].id)['name'], 'Ada O.')
+
+    def test_binary_avatar_is_dropped(self):
+        UserProfile.objects.filter(pk=self.profile.pk).update(avatar_url='\x00\x10JFIF\x00')
+        self.assertIsNone(AuthorSummary.get(self.users[0].id)['avatar'])
@@ -4,7 +4,7 @@ from django.utils import timezone
 from datetime import timedelta
 
 from accounts.models import User, UserToken
-from .models import Group, GroupMembership
+from community.models import Group, GroupMembership
 
 
 class CommunityTests(TestCase):
@@ -0,0 +1,72 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from community.models import Post, PostReaction, PostBookmark, Comment
+
+
+class PostCounterTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username='counter', email='counter@e.com', password='pass')
+        self.other = User.objects.create_user(username='counter2', email='counter2@e.com', password='pass')
+        self.post = Post.objects.create(author=self.user, content='count me', feed_visibility='public_global')
+
+    def test_write_paths_maintain_counters(self):
+        reaction = PostReaction.objects.create(post=self.post, user=self.user, reaction_type='like')
+        PostReaction.objects.create(post=self.post, user=self.other, reaction_type='love')
+        Comment.objects.create(post=self.post, author=self.other, content='hi')
+        bookmark = PostBookmark.objects.create(post=self.post, user=self.other)
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.reactions_count, 2)
+        self.assertEqual(self.post.reaction_breakdown, {'like': 1, 'love': 1})
+        self.assertEqual(self.post.comments_count, 1)
+        self.assertEqual(self.post.bookmarks_count, 1)
+
+        # Switching reaction type moves the breakdown but not the total
+        reaction.reaction_type = 'love'
+        reaction.save()
+        bookmark.delete()
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.reactions_count, 2)
+        self.assertEqual(self.post.reaction_breakdown, {'love': 2})
+        self.assertEqual(self.post.bookmarks_count, 0)
+
+    def test_full_save_does_not_clobber_counters(self):
+        stale = Post.objects.get(pk=self.post.pk)
+        Comment.objects.create(post=self.post, author=self.other, content='hi')
+        stale.title = 'edited'
+        stale.save()
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 1)
+        self.assertEqual(self.post.title, 'edited')
+
+    def test_full_save_keeps_flushed_views(self):
+        from utils.counter_buffer import counter_buffer
+
+        stale = Post.objects.get(pk=self.post.pk)
+        self.post.increment_view()
+        counter_buffer.flush()
+        stale.title = 'edited'
+        stale.save()
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 1)
+
+    def test_reconcile_command_repairs_drift(self):
+        PostReaction.objects.create(post=self.post, user=self.user, reaction_type='like')
+        Post.objects.filter(pk=self.post.pk).update(reactions_count=7, reaction_breakdown={}, comments_count=3)
+
+        out = StringIO()
+        call_command('reconcile_post_counters', stdout=out)
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.reactions_count, 1)
+        self.assertEqual(self.post.reaction_breakdown, {'like': 1})
+        self.assertEqual(self.post.comments_count, 0)
+        self.assertIn('1 post(s) repaired', out.getvalue())
@@ -0,0 +1,33 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from community.dirty_posts import get_dirty_post_queue
+from community.models import Post, PostReaction
+
+
+class DirtyPostQueueTests(TestCase):
+    def setUp(self):
+        self.queue = get_dirty_post_queue()
+        self.queue.drain()
+        User = get_user_model()
+        self.user = User.objects.create_user(username='dirty', email='dirty@e.com', password='pass')
+        self.post = Post.objects.create(author=self.user, content='touch me', feed_visibility='public_global')
+
+    def test_view_does_not_touch_the_database(self):
+        # The view itself is buffered; see utils.counter_buffer
+        with self.assertNumQueries(0):
+            self.post.increment_view()
+        self.assertIn(self.post.id, self.queue.drain())
+
+    def test_reactions_coalesce_into_one_rerank(self):
+        other = get_user_model().objects.create_user(username='dirty2', email='dirty2@e.com', password='pass')
+        PostReaction.objects.create(post=self.post, user=self.user, reaction_type='like')
+        PostReaction.objects.create(post=self.post, user=other, reaction_type='like')
+        self.post.increment_view()
+        self.assertEqual(self.queue.pending(), 1)
+
+        self.assertEqual(self.queue.flush(), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.engagement_score, 2.0)
+        self.assertGreater(self.post.ranking_score, 0)
+        self.assertEqual(self.queue.pending(), 0)
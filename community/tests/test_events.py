@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from community.dirty_posts import get_dirty_post_queue
+from community.engagement import CommunityEngagementLog, EngagementNotification
+from community.events import engagement_bus
+from community.models import Comment, Post, PostReaction
+from promotions.models import EngagementLog
+from utils.ingestion import ingest_pipeline
+
+
+@override_settings(INGEST_BACKGROUND_FLUSH=False)
+class EngagementEventBusTests(TestCase):
+    def setUp(self):
+        # Rows buffered by earlier tests point at rows rolled back since
+        ingest_pipeline.discard()
+        self.queue = get_dirty_post_queue()
+        self.queue.drain()
+        User = get_user_model()
+        self.author = User.objects.create_user(username='bus_author', email='bus_author@e.com', password='pass')
+        self.fan = User.objects.create_user(username='bus_fan', email='bus_fan@e.com', password='pass')
+        self.post = Post.objects.create(author=self.author, content='hello', feed_visibility='public_global')
+        self.seen = []
+        engagement_bus.subscribe('test_recorder', self.seen.extend)
+        self.addCleanup(engagement_bus.unsubscribe, 'test_recorder')
+
+    def test_like_is_written_once_and_fanned_out_to_subscribers(self):
+        PostReaction.objects.create(post=self.post, user=self.fan, reaction_type='like')
+        self.assertEqual(ingest_pipeline.flush(), 1)
+
+        logs = CommunityEngagementLog.objects.filter(post=self.post, action_type='like_post')
+        self.assertEqual(logs.count(), 1)
+        self.assertFalse(EngagementLog.objects.filter(post=self.post).exists())
+        self.assertEqual([log.pk for log in self.seen], [logs.get().pk])
+
+        notification = EngagementNotification.objects.get(user=self.author)
+        self.assertEqual(notification.notification_type, 'post_liked')
+        self.assertEqual(notification.engagement_log_id, logs.get().pk)
+        self.assertIn(self.post.id, self.queue.drain())
+
+    def test_reply_notifies_post_and_parent_authors(self):
+        parent = Comment.objects.create(post=self.post, author=self.fan, content='first')
+        ingest_pipeline.flush()
+        replier = get_user_model().objects.create_user(username='bus_reply', email='bus_reply@e.com', password='pass')
+        Comment.objects.create(post=self.post, author=replier, content='second', parent_comment=parent)
+        ingest_pipeline.flush()
+
+        received = set(
+            EngagementNotification.objects.filter(triggered_by=replier).values_list('user__username', 'notification_type')
+        )
+        self.assertEqual(received, {('bus_author', 'post_commented'), ('bus_fan', 'comment_replied')})
+
+    def test_failing_subscriber_does_not_block_the_others(self):
+        def broken(events):
+            raise RuntimeError('boom')
+
+        engagement_bus.subscribe('broken', broken)
+        self.addCleanup(engagement_bus.unsubscribe, 'broken')
+        PostReaction.objects.create(post=self.post, user=self.fan, reaction_type='like')
+        ingest_pipeline.flush()
+        self.assertEqual(len(self.seen), 1)
+
+    def test_notifications_survive_backends_without_bulk_insert_keys(self):
+        # MySQL can't return primary keys from bulk_create
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert',
+                               new_callable=mock.PropertyMock, return_value=False):
+            PostReaction.objects.create(post=self.post, user=self.fan, reaction_type='like')
+            self.assertEqual(ingest_pipeline.flush(), 1)
+
+        log = CommunityEngagementLog.objects.get(post=self.post, action_type='like_post')
+        notification = EngagementNotification.objects.get(user=self.author)
+        self.assertEqual(notification.engagement_log_id, log.pk)
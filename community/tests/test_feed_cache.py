@@ -0,0 +1,88 @@
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from community.feed_cache import FeedCache
+from community.models import Post
+from utils.ingestion import ingest_pipeline
+
+
+def _run_inline(func, *args, **kwargs):
+    func(*args, **kwargs)
+
+
+class FeedCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().get('/api/community/posts/', {'page_size': 5})
+        self.request.user = AnonymousUser()
+        self.builds = []
+
+    def build(self):
+        self.builds.append(1)
+        return {'build': len(self.builds)}
+
+    def test_generation_bump_serves_stale_and_refreshes(self):
+        self.assertEqual(FeedCache.get_or_build(self.request, self.build), {'build': 1})
+        self.assertEqual(FeedCache.get_or_build(self.request, self.build), {'build': 1})
+
+        FeedCache.bump_generation()
+        with mock.patch('community.feed_cache.submit_task', _run_inline):
+            self.assertEqual(FeedCache.get_or_build(self.request, self.build), {'build': 1})
+        self.assertEqual(FeedCache.get_or_build(self.request, self.build), {'build': 2})
+
+    def test_concurrent_misses_build_once(self):
+        def slow_build():
+            time.sleep(0.2)
+            return self.build()
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(FeedCache.get_or_build(self.request, slow_build)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.builds), 1)
+        self.assertEqual(results, [{'build': 1}] * 5)
+
+
+class FeedCacheViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.author = User.objects.create_user(username='cached', email='cached@e.com', password='pass')
+        self.client.force_authenticate(self.author)
+
+    def tearDown(self):
+        # Post views queue engagement rows for users the test rolls back
+        ingest_pipeline.discard()
+
+    def test_new_post_shows_up_for_its_author_immediately(self):
+        first = Post.objects.create(author=self.author, content='first', feed_visibility='public_global')
+        resp = self.client.get(reverse('post-list'))
+        self.assertEqual([p['id'] for p in resp.data], [first.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second = Post.objects.create(author=self.author, content='second', feed_visibility='public_global')
+        resp = self.client.get(reverse('post-list'))
+        self.assertEqual([p['id'] for p in resp.data], [second.id, first.id])
+
+    def test_post_detail_is_invalidated_by_edits(self):
+        post = Post.objects.create(author=self.author, content='before', feed_visibility='public_global')
+        self.assertEqual(self.client.get(reverse('post-detail', args=[post.id])).data['content'], 'before')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post.content = 'after'
+            post.save()
+        self.assertEqual(self.client.get(reverse('post-detail', args=[post.id])).data['content'], 'after')
@@ -0,0 +1,36 @@
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase
+
+from accounts.models import UserProfile
+from community.identity import Identity, profile_of
+from community.permissions import IsCommunityMember
+
+
+class IdentityTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username='ident', email='ident@e.com', password='pass')
+        UserProfile.objects.update_or_create(user=self.user, defaults={'full_name': 'Ident', 'community_approved': True})
+        # A fresh instance, as token authentication would hand it over
+        self.user = User.objects.get(pk=self.user.pk)
+
+    def request(self, method='post'):
+        request = getattr(RequestFactory(), method)('/api/community/posts/')
+        request.user = self.user
+        return request
+
+    def test_profile_is_resolved_once_per_request(self):
+        request = self.request()
+        with self.assertNumQueries(1):
+            self.assertTrue(IsCommunityMember().has_permission(request, None))
+            self.assertTrue(IsCommunityMember().has_permission(request, None))
+            self.assertEqual(Identity.for_request(request).profile.full_name, 'Ident')
+            self.assertIs(profile_of(self.user), Identity.for_request(request).profile)
+
+    def test_reads_skip_the_profile_lookup(self):
+        with self.assertNumQueries(0):
+            self.assertTrue(IsCommunityMember().has_permission(self.request('get'), None))
+
+    def test_unapproved_profile_cannot_write(self):
+        UserProfile.objects.filter(user=self.user).update(community_approved=False)
+        self.assertFalse(IsCommunityMember().has_permission(self.request(), None))
@@ -0,0 +1,83 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+
+from community.models import Post, Group, GroupMembership, Comment
+from utils.ingestion import ingest_pipeline
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.user = User.objects.create_user(username='scroller', email='scroller@e.com', password='pass')
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        # Comments queue engagement rows for users the test rolls back
+        ingest_pipeline.discard()
+
+    def _scroll(self, url, params):
+        seen, cursor = [], None
+        for _ in range(10):
+            query = dict(params, **({'cursor': cursor} if cursor else {}))
+            data = self.client.get(url, query).data
+            seen.extend(row['id'] for row in data['results'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        return seen
+
+    def test_global_feed_cursor_walks_every_post_once(self):
+        posts = [Post.objects.create(author=self.user, content=f'p{i}', feed_visibility='public_global') for i in range(5)]
+        seen = self._scroll(reverse('post-list'), {'page_size': 2})
+        self.assertEqual(seen, [p.id for p in reversed(posts)])
+
+    def test_group_feed_uses_ranked_keyset(self):
+        group = Group.objects.create(name='G', description='d', category='c', created_by=self.user)
+        GroupMembership.objects.create(user=self.user, group=group)
+        posts = [Post.objects.create(author=self.user, group=group, content=f'g{i}') for i in range(5)]
+        Post.objects.filter(pk=posts[0].pk).update(ranking_score=50.0)
+
+        seen = self._scroll(reverse('post-list'), {'group_id': group.id, 'page_size': 2})
+        self.assertEqual(seen, [posts[0].id] + [p.id for p in reversed(posts[1:])])
+
+        # Page numbers still work for older clients
+        data = self.client.get(reverse('post-list'), {'group_id': group.id, 'page_size': 2, 'page': 2}).data
+        self.assertEqual([row['id'] for row in data['results']], [posts[3].id, posts[2].id])
+
+    def test_ranked_cursor_survives_score_changes(self):
+        posts = [Post.objects.create(author=self.user, content=f'r{i}', feed_visibility='public_global') for i in range(6)]
+        for score, post in enumerate(posts):
+            Post.objects.filter(pk=post.pk).update(ranking_score=float(score * 10))
+        url = reverse('post-list')
+
+        first = self.client.get(url, {'page_size': 2}).data
+        self.assertEqual([row['id'] for row in first['results']], [posts[5].id, posts[4].id])
+        # The bottom post climbs to the top and an unseen one sinks below the rest
+        Post.objects.filter(pk=posts[0].pk).update(ranking_score=100.0)
+        Post.objects.filter(pk=posts[3].pk).update(ranking_score=-10.0)
+
+        seen = [row['id'] for row in first['results']]
+        seen += self._scroll(url, {'page_size': 2, 'cursor': first['next_cursor']})
+        self.assertEqual(seen, [p.id for p in reversed(posts)])
+
+    def test_ranked_cursor_continues_after_the_snapshot_expires(self):
+        posts = [Post.objects.create(author=self.user, content=f'e{i}', feed_visibility='public_global') for i in range(5)]
+        url = reverse('post-list')
+
+        first = self.client.get(url, {'page_size': 2}).data
+        cache.clear()
+        seen = [row['id'] for row in first['results']]
+        seen += self._scroll(url, {'page_size': 2, 'cursor': first['next_cursor']})
+        self.assertEqual(seen, [p.id for p in reversed(posts)])
+
+    def test_comment_thread_cursor(self):
+        post = Post.objects.create(author=self.user, content='thread', feed_visibility='public_global')
+        comments = [Comment.objects.create(post=post, author=self.user, content=f'c{i}') for i in range(3)]
+        url = reverse('post-comments', args=[post.id])
+
+        self.assertIsInstance(self.client.get(url).data, list)
+        seen = self._scroll(url, {'page_size': 2})
+        self.assertEqual(seen, [c.id for c in comments])
@@ -0,0 +1,41 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.request import Request
+
+from accounts.models import UserProfile
+from community.models import Post, PostReaction, PostBookmark
+from community.serializers import PostSerializer
+
+
+class PostListSerializerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.viewer = User.objects.create_user(username='viewer', email='viewer@e.com', password='pass')
+        self.posts = []
+        for i in range(5):
+            author = User.objects.create_user(username=f'author{i}', email=f'author{i}@e.com', password='pass')
+            UserProfile.objects.get_or_create(user=author, defaults={'full_name': f'Author {i}'})
+            self.posts.append(Post.objects.create(author=author, content=f'post {i}', feed_visibility='public_global'))
+        PostReaction.objects.create(post=self.posts[0], user=self.viewer, reaction_type='love')
+        PostBookmark.objects.create(post=self.posts[1], user=self.viewer)
+
+        wsgi_request = APIRequestFactory().get('/')
+        force_authenticate(wsgi_request, user=self.viewer)
+        self.request = Request(wsgi_request)
+        self.request.user = self.viewer
+
+    def test_page_is_serialized_with_constant_queries(self):
+        posts = list(Post.objects.filter(id__in=[p.id for p in self.posts]).order_by('id'))
+        # author summaries (users+profiles), the viewer's reactions, the viewer's bookmarks
+        with self.assertNumQueries(3):
+            data = PostSerializer(posts, many=True, context={'request': self.request}).data
+
+        by_id = {row['id']: row for row in data}
+        self.assertEqual(by_id[self.posts[0].id]['user_reaction'], 'love')
+        self.assertEqual(by_id[self.posts[0].id]['reaction_counts'], {'love': 1})
+        self.assertTrue(by_id[self.posts[1].id]['is_bookmarked'])
+        self.assertFalse(by_id[self.posts[2].id]['is_bookmarked'])
+        self.assertEqual(by_id[self.posts[3].id]['author_name'], 'Author 3')
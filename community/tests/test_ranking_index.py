@@ -0,0 +1,51 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from community.models import Post
+from community.ranking_index import InMemoryRankingIndex, get_ranking_index
+
+
+class InMemoryRankingIndexTests(TestCase):
+    def test_range_by_rank_and_atomic_increment(self):
+        index = InMemoryRankingIndex()
+        index.update(1, 5.0)
+        index.update(2, 9.0)
+        index.update(3, 1.0)
+        self.assertEqual(index.range(0, 2), [(2, 9.0), (1, 5.0)])
+
+        self.assertEqual(index.incr(3, 10), 11.0)
+        index.update(2, 0.5)
+        self.assertEqual([pid for pid, _ in index.range(0, 10)], [3, 1, 2])
+        self.assertEqual(len(index), 3)
+
+    def test_evicts_posts_older_than_max_age(self):
+        index = InMemoryRankingIndex(max_age=60)
+        now = time.time()
+        index.update(1, 5.0, created_ts=now - 3600)
+        index.update(2, 1.0, created_ts=now)
+        self.assertEqual(index.evict_expired(now), 1)
+        self.assertEqual(index.range(0, 10), [(2, 1.0)])
+
+
+class FeedPageTests(TestCase):
+    def setUp(self):
+        get_ranking_index().clear()
+        User = get_user_model()
+        self.user = User.objects.create_user(username='ranker', email='ranker@e.com', password='pass')
+
+    def test_get_feed_page_reads_index_in_rank_order(self):
+        low = Post.objects.create(author=self.user, content='low', feed_visibility='public_global')
+        high = Post.objects.create(author=self.user, content='high', feed_visibility='public_global')
+        low.ranking_score, high.ranking_score = 1.0, 2.0
+        low.cache_ranking()
+        high.cache_ranking()
+
+        page = Post.get_feed_page(page=1, page_size=1)
+        self.assertEqual([p['id'] for p in page], [high.id])
+        page = Post.get_feed_page(page=2, page_size=1)
+        self.assertEqual([p['id'] for p in page], [low.id])
+
+        low.delete()
+        self.assertEqual([pid for pid, _ in get_ranking_index().range(0, 10)], [high.id])
@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from community.engagement import CommunityEngagementLog, UserActionBucket, UserReputation
+from community.models import Post
+from community.reputation import (
+    get_dirty_user_queue, prune_buckets, record_actions, refresh_reputations,
+)
+
+
+class IncrementalReputationTests(TestCase):
+    def setUp(self):
+        self.queue = get_dirty_user_queue()
+        self.queue.drain()
+        User = get_user_model()
+        self.user = User.objects.create_user(username='rep', email='rep@e.com', password='pass')
+        self.post = Post.objects.create(author=self.user, content='p', feed_visibility='public_global')
+
+    def _logs(self, action_type, count, days_ago=0):
+        created_at = timezone.now() - timedelta(days=days_ago)
+        return [
+            CommunityEngagementLog(user=self.user, action_type=action_type, post=self.post, created_at=created_at)
+            for _ in range(count)
+        ]
+
+    def test_events_are_counted_into_daily_buckets(self):
+        record_actions(self._logs('like_post', 3))
+        record_actions(self._logs('like_post', 2) + self._logs('comment_post', 1))
+
+        buckets = dict(UserActionBucket.objects.filter(user=self.user).values_list('action_type', 'count'))
+        self.assertEqual(buckets, {'like_post': 5, 'comment_post': 1})
+        self.assertEqual(self.queue.drain(), {self.user.id})
+
+    def test_refresh_scores_from_buckets_within_the_window(self):
+        record_actions(self._logs('like_post', 4) + self._logs('comment_post', 2))
+        record_actions(self._logs('mention_user', 1, days_ago=45))
+
+        with self.assertNumQueries(3):
+            self.assertEqual(refresh_reputations([self.user.id]), 1)
+
+        reputation = UserReputation.objects.get(user=self.user)
+        self.assertEqual(reputation.reputation_score, 4 * 1 + 2 * 5)
+        self.assertEqual(reputation.total_engagement_actions, 6)
+        self.assertEqual(reputation.activity_level, 'novice')
+
+        self.assertEqual(prune_buckets(), 1)
+
+    def test_update_reputation_uses_the_scorer(self):
+        record_actions(self._logs('comment_post', 12))
+        reputation = UserReputation.objects.get_or_create(user=self.user)[0]
+        reputation.update_reputation()
+        self.assertEqual(reputation.reputation_score, 60)
+        self.assertEqual(reputation.activity_level, 'active')
@@ -0,0 +1,42 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from community.dirty_posts import get_dirty_post_queue
+from community.models import Post, PostReaction
+from community.ranking_index import get_ranking_index
+
+
+class RerankTests(TestCase):
+    def setUp(self):
+        get_ranking_index().clear()
+        User = get_user_model()
+        self.user = User.objects.create_user(username='rr', email='rr@e.com', password='pass')
+
+    def test_command_rescores_recent_posts_and_retires_stale_ones(self):
+        fresh = Post.objects.create(author=self.user, content='fresh', feed_visibility='public_global')
+        PostReaction.objects.create(post=fresh, user=self.user, reaction_type='like')
+        stale = Post.objects.create(author=self.user, content='stale', feed_visibility='public_global')
+        long_ago = timezone.now() - timedelta(days=30)
+        Post.objects.filter(pk=stale.pk).update(created_at=long_ago, last_activity_at=long_ago, ranking_score=99.0)
+        get_dirty_post_queue().drain()
+
+        out = StringIO()
+        call_command('rerank_posts', '--window-hours', '24', stdout=out)
+
+        fresh.refresh_from_db()
+        stale.refresh_from_db()
+        self.assertEqual(fresh.engagement_score, 1.0)
+        self.assertAlmostEqual(fresh.ranking_score, 10.0, places=2)
+        # Left the window: retired instead of keeping its frozen score
+        self.assertEqual(stale.ranking_score, 0.0)
+        self.assertEqual(get_ranking_index().range(0, 10)[0][0], fresh.id)
+        self.assertIn('Re-ranked 1 post(s), retired 1', out.getvalue())
+
+        out = StringIO()
+        call_command('rerank_posts', '--window-hours', '24', stdout=out)
+        self.assertIn('retired 0', out.getvalue())
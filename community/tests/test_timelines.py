@@ -0,0 +1,154 @@
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+
+from accounts.models import Follow
+from community.models import Post, Group, GroupMembership
+from community.timelines import TimelineStore
+from promotions.models import SponsorCampaign
+
+
+class TimelineTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.user = User.objects.create_user(username='reader', email='reader@e.com', password='pass')
+        self.author = User.objects.create_user(username='writer', email='writer@e.com', password='pass')
+        self.client.force_authenticate(self.user)
+        # Run fan-out tasks inline
+        patcher = mock.patch('community.timeline_signals.submit_task', lambda func, *a, **kw: func(*a, **kw))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def entry_ids(self, key):
+        return [post_id for _s, post_id in cache.get(key)['entries']]
+
+    def test_new_post_is_pushed_onto_warm_group_timeline_after_commit(self):
+        group = Group.objects.create(name='Warm', created_by=self.author)
+        first = Post.objects.create(author=self.author, group=group, content='first')
+        # Warm the timeline, then create another post
+        key = TimelineStore.group_key(group.id)
+        TimelineStore.read(key, lambda: TimelineStore.build_group(group.id))
+        with self.captureOnCommitCallbacks() as callbacks:
+            second = Post.objects.create(author=self.author, group=group, content='second')
+        self.assertEqual(self.entry_ids(key), [first.id])
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.entry_ids(key), [second.id, first.id])
+
+    def test_push_reaches_a_timeline_that_is_being_rebuilt(self):
+        group = Group.objects.create(name='Busy', created_by=self.author)
+        key = TimelineStore.group_key(group.id)
+        post = Post.objects.create(author=self.author, group=group, content='late')
+
+        def build():
+            # The post commits and fans out while this reader is still building
+            TimelineStore.fan_out(post)
+            return {'entries': [], 'complete': True}
+
+        with mock.patch.object(TimelineStore, 'LOCK_WAIT', 0.2):
+            TimelineStore.read(key, build)
+        # The writer timed out on the rebuild's lock and dropped the stale result
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(
+            TimelineStore.read(key, lambda: TimelineStore.build_group(group.id))['entries'][0][1], post.id
+        )
+
+    def test_timeline_cut_by_the_cap_falls_back_to_the_database_when_it_runs_out(self):
+        Follow.objects.create(follower=self.user, followed=self.author)
+        posts = [Post.objects.create(author=self.author, content=f'p{i}', feed_visibility='public_global') for i in range(4)]
+        key = TimelineStore.home_key(self.user.id)
+        with mock.patch.object(TimelineStore, 'MAX_LENGTH', 3):
+            TimelineStore.read(key, lambda: TimelineStore.build_home(self.user.id))
+            # A removal leaves the capped timeline shorter than the cap
+            TimelineStore.remove([key], posts[3].id)
+            self.assertEqual(TimelineStore.page([(key, None)], page=1, page_size=3), (None, None))
+
+        resp = self.client.get(reverse('post-list'), {'feed_type': 'following', 'page_size': 3})
+        self.assertEqual([p['id'] for p in resp.data['results']], [posts[3].id, posts[2].id, posts[1].id])
+        self.assertTrue(resp.data['has_more'])
+
+    def test_following_feed_is_served_from_timeline_in_order(self):
+        Follow.objects.create(follower=self.user, followed=self.author)
+        posts = [
+            Post.objects.create(author=self.author, content=f'post {i}', feed_visibility='public_global')
+            for i in range(3)
+        ]
+        params = {'feed_type': 'following', 'page_size': 2}
+        resp = self.client.get(reverse('post-list'), params)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([p['id'] for p in resp.data['results']], [posts[2].id, posts[1].id])
+        self.assertTrue(resp.data['has_more'])
+        self.assertIsNotNone(cache.get(TimelineStore.home_key(self.user.id)))
+
+        resp = self.client.get(reverse('post-list'), dict(params, page=2))
+        self.assertEqual([p['id'] for p in resp.data['results']], [posts[0].id])
+        self.assertFalse(resp.data['has_more'])
+
+    def test_global_feed_is_ranked(self):
+        top = Post.objects.create(author=self.author, content='top', feed_visibility='public_global')
+        newer = Post.objects.create(author=self.author, content='newer', feed_visibility='public_global')
+        Post.objects.filter(pk=top.pk).update(ranking_score=50.0)
+
+        resp = self.client.get(reverse('post-list'), {'page': 1})
+        self.assertEqual([p['id'] for p in resp.data['results']], [top.id, newer.id])
+
+    def test_requests_without_paging_get_a_bare_list(self):
+        post = Post.objects.create(author=self.author, content='plain', feed_visibility='public_global')
+        resp = self.client.get(reverse('post-list'))
+        self.assertEqual([p['id'] for p in resp.data], [post.id])
+
+    def test_following_feed_uses_follows(self):
+        Follow.objects.create(follower=self.user, followed=self.author)
+        post = Post.objects.create(author=self.author, content='followed', feed_visibility='public_global')
+        resp = self.client.get(reverse('post-list'), {'feed_type': 'following', 'page': 1})
+        self.assertEqual([p['id'] for p in resp.data['results']], [post.id])
+
+    def test_group_only_posts_stay_hidden_from_non_members(self):
+        group = Group.objects.create(name='Closed', created_by=self.author)
+        GroupMembership.objects.create(user=self.author, group=group)
+        Post.objects.create(author=self.author, group=group, content='secret', feed_visibility='group_only')
+
+        resp = self.client.get(reverse('post-list'), {'feed_type': 'joined_groups', 'page': 1})
+        self.assertEqual(resp.data['results'], [])
+
+    def test_timeline_feed_blends_in_active_campaigns(self):
+        Follow.objects.create(follower=self.user, followed=self.author)
+        post = Post.objects.create(author=self.author, content='sponsored', feed_visibility='public_global')
+        SponsorCampaign.objects.create(
+            title='Campaign', sponsor=self.author, sponsored_post=post, status='active',
+            start_date=timezone.now() - timedelta(hours=1), end_date=timezone.now() + timedelta(days=7),
+            budget=100, cost_per_view='0.01',
+        )
+        resp = self.client.get(reverse('post-list'), {'feed_type': 'following', 'page': 1})
+        self.assertEqual([p['id'] for p in resp.data['results']], [post.id])
+        self.assertEqual(len(resp.data['campaigns']), 1)
+
+    def test_global_feed_leaves_out_own_group_only_posts(self):
+        group = Group.objects.create(name='Mine', created_by=self.user)
+        GroupMembership.objects.create(user=self.user, group=group)
+        Post.objects.create(author=self.user, group=group, content='group', feed_visibility='group_only')
+        own = Post.objects.create(author=self.user, content='mine', feed_visibility='public_global')
+
+        resp = self.client.get(reverse('post-list'), {'page': 1})
+        self.assertEqual([p['id'] for p in resp.data['results']], [own.id])
+
+    def test_concurrent_pushes_are_not_lost(self):
+        key = TimelineStore.group_key(1)
+        cache.set(key, {'entries': [], 'complete': True}, TimelineStore.TTL)
+        threads = [
+            threading.Thread(target=TimelineStore.push, args=([key], post_id, float(post_id)))
+            for post_id in range(1, 21)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(self.entry_ids(key)), list(range(1, 21)))
@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from accounts.models import Follow
+from community.models import Group, GroupMembership, Post
+from community.views import PostViewSet
+from community.visibility import ViewerSnapshot
+from utils.ingestion import ingest_pipeline
+
+
+class ViewerSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.user = User.objects.create_user(username='viewer', email='viewer@e.com', password='pass')
+        self.other = User.objects.create_user(username='other', email='other@e.com', password='pass')
+        self.group = Group.objects.create(name='g', description='d', category='c')
+
+    def test_snapshot_is_cached_until_membership_or_follow_changes(self):
+        self.assertEqual(ViewerSnapshot.for_user(self.user).group_ids, frozenset())
+        with self.assertNumQueries(0):
+            ViewerSnapshot.for_user(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            GroupMembership.objects.create(user=self.user, group=self.group)
+        with self.captureOnCommitCallbacks(execute=True):
+            Follow.objects.create(follower=self.user, followed=self.other)
+
+        snapshot = ViewerSnapshot.for_user(self.user)
+        self.assertTrue(snapshot.is_member(self.group.id))
+        self.assertTrue(snapshot.follows(self.other.id))
+
+    def test_anonymous_snapshot_only_sees_public_posts(self):
+        snapshot = ViewerSnapshot.for_user(None)
+        public = Post.objects.create(author=self.other, content='p', feed_visibility='public_global')
+        Post.objects.create(author=self.other, group=self.group, content='g', feed_visibility='group_only')
+        self.assertEqual(list(Post.objects.filter(snapshot.visible_posts_q())), [public])
+
+
+class PostVisibilityViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.user = User.objects.create_user(username='member', email='member@e.com', password='pass')
+        author = User.objects.create_user(username='poster', email='poster@e.com', password='pass')
+        self.group = Group.objects.create(name='g', description='d', category='c')
+        self.post = Post.objects.create(author=author, group=self.group, content='members only', feed_visibility='group_only')
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        ingest_pipeline.discard()
+
+    def test_feed_query_has_no_membership_join(self):
+        request = self.client.get(reverse('post-list')).wsgi_request
+        view = PostViewSet(request=request, format_kwarg=None, action='list')
+        sql = str(view.get_queryset().query).upper()
+        self.assertNotIn('DISTINCT', sql)
+        self.assertNotIn('GROUPMEMBERSHIP', sql)
+
+    def test_joining_a_group_reveals_its_posts(self):
+        resp = self.client.get(reverse('post-detail', args=[self.post.id]), {'nocache': 1})
+        self.assertEqual(resp.status_code, 404)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            GroupMembership.objects.create(user=self.user, group=self.group)
+        resp = self.client.get(reverse('post-detail', args=[self.post.id]))
+        self.assertEqual(resp.data['content'], 'members only')
@@ -0,0 +1,50 @@
+"""
+Signal handlers that keep the fan-out feed timelines and the ranking index in
+sync with posts and follow relationships.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from utils.executor import submit_task
+
+from .models import Post
+from .timelines import TimelineStore
+from .ranking_index import get_ranking_index
+
+# Fields whose change can move a post in or out of a timeline
+TIMELINE_FIELDS = {'is_approved', 'feed_visibility', 'group', 'group_id', 'author', 'author_id'}
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, update_fields=None, **kwargs):
+    """Push new posts onto their timelines; re-slot posts whose visibility changed."""
+    # Ranking/counter updates save with update_fields and never affect timelines
+    if not created and update_fields is not None and not (set(update_fields) & TIMELINE_FIELDS):
+        return
+
+    # A popular author has many followers; fan out in the background once the post is visible
+    post_id = instance.id
+    transaction.on_commit(lambda: submit_task(TimelineStore.sync_post, post_id, created=created))
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_timelines(sender, instance, **kwargs):
+    post_id, author_id, group_id = instance.id, instance.author_id, instance.group_id
+    transaction.on_commit(lambda: submit_task(TimelineStore.drop_post, post_id, author_id, group_id))
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_ranking_index(sender, instance, **kwargs):
+    try:
+        get_ranking_index().remove(instance.id)
+    except Exception:
+        pass
+
+
+@receiver(post_save, sender='accounts.Follow')
+@receiver(post_delete, sender='accounts.Follow')
+def reset_home_timeline(sender, instance, **kwargs):
+    """Following or unfollowing someone changes the follower's home timeline."""
+    key = TimelineStore.home_key(instance.follower_id)
+    transaction.on_commit(lambda: TimelineStore.invalidate(key))
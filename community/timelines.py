@@ -0,0 +1,334 @@
+"""
+Fan-out-on-write feed timelines for the community app.
+
+When a post is created its id is pushed onto every timeline that can show it:
+its group's timeline and the home timelines of the author's followers. The
+chronological ``following`` and ``joined_groups`` feeds then page these short,
+already-sorted id lists instead of filtering the whole post table. The
+``global`` feed is ordered by ranking score and is served from the database.
+
+Timelines live in the Django cache as ``{'entries': [...], 'complete': bool}``.
+``entries`` are ``[score, post_id]`` pairs (score is the post's created_at
+timestamp), newest first and capped at ``MAX_LENGTH``. ``complete`` is true
+while the timeline holds every post of its feed; once the cap has cut older
+posts off, paging past the last entry falls back to the database. A timeline
+that is missing from the cache is rebuilt lazily from the indexed
+``-created_at`` query, so fan-out only has to update timelines that are
+already warm.
+
+Fan-out runs on the task executor once the post's transaction has committed
+(see ``community.timeline_signals``), never in the request.
+
+Rebuilds and writes to a timeline happen under its per-key lock
+(``cache.add``). A writer also updates timelines that are being rebuilt, so a
+post committed while a reader was querying the database is not lost when the
+reader stores its result. A writer that can't get the lock within
+``LOCK_WAIT`` seconds deletes the timeline instead and marks it stale, so the
+lock holder doesn't store its copy either; the next read rebuilds it from the
+database.
+"""
+import bisect
+import heapq
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class TimelineStore:
+    """Read and write precomputed post timelines."""
+
+    MAX_LENGTH = getattr(settings, 'COMMUNITY_TIMELINE_MAX_LENGTH', 800)
+    TTL = getattr(settings, 'COMMUNITY_TIMELINE_TTL', 60 * 60 * 24)
+    LOCK_TIMEOUT = 5
+    LOCK_WAIT = 1.0
+
+    # Chronological feed types that can be served from timelines
+    FEED_TYPES = ('following', 'joined_groups')
+
+    @staticmethod
+    def group_key(group_id):
+        return f'timeline:group:{group_id}'
+
+    @staticmethod
+    def home_key(user_id):
+        return f'timeline:home:{user_id}'
+
+    @staticmethod
+    def lock_key(key):
+        return f'{key}:lock'
+
+    @staticmethod
+    def stale_key(key):
+        return f'{key}:stale'
+
+    # ------------------------------------------------------------------
+    # Builders (cold-start / cache miss)
+    # ------------------------------------------------------------------
+    @classmethod
+    def _build(cls, queryset):
+        rows = queryset.order_by('-created_at', '-id').values_list('id', 'created_at')[:cls.MAX_LENGTH]
+        entries = [[created_at.timestamp(), post_id] for post_id, created_at in rows]
+        return {'entries': entries, 'complete': len(entries) < cls.MAX_LENGTH}
+
+    @classmethod
+    def build_group(cls, group_id):
+        from .models import Post
+        return cls._build(Post.objects.filter(is_approved=True, group_id=group_id))
+
+    @classmethod
+    def build_home(cls, user_id):
+        from .models import Post
+        from accounts.models import Follow
+        followed_ids = Follow.objects.filter(follower_id=user_id).values_list('followed_id', flat=True)
+        return cls._build(Post.objects.filter(is_approved=True, author_id__in=followed_ids))
+
+    # ------------------------------------------------------------------
+    # Locking
+    # ------------------------------------------------------------------
+    @classmethod
+    def _acquire(cls, key):
+        """Take the lock on ``key``, waiting up to ``LOCK_WAIT`` seconds."""
+        deadline = time.monotonic() + cls.LOCK_WAIT
+        while not cache.add(cls.lock_key(key), 1, cls.LOCK_TIMEOUT):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    @classmethod
+    def _release(cls, key):
+        cache.delete(cls.lock_key(key))
+
+    @classmethod
+    def _store(cls, key, timeline):
+        """Store ``timeline`` while holding the lock, unless a writer gave up on the key meanwhile."""
+        cache.set(key, timeline, cls.TTL)
+        if cache.get(cls.stale_key(key)) is not None:
+            cache.delete_many([key, cls.stale_key(key)])
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    @classmethod
+    def read(cls, key, builder):
+        """Return the timeline stored at ``key``, rebuilding it on a miss."""
+        timeline = cache.get(key)
+        if timeline is not None:
+            return timeline
+        if not cls._acquire(key):
+            # Busy key; answer from the database without storing the result
+            return builder()
+        try:
+            timeline = cache.get(key)
+            if timeline is None:
+                timeline = builder()
+                cls._store(key, timeline)
+            return timeline
+        finally:
+            cls._release(key)
+
+    @staticmethod
+    def _sort_key(entry):
+        # Newest first; ties broken by descending post id
+        return (-entry[0], -entry[1])
+
+    @classmethod
+    def page(cls, sources, page=1, page_size=20, cursor=None):
+        """Merge one or more timelines and return a page of post ids.
+
+        ``sources`` is a list of ``(key, builder)`` pairs. ``cursor`` is the
+        ``[score, post_id]`` of the last entry already shown; when given the
+        page starts right after it, otherwise ``page`` is used as an offset.
+        Returns ``(post_ids, next_cursor)``, or ``(None, None)`` when the
+        requested page runs past what the capped timelines hold and the
+        caller should fall back to the database.
+        """
+        if cursor is not None:
+            start = 0
+        else:
+            start = (page - 1) * page_size
+        end = start + page_size
+        if end > cls.MAX_LENGTH:
+            return None, None
+
+        timelines = [cls.read(key, builder) for key, builder in sources]
+        lists = [timeline['entries'] for timeline in timelines]
+        # Entries older than the tail of a capped timeline may be missing from
+        # it, so the merged feed is only trustworthy down to the newest such tail
+        horizon = None
+        for timeline in timelines:
+            if not timeline['complete']:
+                entries = timeline['entries']
+                tail = cls._sort_key(entries[-1]) if entries else (float('-inf'),)
+                horizon = tail if horizon is None else min(horizon, tail)
+        if cursor is not None:
+            after = cls._sort_key(cursor)
+            lists = [
+                entries[bisect.bisect_right([cls._sort_key(e) for e in entries], after):]
+                for entries in lists
+            ]
+        if len(lists) == 1:
+            merged = lists[0]
+        else:
+            merged = heapq.merge(*lists, key=cls._sort_key)
+
+        entries = []
+        seen = set()
+        for entry in merged:
+            if horizon is not None and cls._sort_key(entry) > horizon:
+                break
+            if entry[1] in seen:
+                continue
+            seen.add(entry[1])
+            entries.append(entry)
+            if len(entries) > end:
+                break
+
+        if len(entries) <= end and horizon is not None:
+            # Ran out of a timeline whose older posts are only in the database
+            return None, None
+
+        page_entries = entries[start:end]
+        next_cursor = list(page_entries[-1]) if len(entries) > end and page_entries else None
+        return [post_id for _score, post_id in page_entries], next_cursor
+
+    @classmethod
+    def sources_for_feed(cls, feed_type, user=None):
+        """Return the timelines that make up ``feed_type`` for ``user``."""
+        if user is None or not getattr(user, 'is_authenticated', False):
+            return None
+
+        if feed_type == 'following':
+            return [(cls.home_key(user.id), lambda: cls.build_home(user.id))]
+
+        if feed_type == 'joined_groups':
+            from .models import GroupMembership
+            group_ids = GroupMembership.objects.filter(user=user).values_list('group_id', flat=True)
+            return [(cls.group_key(gid), lambda gid=gid: cls.build_group(gid)) for gid in group_ids]
+
+        return None
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    @classmethod
+    def _insert(cls, timeline, score, post_id):
+        entries = timeline['entries']
+        if any(existing_id == post_id for _s, existing_id in entries):
+            return timeline
+        index = bisect.bisect_left([cls._sort_key(e) for e in entries], cls._sort_key([score, post_id]))
+        entries.insert(index, [score, post_id])
+        if len(entries) > cls.MAX_LENGTH:
+            del entries[cls.MAX_LENGTH:]
+            timeline['complete'] = False
+        return timeline
+
+    @staticmethod
+    def _discard(timeline, post_id):
+        timeline['entries'] = [entry for entry in timeline['entries'] if entry[1] != post_id]
+        return timeline
+
+    @classmethod
+    def _update(cls, key, change):
+        """Apply ``change(timeline)`` to the timeline at ``key`` under its lock."""
+        if not cls._acquire(key):
+            logger.warning('Timeline %s stayed locked; dropping it for a rebuild', key)
+            # The lock holder may store after this delete; the marker makes it drop its copy too
+            cache.set(cls.stale_key(key), 1, cls.LOCK_TIMEOUT)
+            cache.delete(key)
+            return
+        try:
+            timeline = cache.get(key)
+            if timeline is not None:
+                cls._store(key, change(timeline))
+        finally:
+            cls._release(key)
+
+    @classmethod
+    def _live_keys(cls, keys):
+        """The keys in ``keys`` whose timeline is warm or being rebuilt."""
+        found = cache.get_many(list(keys) + [cls.lock_key(key) for key in keys])
+        return [key for key in keys if key in found or cls.lock_key(key) in found]
+
+    @classmethod
+    def push(cls, keys, post_id, score):
+        """Insert ``post_id`` into every live timeline in ``keys``.
+
+        Cold timelines are left alone; they will include the post when they
+        are next rebuilt from the database.
+        """
+        if not keys:
+            return
+        for key in cls._live_keys(keys):
+            cls._update(key, lambda timeline: cls._insert(timeline, score, post_id))
+
+    @classmethod
+    def remove(cls, keys, post_id):
+        """Drop ``post_id`` from every live timeline in ``keys``."""
+        if not keys:
+            return
+        for key in cls._live_keys(keys):
+            cls._update(key, lambda timeline: cls._discard(timeline, post_id))
+
+    @classmethod
+    def keys_for(cls, author_id, group_id=None):
+        """Return the timeline keys a post by ``author_id`` in ``group_id`` belongs to."""
+        from accounts.models import Follow
+
+        keys = []
+        if group_id:
+            keys.append(cls.group_key(group_id))
+
+        follower_ids = Follow.objects.filter(followed_id=author_id).values_list('follower_id', flat=True)
+        keys.extend(cls.home_key(fid) for fid in follower_ids)
+        return keys
+
+    @classmethod
+    def keys_for_post(cls, post):
+        return cls.keys_for(post.author_id, post.group_id)
+
+    @classmethod
+    def fan_out(cls, post):
+        """Push a newly created post onto all of its timelines."""
+        if not post.is_approved:
+            return
+        try:
+            cls.push(cls.keys_for_post(post), post.id, post.created_at.timestamp())
+        except Exception:
+            logger.exception('Timeline fan-out failed for post %s', post.id)
+
+    # ------------------------------------------------------------------
+    # Tasks (run on the executor after commit)
+    # ------------------------------------------------------------------
+    @classmethod
+    def sync_post(cls, post_id, created=False):
+        """Push a new post onto its timelines, or re-slot one that was edited."""
+        from .models import Post
+
+        post = Post.objects.filter(pk=post_id).first()
+        if post is None:
+            return
+        if not created:
+            cls.remove(cls.keys_for_post(post), post.id)
+        cls.fan_out(post)
+
+    @classmethod
+    def drop_post(cls, post_id, author_id, group_id=None):
+        """Remove a deleted post from its timelines."""
+        cls.remove(cls.keys_for(author_id, group_id), post_id)
+
+    @classmethod
+    def invalidate(cls, *keys):
+        """Drop timelines so the next read rebuilds them."""
+        for key in keys:
+            # Wait out a rebuild in progress so it can't store a stale list afterwards
+            locked = cls._acquire(key)
+            try:
+                cache.delete(key)
+            finally:
+                if locked:
+                    cls._release(key)
@@ -9,8 +9,9 @@ Cleaned and fixed views.py for the community app.
 Drop this into your community/views.py (or whatever file you use) and run tests.
 """
 
-from datetime import timedelta
+from datetime import timedelta, timezone as dt_timezone
 import json
+import logging
 import re
 from html.parser import HTMLParser
 from urllib.error import HTTPError, URLError
@@ -53,17 +54,36 @@ from .serializers import (
 
 from .permissions import IsCommunityMember, IsSubscribed
 from .feed import FeedRanker
+from .feed_cache import FeedCache
+from .timelines import TimelineStore
+from .visibility import ViewerSnapshot
+from .events import emit_engagement
+from .pagination import (
+    KeysetPaginator,
+    RankedFeedPaginator,
+    decode_cursor,
+    encode_cursor,
+    parse_page_size,
+    wants_pagination,
+)
 from accounts.authentication import DatabaseTokenAuthentication
 from accounts.serializers import UserSerializer
+from utils.conditional import ConditionalGetMixin, PRIVATE_CACHE_CONTROL, PUBLIC_CACHE_CONTROL
+from utils.counter_buffer import counter_buffer
+from utils.ingestion import ingest_pipeline
+from utils.log import lazy
+from promotions.models import EngagementLog
 from courses.models import Course
 from courses.serializers import CourseSerializer
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 
-class CommunitySectionViewSet(viewsets.ReadOnlyModelViewSet):
+class CommunitySectionViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """Return the latest published CommunitySection instance as a single object."""
     permission_classes = [AllowAny]
+    cache_control = PUBLIC_CACHE_CONTROL
 
     def get_queryset(self):
         from .models import CommunitySection
@@ -502,11 +522,30 @@ class GroupMembershipViewSet(viewsets.ModelViewSet):
 from .feed import FeedRanker  # re-import safe; already imported above but keep for readability
 
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Post.objects.all()
     serializer_class = PostSerializer
     authentication_classes = [DatabaseTokenAuthentication, SessionAuthentication]
     permission_classes = [IsAuthenticated, IsCommunityMember]
+    # Only the polling endpoints answer conditional GETs; like/view counters
+    # are flushed without touching updated_at and reach clients over the
+    # event stream instead
+    conditional_actions = ('poll_campaigns', 'poll_feed_updates')
+    cache_control = PRIVATE_CACHE_CONTROL
+
+    def get_conditional_querysets(self):
+        from promotions.models import SponsorCampaign
+
+        now = timezone.now()
+        campaigns = SponsorCampaign.objects.filter(
+            status='active',
+            start_date__lte=now,
+            end_date__gte=now,
+            sponsored_post__is_approved=True
+        )
+        if self.action == 'poll_campaigns':
+            return [(campaigns, 'updated_at')]
+        return [(self.get_queryset(), 'updated_at'), (campaigns, 'updated_at')]
 
     def get_queryset(self):
         """Get base queryset with optional filters."""
@@ -514,39 +553,22 @@ class PostViewSet(viewsets.ModelViewSet):
 
         # Apply visibility filters
         request_user = getattr(self.request, 'user', None)
-        import logging
-        logger = logging.getLogger(__name__)
-        
+
         # If the requester is staff allow full access (no visibility filtering)
         if not (request_user and getattr(request_user, 'is_staff', False)):
-            # Base filter: only approved posts
-            base_q = Q(is_approved=True)
-
-            # Public global posts are always visible
-            visibility_q = Q(feed_visibility='public_global')
-
-            # If authenticated, include group-only posts for groups the user is a member of
-            # and the user's own posts. Avoid using AnonymousUser in ORM lookups.
-            if request_user and getattr(request_user, 'is_authenticated', False):
-                visibility_q = (
-                    visibility_q
-                    | Q(feed_visibility='group_only', group__memberships__user=request_user)
-                    | Q(author=request_user)
-                )
-                logger.info(f'[PostViewSet.get_queryset] User {request_user.id} authenticated - including own posts and group posts')
-
-            qs = qs.filter(base_q & visibility_q).distinct()
-            
-            # Debug logging
-            logger.info(f'[PostViewSet.get_queryset] After visibility filter - user={request_user}, is_auth={getattr(request_user, "is_authenticated", False) if request_user else False}')
-            logger.info(f'[PostViewSet.get_queryset] Total posts after visibility: {qs.count()}')
-            if request_user and getattr(request_user, 'is_authenticated', False):
-                user_groups = Group.objects.filter(memberships__user=request_user)
-                logger.info(f'[PostViewSet.get_queryset] User groups: {list(user_groups.values_list("id", "name"))}')
-                
-                # Check author posts
-                author_posts = qs.filter(author=request_user)
-                logger.info(f'[PostViewSet.get_queryset] Author posts visible to user: {author_posts.count()}')
+            # Only approved posts that are public, in one of the viewer's
+            # groups, or their own; group ids come from the cached snapshot
+            qs = qs.filter(Q(is_approved=True) & ViewerSnapshot.for_user(request_user).visible_posts_q())
+
+            # Diagnostics cost extra queries; only run them when asked for
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('[PostViewSet.get_queryset] user=%s visible posts=%s', request_user, qs.count())
+                if request_user and getattr(request_user, 'is_authenticated', False):
+                    logger.debug(
+                        '[PostViewSet.get_queryset] user groups=%s, own posts visible=%s',
+                        list(Group.objects.filter(memberships__user=request_user).values_list('id', 'name')),
+                        qs.filter(author=request_user).count(),
+                    )
 
         return qs
 
@@ -563,6 +585,10 @@ class PostViewSet(viewsets.ModelViewSet):
         return [IsAuthenticated(), IsCommunityMember()]
 
     def list(self, request, *args, **kwargs):
+        """Feed page for the viewer, served from the versioned feed cache."""
+        return Response(FeedCache.get_or_build(request, lambda: self.feed_page(request).data))
+
+    def feed_page(self, request):
         """
         Get feed posts with ranking and filtering.
 
@@ -570,25 +596,74 @@ class PostViewSet(viewsets.ModelViewSet):
         - feed_type: 'global' (default), 'following', 'trending', 'joined_groups'
         - author_id: filter by author
         - group_id: filter by group
-        - page: page number (default 1)
+        - cursor: opaque keyset cursor returned as `next_cursor` by the previous page
+        - page: page number (default 1); kept for older clients, prefer `cursor`
         - page_size: items per page (default 20)
         - include_campaigns: include sponsored campaigns in feed (default true)
+
+        Requests with none of `cursor`, `page` or `page_size` get the first
+        page as a bare list of posts, as older clients expect.
         """
         # Get basic parameters
         feed_type = request.query_params.get('feed_type', 'global')
-        page_size = int(request.query_params.get('page_size', 20))
+        page_size = parse_page_size(request)
+        cursor = request.query_params.get('cursor')
+        page_param = request.query_params.get('page')
+        page = int(page_param) if page_param and page_param.isdigit() else 1
         author_id = request.query_params.get('author_id')
         group_id = request.query_params.get('group_id') or request.query_params.get('group')
         include_campaigns = request.query_params.get('include_campaigns', 'true').lower() == 'true'
 
-        # Debug logging
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f'[PostViewSet.list] Filtering posts - group_id={group_id}, author_id={author_id}, feed_type={feed_type}')
+        logger.debug('[PostViewSet.list] group_id=%s author_id=%s feed_type=%s', group_id, author_id, feed_type)
+
+        # The following and joined-groups feeds are chronological and keyed on
+        # (created_at, id); they are served from the precomputed fan-out
+        # timelines while those reach back far enough. The other feeds are ranked.
+        chronological = not (author_id or group_id) and feed_type in TimelineStore.FEED_TYPES
+        cursor_values = decode_cursor(cursor)
+        if chronological and cursor_values and len(cursor_values) == 2:
+            # Timeline cursors carry a float timestamp, database cursors a datetime
+            created, last_id = cursor_values
+            if isinstance(created, (int, float)):
+                created = timezone.datetime.fromtimestamp(created, tz=dt_timezone.utc)
+            cursor_values = [created, last_id]
+            cursor = encode_cursor(cursor_values)
+        elif chronological:
+            cursor_values = None
+
+        if chronological:
+            try:
+                sources = TimelineStore.sources_for_feed(feed_type, request.user)
+                timeline_cursor = [cursor_values[0].timestamp(), cursor_values[1]] if cursor_values else None
+                post_ids, next_entry = (None, None) if sources is None else TimelineStore.page(
+                    sources, page, page_size, cursor=timeline_cursor
+                )
+                if post_ids is not None:
+                    # Re-apply visibility and the feed's own filter so stale
+                    # timeline entries (unfollowed authors, left groups) are never leaked
+                    snapshot = ViewerSnapshot.for_user(request.user)
+                    visible = self.get_queryset().filter(id__in=post_ids)
+                    if feed_type == 'following':
+                        visible = visible.filter(author_id__in=sorted(snapshot.following_ids))
+                    else:
+                        visible = visible.filter(group_id__in=sorted(snapshot.group_ids))
+                    posts_map = {p.id: p for p in visible}
+                    ordered = [posts_map[i] for i in post_ids if i in posts_map]
+                    serializer = self.get_serializer(ordered, many=True, context={'request': request})
+                    response_data = {
+                        'results': serializer.data,
+                        'page': None if cursor else page,
+                        'page_size': page_size,
+                        'next_cursor': encode_cursor(next_entry) if next_entry else None,
+                        'has_more': next_entry is not None,
+                        'feed_type': feed_type,
+                    }
+                    return self.feed_response(request, response_data, include_campaigns)
+            except Exception:
+                logger.exception('[PostViewSet.list] Timeline read failed, falling back to database feed')
 
         # Get base queryset (applies visibility filters)
         qs = self.get_queryset()
-        logger.info(f'[PostViewSet.list] Initial queryset count after visibility filter: {qs.count()}')
 
         # Apply author/group filters if provided
         if author_id:
@@ -600,26 +675,22 @@ class PostViewSet(viewsets.ModelViewSet):
         if group_id:
             # Filter by specific group
             qs = qs.filter(group__id=group_id)
-            logger.info(f'[PostViewSet.list] After group filter: {qs.count()} posts in group {group_id}')
-            # Also log sample posts with details
-            sample = qs.values_list('id', 'group_id', 'feed_visibility', 'is_approved', 'author_id')[:5]
-            logger.info(f'[PostViewSet.list] Sample posts in group {group_id}: {list(sample)}')
-            
-            # Check if any posts exist for this group at all (before visibility filter)
-            all_group_posts = Post.objects.filter(group__id=group_id)
-            logger.info(f'[PostViewSet.list] ALL posts in group {group_id} (no visibility filter): {all_group_posts.count()}')
-            logger.info(f'[PostViewSet.list] Sample all posts: {list(all_group_posts.values_list("id", "group_id", "feed_visibility", "is_approved")[:5])}')
+            if logger.isEnabledFor(logging.DEBUG):
+                all_group_posts = Post.objects.filter(group__id=group_id)
+                logger.debug(
+                    '[PostViewSet.list] group %s: %s visible posts of %s, sample=%s',
+                    group_id, qs.count(), all_group_posts.count(),
+                    list(qs.values_list('id', 'feed_visibility', 'is_approved', 'author_id')[:5]),
+                )
         elif feed_type == 'global':
             # When viewing global feed, exclude group-only posts
             # Group-only posts should only appear when explicitly viewing that group or joined_groups tab
             qs = qs.exclude(feed_visibility='group_only')
-            logger.info(f'[PostViewSet.list] Excluded group_only posts from global feed. Remaining: {qs.count()} posts')
 
         # Apply feed-type specific logic
         if feed_type == 'following' and request.user.is_authenticated:
             # Get posts from users being followed
-            following_ids = request.user.following.values_list('id', flat=True)
-            qs = qs.filter(author_id__in=following_ids)
+            qs = qs.filter(author_id__in=sorted(ViewerSnapshot.for_user(request.user).following_ids))
 
         elif feed_type == 'trending':
             # Get posts with high engagement in last 24 hours
@@ -628,21 +699,15 @@ class PostViewSet(viewsets.ModelViewSet):
 
         elif feed_type == 'joined_groups' and request.user.is_authenticated:
             # Get posts from groups the user is a member of
-            user_group_ids = GroupMembership.objects.filter(user=request.user).values_list('group_id', flat=True)
+            user_group_ids = sorted(ViewerSnapshot.for_user(request.user).group_ids)
             qs = qs.filter(group_id__in=user_group_ids)
-            logger.info(f'[PostViewSet.list] Joined groups feed - user {request.user.id} is member of groups: {list(user_group_ids)}, found {qs.count()} posts')
-
-        # Apply ranking
-        try:
-            qs = FeedRanker.rank_queryset(qs)
-        except Exception:
-            pass
+            logger.debug('[PostViewSet.list] joined groups %s: %s posts', user_group_ids, lazy(qs.count))
 
-        # Try to get from cache first
-        if not (author_id or group_id):  # Only cache general feeds
+        # Page-number requests for the trending feed read straight from the ranking index
+        if not (author_id or group_id) and feed_type == 'trending' and not cursor:
             try:
                 cached_posts = Post.get_feed_page(
-                    page=int(request.query_params.get('page', 1)),
+                    page=page,
                     page_size=page_size,
                     user=request.user if request.user.is_authenticated else None,
                     feed_type=feed_type,
@@ -655,8 +720,7 @@ class PostViewSet(viewsets.ModelViewSet):
                     try:
                         if isinstance(cached_posts, list) and cached_posts and all(isinstance(p, dict) and 'id' in p for p in cached_posts):
                             ids = [p['id'] for p in cached_posts]
-                            posts_qs = Post.objects.filter(id__in=ids)
-                            posts_map = {p.id: p for p in posts_qs}
+                            posts_map = {p.id: p for p in qs.filter(id__in=ids)}
                             # Preserve original cached order, skip missing ids
                             ordered = [posts_map.get(i) for i in ids if posts_map.get(i) is not None]
                             serializer = self.get_serializer(ordered, many=True, context={'request': request})
@@ -670,58 +734,64 @@ class PostViewSet(viewsets.ModelViewSet):
             except Exception:
                 pass
 
-        # Paginate database results
-        paginator = getattr(self, 'pagination_class', None)
-        if paginator is not None:
-            paginator = paginator()
-            page = paginator.paginate_queryset(qs, request)
-            serializer = self.get_serializer(page, many=True, context={'request': request})
-            response_data = paginator.get_paginated_response(serializer.data)
-            
-            # Blend in active campaigns if requested and no filters applied
-            if include_campaigns and not author_id and not group_id:
-                try:
-                    from promotions.models import SponsorCampaign
-                    from promotions.serializers import SponsorCampaignSerializer
-                    
-                    now = timezone.now()
-                    campaigns = SponsorCampaign.objects.filter(
-                        status='active',
-                        start_date__lte=now,
-                        end_date__gte=now,
-                        sponsored_post__is_approved=True
-                    ).select_related('sponsored_post', 'sponsor').order_by('-priority_level', '-created_at')[:3]
-                    
-                    if campaigns.exists():
-                        campaign_serializer = SponsorCampaignSerializer(campaigns, many=True, context={'request': request})
-                        if isinstance(response_data.data, dict) and 'results' in response_data.data:
-                            response_data.data['campaigns'] = campaign_serializer.data
-                except Exception:
-                    pass
-            
-            return response_data
+        # Keyset-paginate database results: chronological feeds on (created_at, id),
+        # ranked feeds on a snapshot of their (ranking bucket, created_at, id) order
+        if chronological:
+            paginator = KeysetPaginator(['-created_at', '-id'], page_size=page_size)
+        else:
+            paginator = RankedFeedPaginator(page_size=page_size)
+        posts, next_cursor = paginator.paginate(qs, cursor=cursor, page=page)
+        serializer = self.get_serializer(posts, many=True, context={'request': request})
+        response_data = {
+            'results': serializer.data,
+            'page': None if cursor else page,
+            'page_size': page_size,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None,
+            'feed_type': feed_type,
+        }
+        # Campaigns are only blended into unfiltered feeds
+        return self.feed_response(request, response_data, include_campaigns and not (author_id or group_id))
 
-        serializer = self.get_serializer(qs, many=True, context={'request': request})
-        return Response(serializer.data)
+    def feed_response(self, request, response_data, include_campaigns):
+        """Return a feed page in the shape the client asked for."""
+        if not wants_pagination(request):
+            return Response(response_data['results'])
+        if include_campaigns:
+            self.blend_campaigns(request, response_data)
+        return Response(response_data)
+
+    def blend_campaigns(self, request, response_data):
+        """Add up to three active sponsored campaigns to an unfiltered feed page."""
+        try:
+            from promotions.models import SponsorCampaign
+            from promotions.serializers import SponsorCampaignSerializer
+
+            now = timezone.now()
+            campaigns = list(SponsorCampaign.objects.filter(
+                status='active',
+                start_date__lte=now,
+                end_date__gte=now,
+                sponsored_post__is_approved=True
+            ).select_related('sponsored_post', 'sponsor').order_by('-priority_level', '-created_at')[:3])
+
+            if campaigns:
+                campaign_serializer = SponsorCampaignSerializer(campaigns, many=True, context={'request': request})
+                response_data['campaigns'] = campaign_serializer.data
+        except Exception:
+            pass
 
     def retrieve(self, request, *args, **kwargs):
         """
         Get a single post with updated view tracking and sponsor impressions.
-        Handles caching and engagement logging.
+        Views are tracked on every request; the body comes from the feed cache.
         """
         instance = self.get_object()
 
-        # Try to get cached post data
-        cache_key = f'post_detail:{instance.id}'
-        cached_data = cache.get(cache_key) if cache else None
-
-        if cached_data and not request.query_params.get('nocache'):
-            return Response(cached_data)
-
         # Log view engagement
         try:
             user = request.user if request.user.is_authenticated else None
-            EngagementLog.objects.create(
+            ingest_pipeline.submit(EngagementLog(
                 user=user,
                 action_type='view',
                 post=instance,
@@ -730,7 +800,7 @@ class PostViewSet(viewsets.ModelViewSet):
                     'referrer': request.META.get('HTTP_REFERER', ''),
                     'user_agent': request.META.get('HTTP_USER_AGENT', ''),
                 },
-            )
+            ))
         except Exception:
             pass
 
@@ -738,7 +808,7 @@ class PostViewSet(viewsets.ModelViewSet):
         try:
             campaign = getattr(instance, 'sponsor_campaign', None)
             if campaign and hasattr(campaign, 'is_active') and campaign.is_active():
-                SponsorCampaign.objects.filter(id=campaign.id).update(impression_count=F('impression_count') + 1)
+                counter_buffer.incr(type(campaign), campaign.id, 'impression_count')
                 if hasattr(campaign, 'calculate_engagement_rate'):
                     try:
                         campaign.calculate_engagement_rate()
@@ -747,25 +817,25 @@ class PostViewSet(viewsets.ModelViewSet):
         except Exception:
             pass
 
-        # Increment view count and update ranking
+        # Increment view count; ranking is refreshed by the dirty-post flusher
         try:
             if hasattr(instance, 'increment_view'):
                 instance.increment_view()
             else:
-                Post.objects.filter(id=instance.id).update(view_count=F('view_count') + 1)
+                counter_buffer.incr(Post, instance.id, 'view_count')
         except Exception:
             pass
 
+        if request.query_params.get('nocache'):
+            return Response(self.post_detail(request, instance))
+        return Response(FeedCache.get_or_build(request, lambda: self.post_detail(request, instance)))
+
+    def post_detail(self, request, instance):
+        """Serialized post, or a join preview for group-only posts the viewer can't read."""
         # If this is a group-only post and requester is not a member, return a preview
         try:
             if instance.feed_visibility == 'group_only':
-                user = request.user if getattr(request, 'user', None) and request.user.is_authenticated else None
-                is_member = False
-                try:
-                    if user:
-                        is_member = GroupMembership.objects.filter(group=instance.group, user=user).exists()
-                except Exception:
-                    is_member = False
+                is_member = ViewerSnapshot.for_user(getattr(request, 'user', None)).is_member(instance.group_id)
                 if not is_member and not (request.user.is_staff or (instance.author and instance.author == request.user)):
                     # Return a lightweight preview encouraging join
                     preview = {
@@ -781,50 +851,32 @@ class PostViewSet(viewsets.ModelViewSet):
                         preview['author_name'] = getattr(instance.author, 'username', None) or getattr(instance.author, 'email', None) or ''
                     except Exception:
                         preview['author_name'] = ''
-                    # Cache preview briefly
-                    try:
-                        cache.set(cache_key, preview, timeout=300)
-                    except Exception:
-                        pass
-                    return Response(preview)
+                    return preview
 
         except Exception:
             # if any error during preview logic, fall back to full serialization
             pass
 
-        # Serialize and cache response
         serializer = self.get_serializer(instance, context={'request': request})
-        response_data = serializer.data
-
-        # Cache for 10 minutes
-        try:
-            cache.set(cache_key, response_data, timeout=600)
-        except Exception:
-            pass
-
-        return Response(response_data)
+        return serializer.data
 
     def create(self, request, *args, **kwargs):
         # Allow file uploads under 'media' key as multiple files
         # We'll create the Post first, then attach uploaded files and update media_urls
         
-        # Debug logging for group_id handling
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f'[PostViewSet.create] Request data keys: {list(request.data.keys())}')
-        logger.info(f'[PostViewSet.create] group in request.data: {"group" in request.data}')
-        logger.info(f'[PostViewSet.create] group_id in request.data: {"group_id" in request.data}')
-        if "group_id" in request.data:
-            logger.info(f'[PostViewSet.create] Received group_id={request.data.get("group_id")}')
-        if "group" in request.data:
-            logger.info(f'[PostViewSet.create] Received group={request.data.get("group")}')
+        logger.debug(
+            '[PostViewSet.create] keys=%s group=%s group_id=%s',
+            lazy(list, request.data.keys()), request.data.get('group'), request.data.get('group_id'),
+        )
         
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         post = serializer.save(author=request.user)
         
-        # Debug logging
-        logger.info(f'[PostViewSet.create] Post created: id={post.id}, group_id={post.group_id}, feed_visibility={post.feed_visibility}, is_approved={post.is_approved}, author_id={post.author_id}')
+        logger.debug(
+            '[PostViewSet.create] Post created: id=%s, group_id=%s, feed_visibility=%s, is_approved=%s, author_id=%s',
+            post.id, post.group_id, post.feed_visibility, post.is_approved, post.author_id,
+        )
         
         # Auto-add author to group membership when creating a post in a group
         # This ensures they can see their own group posts via visibility filter
@@ -836,13 +888,11 @@ class PostViewSet(viewsets.ModelViewSet):
                     group=group
                 )
                 if created:
-                    logger.info(f'[PostViewSet.create] Author {request.user.id} auto-added to group {post.group_id}')
-                else:
-                    logger.info(f'[PostViewSet.create] Author {request.user.id} already member of group {post.group_id}')
+                    logger.debug('[PostViewSet.create] Author %s auto-added to group %s', request.user.id, post.group_id)
             except Group.DoesNotExist:
-                logger.warning(f'[PostViewSet.create] Group {post.group_id} not found')
+                logger.warning('[PostViewSet.create] Group %s not found', post.group_id)
             except Exception as e:
-                logger.warning(f'[PostViewSet.create] Error adding user to group: {str(e)}')
+                logger.warning('[PostViewSet.create] Error adding user to group: %s', e)
 
         # Normalize media_urls in case the client sent them as a JSON string
         # (common when using multipart/form-data). Ensure post.media_urls is a list.
@@ -1003,12 +1053,12 @@ class PostViewSet(viewsets.ModelViewSet):
 
         # Create mention logs for any @mentions in content
         try:
-            from .engagement import MentionLog, CommunityEngagementLog
+            from .engagement import MentionLog
             mentions = MentionLog.create_from_text(post.content or '', post=post, mentioned_by=request.user)
             # Log engagement entries for mentions
             for m in mentions:
                 try:
-                    CommunityEngagementLog.log_engagement(user=request.user, action_type='mention_user', post=post, mentioned_user=m.mentioned_user, metadata={'mentioned_username': getattr(m.mentioned_user, 'username', None)})
+                    emit_engagement(request.user, 'mention_user', post=post, mentioned_user=m.mentioned_user, metadata={'mentioned_username': getattr(m.mentioned_user, 'username', None)})
                 except Exception:
                     pass
         except Exception:
@@ -1159,7 +1209,6 @@ class PostViewSet(viewsets.ModelViewSet):
         
         # Clear cache
         try:
-            cache.delete(f'post_detail:{post.id}')
             cache.delete(f'post:{post.id}')
         except Exception:
             pass
@@ -1256,7 +1305,6 @@ class PostViewSet(viewsets.ModelViewSet):
 
                 # Clear caches
                 try:
-                    cache.delete(f'post_detail:{post_id}')
                     cache.delete(f'post:{post_id}')
                 except Exception:
                     pass
@@ -1282,16 +1330,14 @@ class PostViewSet(viewsets.ModelViewSet):
             count = PostBookmark.objects.filter(post=post).count()
             # Log engagement (unbookmark)
             try:
-                from .engagement import CommunityEngagementLog
-                CommunityEngagementLog.log_engagement(user=request.user, action_type='unbookmark_post', post=post)
+                emit_engagement(request.user, 'unbookmark_post', post=post)
             except Exception:
                 pass
             return Response({'bookmarked': False, 'bookmarks_count': count}, status=status.HTTP_200_OK)
         count = PostBookmark.objects.filter(post=post).count()
         # Log engagement (bookmark)
         try:
-            from .engagement import CommunityEngagementLog
-            CommunityEngagementLog.log_engagement(user=request.user, action_type='bookmark_post', post=post)
+            emit_engagement(request.user, 'bookmark_post', post=post)
         except Exception:
             pass
         return Response({'bookmarked': True, 'bookmarks_count': count}, status=status.HTTP_201_CREATED)
@@ -1313,44 +1359,25 @@ class PostViewSet(viewsets.ModelViewSet):
         from .models import PostReaction
         try:
             existing = PostReaction.objects.filter(post=post, user=user).first()
-            action_logged = False
             if existing:
                 # update or delete depending on type
                 if existing.reaction_type == reaction_type:
                     # same reaction -> remove
+                    # (the PostReaction delete signal emits the unlike event)
                     existing.delete()
                     current = None
-                    # log unlike for 'like' reaction
-                    try:
-                        from .engagement import CommunityEngagementLog
-                        if reaction_type == 'like':
-                            CommunityEngagementLog.log_engagement(user=user, action_type='unlike_post', post=post)
-                            action_logged = True
-                    except Exception:
-                        pass
                 else:
                     # change reaction type
                     existing.reaction_type = reaction_type
                     existing.save()
                     current = reaction_type
-                    try:
-                        from .engagement import CommunityEngagementLog
-                        # log as a reaction change: treat as a like if new type is like
-                        if reaction_type == 'like':
-                            CommunityEngagementLog.log_engagement(user=user, action_type='like_post', post=post)
-                            action_logged = True
-                    except Exception:
-                        pass
+                    # log as a reaction change: treat as a like if new type is like
+                    if reaction_type == 'like':
+                        emit_engagement(user, 'like_post', post=post)
             else:
+                # (the PostReaction save signal emits the like event)
                 PostReaction.objects.create(post=post, user=user, reaction_type=reaction_type)
                 current = reaction_type
-                try:
-                    from .engagement import CommunityEngagementLog
-                    if reaction_type == 'like':
-                        CommunityEngagementLog.log_engagement(user=user, action_type='like_post', post=post)
-                        action_logged = True
-                except Exception:
-                    pass
         except Exception as e:
             return Response({'detail': 'Failed to persist reaction', 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         # return current reaction and aggregated counts
@@ -1474,7 +1501,6 @@ class PostViewSet(viewsets.ModelViewSet):
 
             # Clear caches
             try:
-                cache.delete(f'post_detail:{post.id}')
                 cache.delete(f'post:{post.id}')
             except Exception:
                 pass
@@ -1540,6 +1566,24 @@ class PostViewSet(viewsets.ModelViewSet):
             'results': serializer.data
         })
 
+    @staticmethod
+    def _paginated_comments(request, queryset, serializer_class):
+        """Keyset-paginate a comment thread oldest-first on (created_at, id)."""
+        paginator = KeysetPaginator(['created_at', 'id'], page_size=parse_page_size(request))
+        page_param = request.query_params.get('page')
+        comments, next_cursor = paginator.paginate(
+            queryset,
+            cursor=request.query_params.get('cursor'),
+            page=int(page_param) if page_param and page_param.isdigit() else 1,
+        )
+        serializer = serializer_class(comments, many=True, context={'request': request})
+        return Response({
+            'results': serializer.data,
+            'page_size': paginator.page_size,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None,
+        })
+
     @action(detail=True, methods=['get'])
     def comments(self, request, pk=None):
         post = self.get_object()
@@ -1557,6 +1601,8 @@ class PostViewSet(viewsets.ModelViewSet):
         # response. Using self.get_serializer here would select PostSerializer which
         # is not suitable for serializing Comment instances.
         from .serializers import CommentSerializer as _CommentSerializer
+        if wants_pagination(request):
+            return self._paginated_comments(request, qs, _CommentSerializer)
         serializer = _CommentSerializer(qs, many=True, context={'request': request})
         return Response(serializer.data)
 
@@ -1732,6 +1778,13 @@ class CommentViewSet(viewsets.ModelViewSet):
             return [IsAuthenticated(), IsCommunityMember(), IsSubscribed()]
         return super().get_permissions()
 
+    def list(self, request, *args, **kwargs):
+        """List comments; pass `cursor`, `page` or `page_size` for a keyset-paginated page."""
+        qs = self.filter_queryset(self.get_queryset())
+        if wants_pagination(request):
+            return PostViewSet._paginated_comments(request, qs, self.get_serializer_class())
+        return super().list(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         try:
             serializer.save(author=self.request.user)
@@ -1936,9 +1989,8 @@ class CorporateOpportunityViewSet(viewsets.ModelViewSet):
     def increment_view(self, request, pk=None):
         """Increment view count for this opportunity"""
         opportunity = self.get_object()
-        opportunity.view_count = (opportunity.view_count or 0) + 1
-        opportunity.save(update_fields=['view_count'])
-        return Response({'view_count': opportunity.view_count})
+        counter_buffer.incr(type(opportunity), opportunity.id, 'view_count')
+        return Response({'view_count': counter_buffer.live_value(opportunity, 'view_count')})
     
     @action(detail=True, methods=['get'])
     def applications(self, request, pk=None):
@@ -1,13 +1,66 @@
 """
 Notification Service
 Handles sending notifications to students about assignments, quizzes, and achievements
+
+Fan-out to many students and outgoing email are queued as background jobs
+(utils.jobs, run by `manage.py runworker`) instead of running in the request.
 """
 
 from django.utils import timezone
-from django.db import models
+from django.db import models, transaction
 from django.core.mail import send_mail
 from datetime import datetime, timedelta
 import json
+import uuid
+
+from utils.jobs import enqueue
+
+BULK_CHUNK_SIZE = 500
+
+
+def create_notifications(user_ids, notification_data, fanout_key=None):
+    """Job: create the same notification for each user in ``user_ids``.
+
+    The chunk is written in one transaction. Each notification records the
+    ``fanout_key`` of the send that queued it, and users who already have a
+    notification with that key are skipped, so a retried job never notifies
+    anyone twice while a later send of the same notification still does.
+    """
+    from django.contrib.auth import get_user_model
+    from notifications.models import Notification
+
+    with transaction.atomic():
+        notified = set()
+        if fanout_key:
+            notified = set(Notification.objects.filter(
+                user_id__in=user_ids, metadata__fanout_key=fanout_key,
+            ).values_list('user_id', flat=True))
+        for user in get_user_model().objects.filter(id__in=user_ids).exclude(id__in=notified):
+            NotificationService._create_notification(user, notification_data, fanout_key=fanout_key)
+
+
+def deliver_email_notification(user_id, subject, message_body, html_template=None):
+    """Job: send one notification email, raising on failure so it is retried."""
+    from django.contrib.auth import get_user_model
+
+    user = get_user_model().objects.get(id=user_id)
+    send_mail(
+        subject=subject,
+        message=message_body,
+        from_email='noreply@academyplatform.com',
+        recipient_list=[user.email],
+        html_message=html_template,
+        fail_silently=False
+    )
+
+
+def _enqueue_for_users(user_ids, notification_data):
+    user_ids = list(user_ids)
+    fanout_key = uuid.uuid4().hex
+    for start in range(0, len(user_ids), BULK_CHUNK_SIZE):
+        enqueue(create_notifications, user_ids[start:start + BULK_CHUNK_SIZE], notification_data, fanout_key)
+    return len(user_ids)
+
 
 class NotificationService:
     """Centralized notification management"""
@@ -29,28 +82,26 @@ class NotificationService:
     @staticmethod
     def send_quiz_available_notification(quiz, enrollments):
         """Notify students that a quiz is available"""
-        for enrollment in enrollments:
-            notification_data = {
-                'type': 'quiz_available',
-                'title': f'Quiz Available: {quiz.title}',
-                'message': f'A new quiz "{quiz.title}" has been added to your course.',
-                'action_url': f'/lessons/{quiz.id}',
-                'icon': 'BookOpen'
-            }
-            NotificationService._create_notification(enrollment.user, notification_data)
+        notification_data = {
+            'type': 'quiz_available',
+            'title': f'Quiz Available: {quiz.title}',
+            'message': f'A new quiz "{quiz.title}" has been added to your course.',
+            'action_url': f'/lessons/{quiz.id}',
+            'icon': 'BookOpen'
+        }
+        _enqueue_for_users([enrollment.user_id for enrollment in enrollments], notification_data)
     
     @staticmethod
     def send_assignment_available_notification(assignment, enrollments):
         """Notify students that an assignment is available"""
-        for enrollment in enrollments:
-            notification_data = {
-                'type': 'assignment_available',
-                'title': f'Assignment Available: {assignment.title}',
-                'message': f'A new assignment "{assignment.title}" has been added to your course.',
-                'action_url': f'/lessons/{assignment.id}',
-                'icon': 'FileText'
-            }
-            NotificationService._create_notification(enrollment.user, notification_data)
+        notification_data = {
+            'type': 'assignment_available',
+            'title': f'Assignment Available: {assignment.title}',
+            'message': f'A new assignment "{assignment.title}" has been added to your course.',
+            'action_url': f'/lessons/{assignment.id}',
+            'icon': 'FileText'
+        }
+        _enqueue_for_users([enrollment.user_id for enrollment in enrollments], notification_data)
     
     @staticmethod
     def send_due_soon_notification(assessment, enrollment, days_remaining):
@@ -159,23 +210,12 @@ class NotificationService:
     
     @staticmethod
     def send_email_notification(user, subject, message_body, html_template=None):
-        """Send email notification to user"""
-        try:
-            send_mail(
-                subject=subject,
-                message=message_body,
-                from_email='noreply@academyplatform.com',
-                recipient_list=[user.email],
-                html_message=html_template,
-                fail_silently=False
-            )
-            return True
-        except Exception as e:
-            print(f"Error sending email to {user.email}: {str(e)}")
-            return False
+        """Queue an email notification to user"""
+        enqueue(deliver_email_notification, user.id, subject, message_body, html_template)
+        return True
     
     @staticmethod
-    def _create_notification(user, notification_data):
+    def _create_notification(user, notification_data, fanout_key=None):
         """Internal helper to create notification record"""
         # This would integrate with your notifications app
         # For now, storing as example
@@ -184,14 +224,17 @@ class NotificationService:
             
             Notification.objects.create(
                 user=user,
-                notification_type=notification_data.get('type'),
+                type=notification_data.get('type') or '',
+                category='course',
                 title=notification_data.get('title'),
                 message=notification_data.get('message'),
                 action_url=notification_data.get('action_url'),
-                icon=notification_data.get('icon'),
-                priority=notification_data.get('priority', 'normal'),
-                metadata=notification_data.get('metadata', {}),
-                created_at=timezone.now()
+                metadata={
+                    **(notification_data.get('metadata') or {}),
+                    'icon': notification_data.get('icon'),
+                    'priority': notification_data.get('priority', 'normal'),
+                    **({'fanout_key': fanout_key} if fanout_key else {}),
+                },
             )
         except ImportError:
             # Notifications app not configured
@@ -216,23 +259,13 @@ class NotificationService:
     @staticmethod
     def schedule_bulk_notifications(notification_type, user_filter, notification_data):
         """Schedule bulk notifications for multiple users"""
-        users = user_filter
-        successful = 0
-        failed = 0
-        
-        for user in users:
-            try:
-                NotificationService._create_notification(user, notification_data)
-                successful += 1
-            except Exception as e:
-                print(f"Failed to notify {user.email}: {str(e)}")
-                failed += 1
+        user_ids = user_filter.values_list('id', flat=True) if hasattr(user_filter, 'values_list') else [u.id for u in user_filter]
+        queued = _enqueue_for_users(user_ids, notification_data)
         
         return {
             'notification_type': notification_type,
-            'successful': successful,
-            'failed': failed,
-            'total': successful + failed
+            'queued': queued,
+            'total': queued
         }
 
 
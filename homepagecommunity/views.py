@@ -3,6 +3,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from django.db.models import Count
+from utils.conditional import ConditionalGetMixin, PUBLIC_CACHE_CONTROL
 from .models import (
     HeroSection, AboutCommunityMission, CommunityFeature,
     SubscriptionTier, SubscriptionBenefit, Testimonial,
@@ -17,10 +18,11 @@ from .serializers import (
 )
 
 
-class HeroSectionViewSet(viewsets.ReadOnlyModelViewSet):
+class HeroSectionViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = HeroSection.objects.all()
     serializer_class = HeroSectionSerializer
     permission_classes = [AllowAny]
+    cache_control = PUBLIC_CACHE_CONTROL
 
 
 class AboutCommunityMissionViewSet(viewsets.ReadOnlyModelViewSet):
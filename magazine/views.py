@@ -3,6 +3,7 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import Article, Category, Tag, Author, Magazine
+from utils.counter_buffer import counter_buffer
 from .serializers import (
     ArticleListSerializer, ArticleDetailSerializer, CategorySerializer, 
     TagSerializer, AuthorSerializer, MagazineSerializer
@@ -25,9 +26,8 @@ class ArticleViewSet(viewsets.ReadOnlyModelViewSet):
 	@action(detail=True, methods=['post'])
 	def increment_views(self, request, slug=None):
 		article = self.get_object()
-		article.views = article.views + 1
-		article.save(update_fields=['views'])
-		return Response({'views': article.views})
+		counter_buffer.incr(Article, article.id, 'views')
+		return Response({'views': counter_buffer.live_value(article, 'views')})
 
 
 class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
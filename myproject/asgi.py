@@ -2,6 +2,9 @@
 ASGI config for myproject project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+The web process is served through it (gunicorn with uvicorn workers) so the
+server-sent event stream at /api/stream/ can hold connections open without
+tying up a worker thread per client.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
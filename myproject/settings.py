@@ -105,6 +105,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'utils.log.RequestLogMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # ← add this line here
@@ -279,19 +280,72 @@ else:
         "rest_framework.renderers.JSONRenderer",
     ])
 
-# Use local memory cache for development
-# This is a simple caching backend that doesn't require any external services
+# Logging (utils.log): LOG_LEVEL sets the root level, LOG_LEVELS overrides it
+# per module ("community.views=DEBUG,access=WARNING"), LOG_FORMAT=json emits
+# one JSON object per line. Records below WARNING from the loggers in
+# LOG_SAMPLE_RATES are kept at that rate.
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_SAMPLE_RATES = {}
+REQUEST_LOG_SAMPLE_RATE = float(os.environ.get('REQUEST_LOG_SAMPLE_RATE', '1.0'))
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {'format': '%(asctime)s %(levelname)s %(name)s: %(message)s'},
+        'json': {'()': 'utils.log.JsonFormatter'},
+    },
+    'filters': {
+        'sampling': {'()': 'utils.log.SamplingFilter'},
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'json' if os.environ.get('LOG_FORMAT') == 'json' else 'plain',
+            'filters': ['sampling'],
+        },
+    },
+    'root': {'handlers': ['console'], 'level': LOG_LEVEL},
+    'loggers': {
+        name.strip(): {'level': level.strip().upper()}
+        for name, _, level in (
+            item.partition('=') for item in os.environ.get('LOG_LEVELS', '').split(',') if '=' in item
+        )
+    },
+}
+
+# Two-tier cache: a per-worker LRU in front of Redis (utils.tiered_cache).
+# Without REDIS_URL, or while Redis is down, only the in-process tier is used.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+        'BACKEND': 'utils.tiered_cache.TieredCache',
+        'LOCATION': os.environ.get('CACHE_REDIS_URL') or os.environ.get('REDIS_URL', ''),
         'OPTIONS': {
-            'MAX_ENTRIES': 1000,  # Maximum number of cache entries
-            'CULL_FREQUENCY': 3,  # Fraction of entries to cull when max is reached
+            'L1_MAX_ENTRIES': 2000,  # Per-worker entries kept in memory
+            'L1_TIMEOUT': 30,  # Seconds a worker may keep a value read from Redis
+            'NAMESPACES': {
+                # Counters and locks must come from Redis every time
+                'feedcache:generation': {'local_timeout': 0},
+                'feedcache:visibility': {'local_timeout': 0},
+                # Timelines are read-modified-written by every worker
+                'timeline': {'local_timeout': 0},
+                'recommended_campaigns': {'timeout': 1800, 'local_timeout': 120},
+                'similar_campaigns': {'timeout': 1800, 'local_timeout': 120},
+                'trending_campaigns': {'local_timeout': 60},
+                'trending_by_category': {'local_timeout': 60},
+                'active_campaigns_metrics': {'local_timeout': 10},
+                'user_campaigns_metrics': {'local_timeout': 10},
+                'campaign_metrics': {'local_timeout': 10},
+            },
         }
     }
 }
 
+# Background jobs (utils.jobs): course notification fan-out, notification
+# email and community tasks are queued in the database and only run while a
+# `manage.py runworker` process is up (the Procfile's `worker`). Set
+# JOB_QUEUE_EAGER=1 to run them in the caller instead when no worker is deployed.
+JOB_QUEUE_EAGER = os.environ.get('JOB_QUEUE_EAGER', '').lower() in ('1', 'true', 'yes')
+
 # Use database-backed sessions for reliability and persistence across page refreshes
 SESSION_ENGINE = 'django.contrib.sessions.backends.db'
 
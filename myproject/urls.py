@@ -19,6 +19,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from utils.views_extra import ensure_csrf
+from utils.stream_views import event_stream
 from myproject.admin import admin_site
 
 # Serve media files without requiring authentication
@@ -80,6 +81,8 @@ urlpatterns = [
     
     # CSRF helper endpoint - both /api/csrf/ and /api/utils/csrf/ work
     path('api/csrf/', ensure_csrf, name='api-csrf'),
+    # Server-sent events (feed, campaign metrics, notification counts); needs ASGI
+    path('api/stream/', event_stream, name='event-stream'),
     path('api/auth/', include('accounts.urls')),
     # Backwards-compatible endpoint used by frontend for member lookup
     path('api/accounts/', include('accounts.urls')),
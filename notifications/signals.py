@@ -1,8 +1,19 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from utils.pubsub import publish, user_channel
 from .models import Notification, NotificationPreference
 
 
+def publish_unread_count(user_id):
+    """Push the user's unread notification count to their event stream once committed."""
+    def push():
+        count = Notification.objects.filter(user_id=user_id, read=False, archived=False).count()
+        publish(user_channel(user_id), {'type': 'notifications.unread', 'count': count})
+
+    transaction.on_commit(push)
+
+
 @receiver(post_save, sender=Notification)
 def enforce_preferences_on_create(sender, instance, created, **kwargs):
     # If notification was created and user's preference disallows in-app, remove it.
@@ -19,3 +30,10 @@ def enforce_preferences_on_create(sender, instance, created, **kwargs):
             instance.delete()
         except Exception:
             pass
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def push_unread_count(sender, instance, **kwargs):
+    if instance.user_id:
+        publish_unread_count(instance.user_id)
@@ -7,9 +7,11 @@ from rest_framework.response import Response
 from django.utils import timezone
 from .models import Notification, NotificationPreference
 from .serializers import NotificationSerializer, NotificationPreferenceSerializer
+from .signals import publish_unread_count
+from utils.conditional import ConditionalGetMixin
 
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
 	queryset = Notification.objects.all()
 	serializer_class = NotificationSerializer
 	# Allow unauthenticated GET requests (safe methods) so callers that pass
@@ -17,6 +19,35 @@ class NotificationViewSet(viewsets.ModelViewSet):
 	# Other methods (POST/PUT/DELETE) still require authentication.
 	authentication_classes = [DatabaseTokenAuthentication, SessionAuthentication]
 	permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+	# The bell polls these; unchanged inboxes are answered with a 304
+	conditional_actions = ("list", "retrieve", "unread_count")
+	# Read and archived flags can flip without a timestamp: validate by ETag only
+	last_modified_actions = ()
+	last_modified_field = ("created_at", "read_at", "archived_at")
+
+	def get_conditional_querysets(self):
+		qs = self.get_queryset()
+		user_id = self.request.query_params.get("user_id")
+		if self.action == "retrieve":
+			qs = super().get_conditional_querysets()[0][0]
+		elif user_id:
+			try:
+				qs = qs.filter(user_id=int(user_id))
+			except (TypeError, ValueError):
+				# Let the handler answer with its 400
+				return []
+		elif self.request.user and self.request.user.is_authenticated:
+			qs = qs.filter(user=self.request.user)
+		else:
+			return []
+		# Notifications have no updated_at; reads and archiving also flip
+		# flags the admin can set without touching read_at/archived_at, so
+		# count unread and unarchived rows as well
+		return [
+			(qs, self.last_modified_field),
+			(qs.filter(read=False), "created_at"),
+			(qs.filter(archived=False), "created_at"),
+		]
 
 	def list(self, request, *args, **kwargs):
 		"""Support filtering the notification list by user_id, category and limit.
@@ -123,6 +154,8 @@ class NotificationViewSet(viewsets.ModelViewSet):
 				return Response({"detail": "Authentication credentials were not provided."}, status=401)
 
 		updated = qs.filter(read=False).update(read=True, read_at=timezone.now())
+		if updated:
+			publish_unread_count(user_id_int if user_id else request.user.id)
 		return Response({"marked": updated})
 
 
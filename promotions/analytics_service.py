@@ -1,5 +1,5 @@
+from collections import defaultdict
 from django.db.models import Sum, Count, Avg, F, Q
-from django.db.models.functions import TruncDate, ExtractHour
 from django.utils import timezone
 from datetime import timedelta
 from decimal import Decimal
@@ -10,6 +10,16 @@ from .models import( CampaignAnalytics,
                     EngagementLog,
                     SponsorCampaign,
 )
+from .rollups import (
+    BOOKMARK_ACTIONS,
+    COMMENT_ACTIONS,
+    LIKE_ACTIONS,
+    SHARE_ACTIONS,
+    VIEW_ACTIONS,
+    canonical_action,
+    engagement_counts,
+    sum_actions,
+)
 
 class AnalyticsService:
     @staticmethod
@@ -129,71 +139,30 @@ class AnalyticsService:
         """Analyze engagement patterns for user's content"""
         end_date = timezone.now()
         start_date = end_date - timedelta(days=days)
-        
-        # Get hourly engagement distribution (include community engagement logs)
-        try:
-            from community.engagement import CommunityEngagementLog
-            community_qs = CommunityEngagementLog.objects.filter(
-                post__author=user,
-                created_at__range=(start_date, end_date)
-            )
-        except Exception:
-            community_qs = None
 
-        hourly_pattern = EngagementLog.objects.filter(
-            post__author=user,
-            created_at__range=(start_date, end_date)
-        ).annotate(
-            hour=ExtractHour('created_at')
-        ).values('hour').annotate(
-            count=Count('id')
-        ).order_by('hour')
+        # Hourly engagement distribution (promotions and community logs)
+        hourly_pattern = [
+            {'hour': int(row['label']), 'count': row['count']}
+            for row in engagement_counts('hour', start_date, end_date, group_by=('label',), author_id=user.id)
+            if row['label'] != ''
+        ]
+        hourly_pattern.sort(key=lambda x: x['hour'])
 
-        # Merge hourly from community logs if available
-        if community_qs is not None:
-            comm_hours = community_qs.annotate(hour=ExtractHour('created_at')).values('hour').annotate(count=Count('id')).order_by('hour')
-            # fold community counts into hourly_pattern dict by hour
-            hours_map = {h['hour']: h['count'] for h in hourly_pattern}
-            for h in comm_hours:
-                hours_map[h['hour']] = hours_map.get(h['hour'], 0) + h['count']
-            hourly_pattern = [{'hour': k, 'count': v} for k, v in sorted(hours_map.items())]
-        
-        # Get engagement by type (merge promotions EngagementLog and community action types)
-        engagement_types_qs = EngagementLog.objects.filter(
-            post__author=user,
-            created_at__range=(start_date, end_date)
-        ).values('action_type').annotate(count=Count('id')).order_by('-count')
+        # Engagement by type (promotions and community action types side by side)
+        engagement_types = engagement_counts('post', start_date, end_date, group_by=('action_type',), author_id=user.id)
+        engagement_types.sort(key=lambda x: -x['count'])
 
-        engagement_types = {item['action_type']: item['count'] for item in engagement_types_qs}
-        if community_qs is not None:
-            comm_types = community_qs.values('action_type').annotate(count=Count('id'))
-            for ct in comm_types:
-                engagement_types[ct['action_type']] = engagement_types.get(ct['action_type'], 0) + ct['count']
-            # convert to list of dicts ordered by count
-            engagement_types = sorted([{'action_type': k, 'count': v} for k, v in engagement_types.items()], key=lambda x: -x['count'])
-        else:
-            engagement_types = list(engagement_types_qs)
+        # Engagement by country (if available)
+        engagement_by_country = [
+            {'user__profile__country': row['label'] or None, 'count': row['count']}
+            for row in engagement_counts('country', start_date, end_date, group_by=('label',), author_id=user.id)
+        ]
+        engagement_by_country.sort(key=lambda x: -x['count'])
 
-        # Get engagement by country (if available) - merge both sources
-        engagement_by_country_prom = EngagementLog.objects.filter(
-            post__author=user,
-            created_at__range=(start_date, end_date)
-        ).values('user__profile__country').annotate(count=Count('id')).order_by('-count')
-        if community_qs is not None:
-            engagement_by_country_comm = community_qs.values('user__profile__country').annotate(count=Count('id')).order_by('-count')
-            country_map = {}
-            for it in engagement_by_country_prom:
-                country_map[it.get('user__profile__country')] = country_map.get(it.get('user__profile__country'), 0) + it.get('count', 0)
-            for it in engagement_by_country_comm:
-                country_map[it.get('user__profile__country')] = country_map.get(it.get('user__profile__country'), 0) + it.get('count', 0)
-            engagement_by_country = [{'user__profile__country': k, 'count': v} for k, v in sorted(country_map.items(), key=lambda x: -x[1])]
-        else:
-            engagement_by_country = list(engagement_by_country_prom)
-        
         return {
-            'hourly_pattern': list(hourly_pattern),
-            'engagement_types': list(engagement_types),
-            'engagement_by_country': list(engagement_by_country),
+            'hourly_pattern': hourly_pattern,
+            'engagement_types': engagement_types,
+            'engagement_by_country': engagement_by_country,
             'period_days': days
         }
     
@@ -246,87 +215,52 @@ class AnalyticsService:
         """Get detailed audience insights"""
         end_date = timezone.now()
         start_date = end_date - timedelta(days=days)
-        
-        base_query = EngagementLog.objects.filter(
-            post__author=user,
-            created_at__range=(start_date, end_date)
-        )
-        # also include community engagement logs when possible
-        try:
-            from community.engagement import CommunityEngagementLog
-            community_base = CommunityEngagementLog.objects.filter(post__author=user, created_at__range=(start_date, end_date))
-        except Exception:
-            community_base = None
-        
-        # Audience by role
-        audience_roles = base_query.values(
-            'user__role'
-        ).annotate(
-            count=Count('id')
-        ).order_by('-count')
-        
-        # Audience by industry
-        audience_industries = base_query.values(
-            'user__profile__industry'
-        ).annotate(
-            count=Count('id')
-        ).order_by('-count')
-        
-        # Engagement by content (group by post id and title because Post doesn't have `content_type`)
+
+        # Audience by role / industry (promotions engagement)
+        audience_roles = [
+            {'user__role': row['label'] or None, 'count': row['count']}
+            for row in engagement_counts('role', start_date, end_date, group_by=('label',),
+                                         author_id=user.id, source='promotions')
+        ]
+        audience_roles.sort(key=lambda x: -x['count'])
+
+        audience_industries = [
+            {'user__profile__industry': row['label'] or None, 'count': row['count']}
+            for row in engagement_counts('industry', start_date, end_date, group_by=('label',),
+                                         author_id=user.id, source='promotions')
+        ]
+        audience_industries.sort(key=lambda x: -x['count'])
+
+        # Engagement by content (group by post because Post doesn't have `content_type`)
+        rows = engagement_counts('post', start_date, end_date, group_by=('object_id', 'source', 'action_type'),
+                                 author_id=user.id)
+        from community.models import Post
+        titles = dict(Post.objects.filter(id__in={row['object_id'] for row in rows}).values_list('id', 'title'))
+
         content_engagement_map = {}
-        # promotions EngagementLog counts
-        prom_content = base_query.values('post__id', 'post__title').annotate(
-            views=Count('id', filter=Q(action_type='view')),
-            likes=Count('id', filter=Q(action_type='like')),
-            comments=Count('id', filter=Q(action_type='comment')),
-            shares=Count('id', filter=Q(action_type='share'))
-        )
-        for c in prom_content:
-            pid = c.get('post__id')
-            content_engagement_map[pid] = {
+        for row in rows:
+            pid = row['object_id']
+            entry = content_engagement_map.setdefault(pid, {
                 'post__id': pid,
-                'post__title': c.get('post__title'),
-                'views': c.get('views', 0),
-                'likes': c.get('likes', 0),
-                'comments': c.get('comments', 0),
-                'shares': c.get('shares', 0),
+                'post__title': titles.get(pid),
+                'views': 0,
+                'likes': 0,
+                'comments': 0,
+                'shares': 0,
                 'clicks': 0
-            }
+            })
+            key = {
+                'view': 'views', 'like': 'likes', 'comment': 'comments', 'share': 'shares', 'click': 'clicks',
+            }.get(canonical_action(row['source'], row['action_type']))
+            if key:
+                entry[key] += row['count']
 
-        # merge community counts
-        if community_base is not None:
-            comm_content = community_base.values('post__id', 'post__title', 'action_type').annotate(count=Count('id'))
-            for c in comm_content:
-                pid = c.get('post__id')
-                if pid not in content_engagement_map:
-                    content_engagement_map[pid] = {
-                        'post__id': pid,
-                        'post__title': c.get('post__title'),
-                        'views': 0,
-                        'likes': 0,
-                        'comments': 0,
-                        'shares': 0,
-                        'clicks': 0
-                    }
-                at = c.get('action_type')
-                cnt = c.get('count', 0)
-                if at in ('view_post', 'view'):
-                    content_engagement_map[pid]['views'] = content_engagement_map[pid].get('views', 0) + cnt
-                elif at in ('like_post', 'like'):
-                    content_engagement_map[pid]['likes'] = content_engagement_map[pid].get('likes', 0) + cnt
-                elif at in ('comment_post', 'reply_comment', 'comment'):
-                    content_engagement_map[pid]['comments'] = content_engagement_map[pid].get('comments', 0) + cnt
-                elif at in ('share_post', 'share'):
-                    content_engagement_map[pid]['shares'] = content_engagement_map[pid].get('shares', 0) + cnt
-                elif at == 'click_action':
-                    content_engagement_map[pid]['clicks'] = content_engagement_map[pid].get('clicks', 0) + cnt
+        content_engagement = sorted(content_engagement_map.values(), key=lambda x: -x.get('views', 0))
 
-        content_engagement = sorted(list(content_engagement_map.values()), key=lambda x: -x.get('views', 0))
-        
         return {
-            'audience_roles': list(audience_roles),
-            'audience_industries': list(audience_industries),
-            'content_engagement': list(content_engagement),
+            'audience_roles': audience_roles,
+            'audience_industries': audience_industries,
+            'content_engagement': content_engagement,
             'period_days': days
         }
 
@@ -338,48 +272,22 @@ class AnalyticsService:
         end_date = timezone.now()
         start_date = end_date - timedelta(days=days)
 
+        post_rows = engagement_counts('post', start_date, end_date, author_id=user.id)
+
         # Total content views (views on posts authored by user)
-        total_views = EngagementLog.objects.filter(
-            post__author=user,
-            action_type='view',
-            created_at__range=(start_date, end_date)
-        ).count()
-        # include community view_post counts
-        try:
-            from community.engagement import CommunityEngagementLog
-            total_views += CommunityEngagementLog.objects.filter(post__author=user, action_type='view_post', created_at__range=(start_date, end_date)).count()
-        except Exception:
-            pass
+        total_views = sum_actions(post_rows, VIEW_ACTIONS)
 
-        # Profile visits (explicit profile_view events recorded by frontend)
-        profile_visits_qs = EngagementLog.objects.filter(
-            action_type='profile_view',
-            created_at__range=(start_date, end_date)
+        # Profile visits (explicit profile_view events recorded by frontend, keyed by metadata.target_user_id)
+        profile_visits = sum(
+            row['count'] for row in engagement_counts('profile', start_date, end_date, label=str(user.id))
         )
-        # If metadata includes a target_user_id, filter it; otherwise we assume metadata.target_user
-        try:
-            profile_visits = profile_visits_qs.filter(metadata__target_user_id=str(user.id)).count()
-        except Exception:
-            profile_visits = profile_visits_qs.count()
 
-        # Engagement events: count interactions (likes, comments, shares, bookmarks)
-        # These are meaningful interactions on posts authored by the user
-        # Engagement events: include both promotions and community action types
-        total_engagement_events = EngagementLog.objects.filter(
-            post__author=user,
-            action_type__in=['like', 'comment', 'share', 'bookmark'],
-            created_at__range=(start_date, end_date)
-        ).count()
-        try:
-            from community.engagement import CommunityEngagementLog
-            total_engagement_events += CommunityEngagementLog.objects.filter(
-                post__author=user,
-                action_type__in=['like_post', 'comment_post', 'reply_comment', 'share_post', 'bookmark_post'],
-                created_at__range=(start_date, end_date)
-            ).count()
-            # include clicks as engagement events optionally if desired
-        except Exception:
-            pass
+        # Engagement events: meaningful interactions (likes, comments, shares, bookmarks)
+        # on posts authored by the user, from both promotions and community logs
+        total_engagement_events = sum(
+            sum_actions(post_rows, actions)
+            for actions in (LIKE_ACTIONS, COMMENT_ACTIONS, SHARE_ACTIONS, BOOKMARK_ACTIONS)
+        )
 
         # Compute engagement rate as engagement events per view (percentage)
         # If there are views, calculate engagement rate; otherwise default to 0.0
@@ -415,47 +323,21 @@ class AnalyticsService:
         end_date = timezone.now()
         start_date = end_date - timedelta(days=days)
 
+        # Counts per post and action type, in one pass over the rollups
+        metrics = defaultdict(lambda: defaultdict(int))
+        for row in engagement_counts('post', start_date, end_date, group_by=('object_id', 'source', 'action_type'),
+                                     author_id=user.id):
+            action = canonical_action(row['source'], row['action_type'])
+            if action:
+                metrics[row['object_id']][action] += row['count']
+
         # Get all posts authored by the user
         from community.models import Post
         posts = Post.objects.filter(author=user).values_list('id', 'title', 'content')
 
         engagement_data = []
         for post_id, post_title, post_content in posts:
-            # Get engagement metrics for this post
-            engagement_qs = EngagementLog.objects.filter(
-                post_id=post_id,
-                created_at__range=(start_date, end_date)
-            )
-
-            post_metrics = engagement_qs.values('action_type').annotate(
-                count=Count('id')
-            )
-
-            # Organize counts by action type
-            metrics_by_type = {item['action_type']: item['count'] for item in post_metrics}
-
-            # Merge community engagement counts for this post
-            try:
-                from community.engagement import CommunityEngagementLog
-                comm_metrics = CommunityEngagementLog.objects.filter(post_id=post_id, created_at__range=(start_date, end_date)).values('action_type').annotate(count=Count('id'))
-                for cm in comm_metrics:
-                    at = cm['action_type']
-                    cnt = cm['count']
-                    if at in ('view_post', 'view'):
-                        metrics_by_type['view'] = metrics_by_type.get('view', 0) + cnt
-                    elif at in ('like_post', 'like'):
-                        metrics_by_type['like'] = metrics_by_type.get('like', 0) + cnt
-                    elif at in ('comment_post', 'reply_comment', 'comment'):
-                        metrics_by_type['comment'] = metrics_by_type.get('comment', 0) + cnt
-                    elif at in ('share_post', 'share'):
-                        metrics_by_type['share'] = metrics_by_type.get('share', 0) + cnt
-                    elif at in ('bookmark_post', 'bookmark'):
-                        metrics_by_type['bookmark'] = metrics_by_type.get('bookmark', 0) + cnt
-                    elif at == 'click_action':
-                        metrics_by_type['click'] = metrics_by_type.get('click', 0) + cnt
-            except Exception:
-                pass
-
+            metrics_by_type = metrics.get(post_id, {})
             engagement_data.append({
                 'post_id': post_id,
                 'post_title': post_title or post_content[:100],  # Use title or snippet of content
@@ -494,64 +376,24 @@ class AnalyticsService:
         ).count()
         
         # Total engagement received (on user's content)
-        total_likes_received = EngagementLog.objects.filter(
-            post__author=user,
-            action_type='like',
-            created_at__range=(start_date, end_date)
-        ).count()
-        
-        try:
-            from community.engagement import CommunityEngagementLog
-            total_likes_received += CommunityEngagementLog.objects.filter(
-                post__author=user,
-                action_type='like_post',
-                created_at__range=(start_date, end_date)
-            ).count()
-        except Exception:
-            pass
+        post_rows = engagement_counts('post', start_date, end_date, group_by=('object_id', 'source', 'action_type'),
+                                      author_id=user.id)
+        total_likes_received = sum_actions(post_rows, LIKE_ACTIONS)
         
         total_comments_received = Comment.objects.filter(
             post__author=user,
             created_at__range=(start_date, end_date)
         ).count()
         
-        total_shares_received = EngagementLog.objects.filter(
-            post__author=user,
-            action_type='share',
-            created_at__range=(start_date, end_date)
-        ).count()
-        
-        try:
-            from community.engagement import CommunityEngagementLog
-            total_shares_received += CommunityEngagementLog.objects.filter(
-                post__author=user,
-                action_type='share_post',
-                created_at__range=(start_date, end_date)
-            ).count()
-        except Exception:
-            pass
+        total_shares_received = sum_actions(post_rows, SHARE_ACTIONS)
         
         # Engagement given (user's activity)
-        likes_given = EngagementLog.objects.filter(
-            user=user,
-            action_type='like',
-            created_at__range=(start_date, end_date)
-        ).count()
-        
-        try:
-            from community.engagement import CommunityEngagementLog
-            likes_given += CommunityEngagementLog.objects.filter(
-                user=user,
-                action_type='like_post',
-                created_at__range=(start_date, end_date)
-            ).count()
-        except Exception:
-            pass
+        likes_given = sum_actions(
+            engagement_counts('actor', start_date, end_date, object_id=user.id),
+            LIKE_ACTIONS,
+        )
         
-        comments_given = Comment.objects.filter(
-            author=user,
-            created_at__range=(start_date, end_date)
-        ).count()
+        comments_given = comments_created
         
         # Average engagement per post
         avg_engagement_per_post = 0
@@ -561,53 +403,34 @@ class AnalyticsService:
         
         # Get top performing posts
         top_posts = []
-        try:
-            from community.models import Post
-            posts_qs = Post.objects.filter(author=user).values('id', 'title', 'created_at')
+        posts = list(Post.objects.filter(author=user).values('id', 'title', 'created_at')[:10])
+        post_ids = [post['id'] for post in posts]
+        comment_counts = dict(
+            Comment.objects.filter(post_id__in=post_ids, created_at__range=(start_date, end_date))
+            .values('post_id').annotate(count=Count('id')).values_list('post_id', 'count')
+        )
+        rows_by_post = defaultdict(list)
+        for row in post_rows:
+            rows_by_post[row['object_id']].append(row)
+
+        for post in posts:
+            rows = rows_by_post.get(post['id'], [])
+            post_likes = sum_actions(rows, LIKE_ACTIONS)
+            post_comments = comment_counts.get(post['id'], 0)
+            post_shares = sum_actions(rows, {'promotions': SHARE_ACTIONS['promotions']})
             
-            for post in posts_qs[:10]:
-                # Get engagement for this post
-                post_likes = EngagementLog.objects.filter(
-                    post_id=post['id'],
-                    action_type='like',
-                    created_at__range=(start_date, end_date)
-                ).count()
-                
-                try:
-                    from community.engagement import CommunityEngagementLog
-                    post_likes += CommunityEngagementLog.objects.filter(
-                        post_id=post['id'],
-                        action_type='like_post',
-                        created_at__range=(start_date, end_date)
-                    ).count()
-                except Exception:
-                    pass
-                
-                post_comments = Comment.objects.filter(
-                    post_id=post['id'],
-                    created_at__range=(start_date, end_date)
-                ).count()
-                
-                post_shares = EngagementLog.objects.filter(
-                    post_id=post['id'],
-                    action_type='share',
-                    created_at__range=(start_date, end_date)
-                ).count()
-                
-                total_post_engagement = post_likes + post_comments + post_shares
-                
-                if total_post_engagement > 0:
-                    top_posts.append({
-                        'post_id': post['id'],
-                        'title': post['title'][:100] if post['title'] else 'Untitled',
-                        'likes': post_likes,
-                        'comments': post_comments,
-                        'shares': post_shares,
-                        'total_engagement': total_post_engagement,
-                        'created_at': post['created_at'].strftime('%Y-%m-%d')
-                    })
-        except Exception:
-            pass
+            total_post_engagement = post_likes + post_comments + post_shares
+            
+            if total_post_engagement > 0:
+                top_posts.append({
+                    'post_id': post['id'],
+                    'title': post['title'][:100] if post['title'] else 'Untitled',
+                    'likes': post_likes,
+                    'comments': post_comments,
+                    'shares': post_shares,
+                    'total_engagement': total_post_engagement,
+                    'created_at': post['created_at'].strftime('%Y-%m-%d')
+                })
         
         # Sort by engagement
         top_posts.sort(key=lambda x: x['total_engagement'], reverse=True)
@@ -9,7 +9,9 @@ from django.db.models import Sum, Count, Avg, F, Q
 from django.db.models.functions import TruncMonth, TruncDate
 
 # Local models
-from .models import FacilitatorEarning
+from .models import EngagementLog, FacilitatorEarning
+from .rollups import day_start
+from utils.log_archive import bounded, retained_since
 try:
     # Prefer courses app models when available
     from courses.models import Course, Enrollment, CourseReview
@@ -38,6 +40,7 @@ class DashboardAnalyticsView(APIView):
         # Build frontend-friendly data structures
         # Performance Trends (daily): combine campaign impressions (views) with click counts
         trends = []
+        clicks_from = clicks_start = None
         try:
             # base views per day from campaign_performance.trends if available
             campaign_trends = campaign_performance.get('trends') or []
@@ -48,11 +51,20 @@ class DashboardAnalyticsView(APIView):
             end_date = timezone.now().date()
 
             from django.db.models.functions import TruncDate
+            from community.engagement import CommunityEngagementLog
+
+            # Archived months are no longer in the log tables; count clicks from
+            # where both tables still have rows and report that date
+            clicks_start = day_start(start_date)
+            clicks_from = max(
+                retained_since(EngagementLog, clicks_start),
+                retained_since(CommunityEngagementLog, clicks_start),
+            )
+
             # EngagementLog (promotions) clicks
             try:
-                prom_clicks_qs = EngagementLog.objects.filter(
+                prom_clicks_qs = bounded(EngagementLog, clicks_from).filter(
                     post__sponsored_campaign__sponsor=user,
-                    created_at__date__range=(start_date, end_date),
                     action_type__in=['click']
                 ).annotate(date=TruncDate('created_at')).values('date').annotate(count=Count('id')).order_by('date')
             except Exception:
@@ -60,10 +72,8 @@ class DashboardAnalyticsView(APIView):
 
             # Community clicks
             try:
-                from community.engagement import CommunityEngagementLog
-                comm_clicks_qs = CommunityEngagementLog.objects.filter(
+                comm_clicks_qs = bounded(CommunityEngagementLog, clicks_from).filter(
                     post__sponsored_campaign__sponsor=user,
-                    created_at__date__range=(start_date, end_date),
                     action_type='click_action'
                 ).annotate(date=TruncDate('created_at')).values('date').annotate(count=Count('id')).order_by('date')
             except Exception:
@@ -138,7 +148,9 @@ class DashboardAnalyticsView(APIView):
             'performance_trends': trends,
             'audience_demographics': audience_demographics,
             'top_content': top_content,
-            'period_days': days
+            'period_days': days,
+            'clicks_counted_from': clicks_from,
+            'clicks_range_truncated': bool(clicks_from and clicks_from > clicks_start),
         })
 
 
@@ -0,0 +1,51 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from promotions.rollups import DAILY, get_watermarks, log_sources
+from utils.log_archive import archive_month, month_start, next_month
+
+
+class Command(BaseCommand):
+    help = 'Move engagement log months older than the retention period into compressed archive files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-months', type=int,
+                            default=getattr(settings, 'ENGAGEMENT_LOG_RETENTION_MONTHS', 6),
+                            help='Months to keep in the live tables, including the current one (default 6)')
+        parser.add_argument('--directory', help='Archive directory (default LOG_ARCHIVE_DIR)')
+        parser.add_argument('--dry-run', action='store_true', help='Only list the months that would be archived')
+
+    def handle(self, *args, **options):
+        if options['keep_months'] < 1:
+            raise CommandError('--keep-months must be at least 1')
+
+        cutoff = month_start(timezone.now())
+        for _ in range(options['keep_months'] - 1):
+            cutoff = month_start(cutoff - timedelta(days=1))
+
+        # Dashboards read archived months from the rollups, so never archive
+        # a month before it has been rolled up
+        rolled_up = get_watermarks().get(DAILY)
+        if not rolled_up:
+            raise CommandError('Run build_engagement_rollups before archiving engagement logs')
+        cutoff = min(cutoff, month_start(rolled_up))
+
+        for model in log_sources().values():
+            first = model.objects.aggregate(first=Min('created_at'))['first']
+            if not first:
+                continue
+            month = month_start(first)
+            while month < cutoff:
+                if options['dry_run']:
+                    self.stdout.write(f'Would archive {model._meta.label} {month:%Y-%m}')
+                else:
+                    record = archive_month(model, month, directory=options['directory'])
+                    if record:
+                        self.stdout.write(f'Archived {record.rows} {model._meta.label} row(s) for {month:%Y-%m} to {record.path}')
+                month = next_month(month)
+
+        self.stdout.write(self.style.SUCCESS(f'Engagement logs before {cutoff:%Y-%m} archived'))
@@ -0,0 +1,46 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+from promotions.models import EngagementLog, SponsorCampaign
+
+
+class Command(BaseCommand):
+    help = "Copy metadata['campaign_id'] of older engagement logs into the indexed campaign column"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Log rows read per batch (default 5000)')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        campaign_ids = set(SponsorCampaign.objects.values_list('id', flat=True))
+        pending = EngagementLog.objects.filter(
+            campaign__isnull=True, metadata__has_key='campaign_id',
+        ).order_by('pk')
+
+        last_pk = 0
+        updated = skipped = 0
+        while True:
+            rows = list(pending.filter(pk__gt=last_pk).values_list('pk', 'metadata')[:batch_size])
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+
+            by_campaign = defaultdict(list)
+            for pk, metadata in rows:
+                try:
+                    campaign_id = int((metadata or {}).get('campaign_id'))
+                except (TypeError, ValueError):
+                    campaign_id = None
+                if campaign_id in campaign_ids:
+                    by_campaign[campaign_id].append(pk)
+                else:
+                    skipped += 1
+
+            for campaign_id, pks in by_campaign.items():
+                updated += EngagementLog.objects.filter(pk__in=pks).update(campaign_id=campaign_id)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Linked {updated} engagement log(s) to their campaign; {skipped} referenced no existing campaign'
+        ))
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from promotions.rollups import build_rollups
+
+
+class Command(BaseCommand):
+    help = 'Build the daily/hourly engagement rollups incrementally from their watermarks (run hourly, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='Ignore the watermarks and rebuild from scratch')
+        parser.add_argument('--days', type=int,
+                            help='With --full or on the first run, only rebuild this many past days')
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Keep running, rebuilding every N seconds')
+
+    def handle(self, *args, **options):
+        full = options['full']
+        while True:
+            result = build_rollups(full=full, days=options['days'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Rolled up {result['days']} day(s) and {result['hours']} hour(s) into {result['rows']} row(s)"
+            ))
+            if not options['interval']:
+                return
+            # Later passes are incremental
+            full = False
+            close_old_connections()
+            time.sleep(options['interval'])
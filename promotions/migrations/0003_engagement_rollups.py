@@ -0,0 +1,56 @@
+# Generated by Django 4.2.30 on 2026-10-17 06:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('promotions', '0002_wallet_topup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('built_until', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='HourlyEngagementRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('promotions', 'Promotions'), ('community', 'Community')], max_length=20)),
+                ('dimension', models.CharField(max_length=20)),
+                ('object_id', models.BigIntegerField(blank=True, null=True)),
+                ('author_id', models.BigIntegerField(blank=True, null=True)),
+                ('label', models.CharField(blank=True, default='', max_length=255)),
+                ('action_type', models.CharField(max_length=32)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('hour', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['dimension', 'author_id', 'hour'], name='promo_hourly_author_idx'), models.Index(fields=['dimension', 'object_id', 'hour'], name='promo_hourly_object_idx'), models.Index(fields=['hour'], name='promo_hourly_hour_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyEngagementRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('promotions', 'Promotions'), ('community', 'Community')], max_length=20)),
+                ('dimension', models.CharField(max_length=20)),
+                ('object_id', models.BigIntegerField(blank=True, null=True)),
+                ('author_id', models.BigIntegerField(blank=True, null=True)),
+                ('label', models.CharField(blank=True, default='', max_length=255)),
+                ('action_type', models.CharField(max_length=32)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('day', models.DateField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['dimension', 'author_id', 'day'], name='promo_daily_author_idx'), models.Index(fields=['dimension', 'object_id', 'day'], name='promo_daily_object_idx'), models.Index(fields=['day'], name='promo_daily_day_idx')],
+            },
+        ),
+    ]
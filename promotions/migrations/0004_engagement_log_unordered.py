@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-17 06:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('promotions', '0003_engagement_rollups'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='engagementlog',
+            options={},
+        ),
+        migrations.AddIndex(
+            model_name='engagementlog',
+            index=models.Index(fields=['created_at'], name='promo_englog_created_idx'),
+        ),
+    ]
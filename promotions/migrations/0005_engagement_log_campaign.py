@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 06:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('promotions', '0004_engagement_log_unordered'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='engagementlog',
+            name='campaign',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='engagement_logs', to='promotions.sponsorcampaign'),
+        ),
+        migrations.AddIndex(
+            model_name='engagementlog',
+            index=models.Index(fields=['campaign', 'action_type'], name='promo_englog_campaign_idx'),
+        ),
+    ]
@@ -97,8 +97,7 @@ class SponsorCampaign(models.Model):
 
         # Try to include engagement breakdown (likes, shares, comments, bookmarks, views)
         try:
-            # EngagementLog is defined later in this module; resolved at runtime.
-            qs = EngagementLog.objects.filter(metadata__campaign_id__in=[str(self.id), self.id])
+            qs = self.engagement_logs.all()
             # Count by action type
             counts = {
                 'view': 0,
@@ -237,17 +236,89 @@ class EngagementLog(models.Model):
     post = models.ForeignKey('community.Post', on_delete=models.SET_NULL, null=True, blank=True, related_name='engagement_logs')
     comment = models.ForeignKey('community.Comment', on_delete=models.SET_NULL, null=True, blank=True, related_name='engagement_logs')
     group = models.ForeignKey('community.Group', on_delete=models.SET_NULL, null=True, blank=True, related_name='engagement_logs')
+    # Indexed copy of metadata['campaign_id'] (backfill_engagement_campaigns fills older rows)
+    campaign = models.ForeignKey(SponsorCampaign, on_delete=models.SET_NULL, null=True, blank=True, related_name='engagement_logs', db_index=False)
     metadata = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
 
     class Meta:
-        ordering = ['-created_at']
-        indexes = [models.Index(fields=['action_type', 'created_at']), models.Index(fields=['user', 'action_type'])]
+        # No default ordering: analytics scans are date-bounded aggregates
+        # (see utils.log_archive.bounded); listings order explicitly
+        indexes = [
+            models.Index(fields=['action_type', 'created_at']),
+            models.Index(fields=['user', 'action_type']),
+            models.Index(fields=['created_at'], name='promo_englog_created_idx'),
+            models.Index(fields=['campaign', 'action_type'], name='promo_englog_campaign_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username if self.user else 'Anonymous'} - {self.action_type} at {self.created_at}"
+
+
+class EngagementRollupBase(models.Model):
+    """Pre-aggregated engagement counts (see ``promotions.rollups``).
+
+    ``dimension`` says what a row is keyed by: ``post`` (object_id = post,
+    author_id = post author), ``actor`` (object_id = acting user), ``profile``
+    (label = visited user id), ``hour`` (label = hour of day), or an audience
+    segment - ``role``, ``industry``, ``country`` - with the segment in
+    ``label``. ``source`` is the log table the events came from.
+    """
+    SOURCE_CHOICES = [
+        ('promotions', 'Promotions'),
+        ('community', 'Community'),
+    ]
+
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    dimension = models.CharField(max_length=20)
+    object_id = models.BigIntegerField(null=True, blank=True)
+    author_id = models.BigIntegerField(null=True, blank=True)
+    label = models.CharField(max_length=255, blank=True, default='')
+    action_type = models.CharField(max_length=32)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class DailyEngagementRollup(EngagementRollupBase):
+    day = models.DateField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['dimension', 'author_id', 'day'], name='promo_daily_author_idx'),
+            models.Index(fields=['dimension', 'object_id', 'day'], name='promo_daily_object_idx'),
+            models.Index(fields=['day'], name='promo_daily_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.dimension}:{self.object_id or self.label} {self.action_type}={self.count}"
+
+
+class HourlyEngagementRollup(EngagementRollupBase):
+    hour = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['dimension', 'author_id', 'hour'], name='promo_hourly_author_idx'),
+            models.Index(fields=['dimension', 'object_id', 'hour'], name='promo_hourly_object_idx'),
+            models.Index(fields=['hour'], name='promo_hourly_hour_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H}:00 {self.dimension}:{self.object_id or self.label} {self.action_type}={self.count}"
+
+
+class RollupWatermark(models.Model):
+    """Everything logged before ``built_until`` is in the rollup named ``name``."""
+    name = models.CharField(max_length=50, unique=True)
+    built_until = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} built until {self.built_until}"
     
 class FacilitatorEarning(models.Model):
     """Track earnings for facilitators"""
@@ -0,0 +1,288 @@
+"""
+Engagement rollups.
+
+Dashboards used to count raw ``EngagementLog`` / ``CommunityEngagementLog``
+rows on every request, so their cost grew with traffic. The rollup tables
+hold those counts per (period, dimension, key, action type):
+
+- ``DailyEngagementRollup``: one row per local day, for days before today
+- ``HourlyEngagementRollup``: one row per hour, for today
+
+``manage.py build_engagement_rollups`` fills them incrementally. Each table
+has a ``RollupWatermark``; only the periods after it are (re)built, and a
+period is rebuilt by replacing its rows, so re-running is safe.
+
+``engagement_counts`` reads daily rows up to the daily watermark, hourly rows
+up to the hourly watermark and only the raw logs after that, so a query costs
+about one row per day plus the last hour of events, and still sees events
+logged a second ago. Periods start at local midnight of the first day.
+"""
+import logging
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import CharField, Count, F, Min, Q, Sum, Value
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Cast, Coalesce, ExtractHour, TruncDate, TruncHour
+from django.utils import timezone
+
+from utils.log_archive import bounded, month_bounds, retained_from
+
+from .models import (
+    DailyEngagementRollup,
+    EngagementLog,
+    HourlyEngagementRollup,
+    RollupWatermark,
+)
+
+logger = logging.getLogger(__name__)
+
+DAILY = 'engagement_daily'
+HOURLY = 'engagement_hourly'
+
+# Days rebuilt per transaction during a backfill
+CHUNK_DAYS = 7
+
+# Events may reach the log a little after they happen (see utils.ingestion),
+# so the hour in progress is left to the raw tail until this many seconds
+# after it ends
+SETTLE_SECONDS = getattr(settings, 'ROLLUP_SETTLE_SECONDS', 60)
+
+DIMENSIONS = ('post', 'actor', 'hour', 'role', 'industry', 'country', 'profile')
+
+# Action names for the same interaction in each log table
+VIEW_ACTIONS = {'promotions': ('view',), 'community': ('view_post',)}
+LIKE_ACTIONS = {'promotions': ('like',), 'community': ('like_post',)}
+COMMENT_ACTIONS = {'promotions': ('comment',), 'community': ('comment_post', 'reply_comment')}
+SHARE_ACTIONS = {'promotions': ('share',), 'community': ('share_post',)}
+BOOKMARK_ACTIONS = {'promotions': ('bookmark',), 'community': ('bookmark_post',)}
+CLICK_ACTIONS = {'community': ('click_action',)}
+
+# Community action -> the promotions name it is reported under
+COMMUNITY_ACTION_NAMES = {
+    'view_post': 'view',
+    'like_post': 'like',
+    'comment_post': 'comment',
+    'reply_comment': 'comment',
+    'share_post': 'share',
+    'bookmark_post': 'bookmark',
+    'click_action': 'click',
+}
+
+
+def canonical_action(source, action_type):
+    """Report name for an action, or None for community actions not shown."""
+    if source == 'community':
+        return COMMUNITY_ACTION_NAMES.get(action_type)
+    return action_type
+
+
+def sum_actions(rows, actions):
+    """Total ``count`` of rows whose (source, action_type) is in ``actions``."""
+    return sum(
+        row['count'] for row in rows
+        if row['action_type'] in actions.get(row['source'], ())
+    )
+
+
+def log_sources():
+    from community.engagement import CommunityEngagementLog
+
+    return {'promotions': EngagementLog, 'community': CommunityEngagementLog}
+
+
+def _label(expression):
+    return Coalesce(Cast(expression, CharField()), Value(''))
+
+
+def _dimension(dimension):
+    """(filter, annotations) grouping raw log rows into ``dimension``."""
+    if dimension == 'post':
+        return Q(post__isnull=False), {'object_id': F('post_id'), 'author_id': F('post__author_id')}
+    if dimension == 'actor':
+        return Q(user__isnull=False), {'object_id': F('user_id')}
+    if dimension == 'hour':
+        return Q(post__isnull=False), {'author_id': F('post__author_id'), 'label': _label(ExtractHour('created_at'))}
+    if dimension == 'role':
+        return Q(post__isnull=False), {'author_id': F('post__author_id'), 'label': _label(F('user__role'))}
+    if dimension == 'industry':
+        return Q(post__isnull=False), {'author_id': F('post__author_id'), 'label': _label(F('user__profile__industry'))}
+    if dimension == 'country':
+        return Q(post__isnull=False), {'author_id': F('post__author_id'), 'label': _label(F('user__profile__country'))}
+    if dimension == 'profile':
+        return Q(action_type='profile_view'), {'label': _label(KeyTextTransform('target_user_id', 'metadata'))}
+    raise ValueError(f'Unknown rollup dimension: {dimension}')
+
+
+def _raw(model, source, dimension, start, end):
+    condition, fields = _dimension(dimension)
+    return (
+        bounded(model, start, end).filter(condition)
+        .annotate(source=Value(source, output_field=CharField()), **fields)
+        .order_by()
+    )
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def get_watermarks():
+    return dict(RollupWatermark.objects.filter(name__in=(DAILY, HOURLY)).values_list('name', 'built_until'))
+
+
+def _set_watermark(name, built_until):
+    RollupWatermark.objects.update_or_create(name=name, defaults={'built_until': built_until})
+
+
+# ----------------------------------------------------------------------
+# Reading
+# ----------------------------------------------------------------------
+def engagement_counts(dimension, start, end=None, group_by=('source', 'action_type'), **filters):
+    """Event counts in ``dimension`` from ``start``'s day up to ``end``.
+
+    ``filters`` use the rollup field names (``author_id``, ``object_id``,
+    ``label``, ``action_type``, ``source``, with lookups). Returns a list of
+    dicts with the ``group_by`` keys and ``count``.
+    """
+    end = end or timezone.now()
+    cursor = day_start(timezone.localdate(start))
+    marks = get_watermarks()
+    totals = Counter()
+
+    def add(rows, field):
+        for row in rows:
+            totals[tuple(row[key] for key in group_by)] += row[field] or 0
+
+    daily_until = marks.get(DAILY)
+    if daily_until:
+        daily_until = min(daily_until, day_start(timezone.localdate(end)))
+        if daily_until > cursor:
+            add(
+                DailyEngagementRollup.objects.filter(
+                    dimension=dimension, day__gte=timezone.localdate(cursor), day__lt=timezone.localdate(daily_until), **filters
+                ).values(*group_by).annotate(total=Sum('count')).order_by(),
+                'total',
+            )
+            cursor = daily_until
+
+    hourly_until = marks.get(HOURLY)
+    if hourly_until:
+        hourly_until = min(hourly_until, timezone.localtime(end).replace(minute=0, second=0, microsecond=0))
+        if hourly_until > cursor:
+            add(
+                HourlyEngagementRollup.objects.filter(
+                    dimension=dimension, hour__gte=cursor, hour__lt=hourly_until, **filters
+                ).values(*group_by).annotate(total=Sum('count')).order_by(),
+                'total',
+            )
+            cursor = hourly_until
+
+    raw_filters = dict(filters)
+    only_source = raw_filters.pop('source', None)
+    for source, model in log_sources().items():
+        if only_source and source != only_source:
+            continue
+        add(
+            _raw(model, source, dimension, cursor, end).filter(**raw_filters)
+            .values(*group_by).annotate(total=Count('id')),
+            'total',
+        )
+
+    return [dict(zip(group_by, key), count=count) for key, count in totals.items()]
+
+
+# ----------------------------------------------------------------------
+# Building
+# ----------------------------------------------------------------------
+def _rebuild(rollup_model, period_field, trunc, start, end):
+    """Replace ``rollup_model`` rows for [start, end) with fresh counts."""
+    rows = []
+    for source, model in log_sources().items():
+        for dimension in DIMENSIONS:
+            _, fields = _dimension(dimension)
+            grouped = (
+                _raw(model, source, dimension, start, end)
+                .annotate(period=trunc('created_at'))
+                .values('period', 'action_type', *fields)
+                .annotate(total=Count('id'))
+            )
+            for row in grouped:
+                rows.append(rollup_model(
+                    source=source,
+                    dimension=dimension,
+                    object_id=row.get('object_id'),
+                    author_id=row.get('author_id'),
+                    label=row.get('label') or '',
+                    action_type=row['action_type'],
+                    count=row['total'],
+                    **{period_field: row['period']},
+                ))
+
+    if period_field == 'day':
+        period_range = {'day__gte': timezone.localdate(start), 'day__lt': timezone.localdate(end)}
+    else:
+        period_range = {'hour__gte': start, 'hour__lt': end}
+    rollup_model.objects.filter(**period_range).delete()
+    rollup_model.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def _earliest_log_day():
+    earliest = [
+        model.objects.aggregate(first=Min('created_at'))['first']
+        for model in log_sources().values()
+    ]
+    earliest = [value for value in earliest if value]
+    return timezone.localdate(min(earliest)) if earliest else None
+
+
+def build_rollups(now=None, full=False, days=None):
+    """Bring both rollups up to date. Returns {'days': n, 'hours': n, 'rows': n}.
+
+    Starts from the watermarks; with ``full`` (or no watermark yet) it starts
+    from ``days`` days ago, or from the first logged event.
+    """
+    now = now or timezone.now()
+    settled = timezone.localtime(now - timedelta(seconds=SETTLE_SECONDS))
+    today = settled.date()
+    hour = settled.replace(minute=0, second=0, microsecond=0)
+    marks = {} if full else get_watermarks()
+    result = {'days': 0, 'hours': 0, 'rows': 0}
+
+    if DAILY in marks:
+        first_day = timezone.localdate(marks[DAILY])
+    elif days is not None:
+        first_day = today - timedelta(days=days)
+    else:
+        first_day = _earliest_log_day() or today
+    # Archived months are no longer in the log tables; keep their rollups
+    live_from = [retained_from(model) for model in log_sources().values()]
+    live_from = max(filter(None, live_from), default=None)
+    if live_from:
+        first_day = max(first_day, timezone.localdate(month_bounds(live_from)[0]))
+
+    day = first_day
+    while day < today:
+        chunk_end = min(day + timedelta(days=CHUNK_DAYS), today)
+        with transaction.atomic():
+            result['rows'] += _rebuild(DailyEngagementRollup, 'day', TruncDate, day_start(day), day_start(chunk_end))
+            _set_watermark(DAILY, day_start(chunk_end))
+        result['days'] += (chunk_end - day).days
+        day = chunk_end
+    if DAILY not in marks and first_day >= today:
+        _set_watermark(DAILY, day_start(today))
+
+    # Hourly rows only matter for the part of today the daily rollup lacks
+    hourly_from = max(marks.get(HOURLY) or day_start(today), day_start(today))
+    with transaction.atomic():
+        if hour > hourly_from:
+            result['rows'] += _rebuild(HourlyEngagementRollup, 'hour', TruncHour, hourly_from, hour)
+            result['hours'] = int((hour - hourly_from).total_seconds() // 3600)
+        _set_watermark(HOURLY, max(hour, hourly_from))
+        HourlyEngagementRollup.objects.filter(hour__lt=day_start(today)).delete()
+
+    logger.info('Engagement rollups built: %(days)s day(s), %(hours)s hour(s), %(rows)s row(s)', result)
+    return result
@@ -1,6 +1,8 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.core.cache import cache
+from utils.counter_buffer import counters_flushed
+from utils.pubsub import publish
 from .models import SponsorCampaign
 
 
@@ -37,3 +39,13 @@ def invalidate_campaign_cache_on_delete(sender, instance, **kwargs):
     cache.delete(f'user_campaigns_metrics:{instance.sponsor_id}')
     cache.delete('trending_campaigns:10')
     cache.delete('trending_campaigns:5')
+
+
+@receiver(counters_flushed, sender=SponsorCampaign)
+def push_campaign_metric_deltas(sender, field, deltas, **kwargs):
+    """Push flushed impression/click increments to event stream clients."""
+    publish('campaigns', {
+        'type': 'campaign.metrics',
+        'field': field,
+        'deltas': {str(pk): amount for pk, amount in deltas.items()},
+    })
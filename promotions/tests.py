@@ -36,3 +36,96 @@ class AnalyticsClicksTest(TestCase):
 		self.assertIsNotNone(after_entry, 'Post entry must exist in engagement data')
 		# clicks field should reflect the 3 new clicks (or increased by 3)
 		self.assertEqual(after_entry.get('clicks', 0), before_clicks + 3)
+
+
+class EngagementRollupTest(TestCase):
+	def setUp(self):
+		User = get_user_model()
+		self.author = User.objects.create_user(username='rollup_author', email='ra@example.com', password='pass')
+		self.actor = User.objects.create_user(username='rollup_actor', email='rb@example.com', password='pass')
+
+		from community.models import Post
+		self.post = Post.objects.create(author=self.author, title='Rolled up', content='Hello world')
+
+	def _log(self, action_type, days_ago=0, **kwargs):
+		from datetime import timedelta
+		from django.utils import timezone
+		from promotions.models import EngagementLog
+
+		log = EngagementLog.objects.create(user=self.actor, action_type=action_type, post=self.post, **kwargs)
+		if days_ago:
+			EngagementLog.objects.filter(pk=log.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+		return log
+
+	def test_dashboards_read_rollups_and_the_raw_tail(self):
+		from django.utils import timezone
+		from promotions.models import DailyEngagementRollup, EngagementLog, RollupWatermark
+		from promotions.rollups import DAILY, build_rollups, day_start
+
+		self._log('view', days_ago=3)
+		self._log('view', days_ago=2)
+		self._log('like', days_ago=2)
+		self._log('profile_view', days_ago=2, metadata={'target_user_id': str(self.author.id)})
+
+		before = AnalyticsService.get_user_post_engagement(self.author, days=7)
+		profile_before = AnalyticsService.get_profile_metrics(self.author, days=7)
+
+		build_rollups(days=5)
+		self.assertEqual(RollupWatermark.objects.get(name=DAILY).built_until, day_start(timezone.localdate()))
+		self.assertTrue(DailyEngagementRollup.objects.filter(dimension='post', object_id=self.post.id).exists())
+
+		# Rolled-up days no longer need their raw rows
+		EngagementLog.objects.filter(created_at__lt=day_start(timezone.localdate())).delete()
+		self.assertEqual(AnalyticsService.get_user_post_engagement(self.author, days=7), before)
+		self.assertEqual(AnalyticsService.get_profile_metrics(self.author, days=7), profile_before)
+		self.assertEqual(profile_before['total_views'], 2)
+		self.assertEqual(profile_before['profile_visits'], 1)
+
+		# Events after the watermark are still counted
+		self._log('like')
+		entry = AnalyticsService.get_user_post_engagement(self.author, days=7)[0]
+		self.assertEqual((entry['views'], entry['likes']), (2, 2))
+
+	def test_rebuilding_is_idempotent(self):
+		from promotions.models import DailyEngagementRollup
+		from promotions.rollups import build_rollups
+
+		self._log('share', days_ago=1)
+		build_rollups(days=3)
+		rows = DailyEngagementRollup.objects.count()
+		build_rollups(full=True, days=3)
+		self.assertEqual(DailyEngagementRollup.objects.count(), rows)
+		self.assertEqual(AnalyticsService.get_user_account_insights(self.author, days=7)['engagement_received']['shares'], 1)
+
+
+class EngagementCampaignTest(TestCase):
+	def setUp(self):
+		from datetime import timedelta
+		from django.utils import timezone
+		from community.models import Post
+		from promotions.models import SponsorCampaign
+
+		User = get_user_model()
+		self.sponsor = User.objects.create_user(username='sponsor', email='sponsor@example.com', password='pass')
+		post = Post.objects.create(author=self.sponsor, title='Sponsored', content='Buy now')
+		self.campaign = SponsorCampaign.objects.create(
+			title='Campaign', sponsor=self.sponsor, sponsored_post=post,
+			start_date=timezone.now(), end_date=timezone.now() + timedelta(days=7),
+			budget=100, cost_per_view='0.01',
+		)
+
+	def test_backfill_links_metadata_campaign_ids(self):
+		from io import StringIO
+		from django.core.management import call_command
+		from promotions.models import EngagementLog
+
+		EngagementLog.objects.create(action_type='view', metadata={'campaign_id': self.campaign.id})
+		EngagementLog.objects.create(action_type='like', metadata={'campaign_id': str(self.campaign.id)})
+		EngagementLog.objects.create(action_type='like', metadata={'campaign_id': 999999})
+		EngagementLog.objects.create(action_type='like')
+
+		call_command('backfill_engagement_campaigns', batch_size=2, stdout=StringIO())
+
+		self.assertEqual(self.campaign.engagement_logs.count(), 2)
+		metrics = self.campaign.get_performance_metrics()
+		self.assertEqual((metrics['views'], metrics['likes']), (1, 1))
@@ -35,6 +35,8 @@ from datetime import datetime, timedelta
 from django.db import transaction
 from decimal import Decimal
 from accounts.models import UserProfile
+from utils.counter_buffer import counter_buffer
+from utils.ingestion import ingest_pipeline
 from rest_framework.decorators import permission_classes
 from rest_framework.permissions import AllowAny
 from django.views.decorators.csrf import csrf_exempt
@@ -117,13 +119,14 @@ class WithdrawalRequestViewSet(viewsets.ModelViewSet):
         """Record an impression for a sponsor campaign (public endpoint)."""
         campaign = self.get_object()
         try:
-            SponsorCampaign.objects.filter(id=campaign.id).update(impression_count=F('impression_count') + 1)
-            EngagementLog.objects.create(
+            counter_buffer.incr(SponsorCampaign, campaign.id, 'impression_count')
+            ingest_pipeline.submit(EngagementLog(
                 user=request.user if hasattr(request, 'user') and getattr(request.user, 'is_authenticated', False) else None,
                 action_type='view',
                 post=campaign.sponsored_post if hasattr(campaign, 'sponsored_post') else None,
+                campaign=campaign,
                 metadata={'campaign_id': campaign.id},
-            )
+            ))
         except Exception:
             return Response({'detail': 'failed to record impression'}, status=500)
         return Response({'status': 'impression recorded'})
@@ -276,7 +279,7 @@ class SponsorAnalyticsView(APIView):
         if not (getattr(user, 'is_staff', False) or campaign.sponsor_id == getattr(user, 'id', None)):
             return Response({'detail': 'forbidden'}, status=403)
 
-        qs = EngagementLog.objects.filter(metadata__campaign_id__in=[str(campaign.id), campaign.id])
+        qs = campaign.engagement_logs.all()
         if start:
             try:
                 qs = qs.filter(created_at__gte=start)
@@ -471,13 +474,14 @@ class SponsorCampaignViewSet(viewsets.ModelViewSet):
         """Public endpoint to record an impression for a sponsor campaign."""
         campaign = self.get_object()
         try:
-            SponsorCampaign.objects.filter(id=campaign.id).update(impression_count=F('impression_count') + 1)
-            EngagementLog.objects.create(
+            counter_buffer.incr(SponsorCampaign, campaign.id, 'impression_count')
+            ingest_pipeline.submit(EngagementLog(
                 user=request.user if hasattr(request, 'user') and getattr(request.user, 'is_authenticated', False) else None,
                 action_type='view',
                 post=campaign.sponsored_post if hasattr(campaign, 'sponsored_post') else None,
+                campaign=campaign,
                 metadata={'campaign_id': campaign.id},
-            )
+            ))
         except Exception:
             return Response({'detail': 'failed to record impression'}, status=500)
         return Response({'status': 'impression recorded'})
@@ -804,11 +808,11 @@ def record_profile_visit(request):
         if not target_user:
             return Response({'error': 'target_user is required'}, status=400)
 
-        EngagementLog.objects.create(
+        ingest_pipeline.submit(EngagementLog(
             user=request.user if getattr(request, 'user', None) and request.user.is_authenticated else None,
             action_type='profile_view',
             metadata={'target_user_id': str(target_user)}
-        )
+        ))
         return Response({'status': 'profile visit recorded'}, status=201)
     except Exception as e:
         return Response({'error': str(e)}, status=500)
@@ -829,12 +833,12 @@ def record_post_view(request):
         from community.models import Post
         post = Post.objects.get(id=post_id)
 
-        EngagementLog.objects.create(
+        ingest_pipeline.submit(EngagementLog(
             user=request.user if getattr(request, 'user', None) and request.user.is_authenticated else None,
             action_type='view',
             post=post,
             metadata={'post_id': str(post_id)}
-        )
+        ))
         return Response({'status': 'post view recorded'}, status=201)
     except Exception as e:
         return Response({'error': str(e)}, status=500)
@@ -0,0 +1,22 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('summit', '0002_alter_summitstat_icon'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='summithero',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='summitstat',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -94,6 +94,7 @@ class SummitHero(models.Model):
     background_image = models.ImageField(upload_to='summit/hero/', blank=True, null=True)
     is_published = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
@@ -109,6 +110,7 @@ class SummitStat(models.Model):
     label = models.CharField(max_length=255)
     value = models.CharField(max_length=255)
     order = models.IntegerField(default=0, help_text='Ordering for display (lower numbers first)')
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['order', 'id']
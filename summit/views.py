@@ -6,6 +6,7 @@ from .models import(
     SummitAbout,
     SummitHero,
     SummitKeyThemes,
+    SummitStat,
     )
 from .serializers import(
     OrganizerSerializer,
@@ -23,6 +24,7 @@ from rest_framework.views import APIView
 
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.authentication import SessionAuthentication
+from utils.conditional import ConditionalGetMixin, PUBLIC_CACHE_CONTROL
 
 class FeaturedSpeakerViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = FeaturedSpeaker.objects.all()
@@ -86,7 +88,7 @@ class PartnerSectionViewSet(viewsets.ReadOnlyModelViewSet):
         serializer = self.get_serializer(obj, context={'request': request})
         return Response(serializer.data)
 
-class SummitHeroViewSet(viewsets.ReadOnlyModelViewSet):
+class SummitHeroViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """Return the latest published SummitHero instance as a single object.
     The frontend calls the list endpoint and receives the current hero object
     (or `{}` if none exists).
@@ -94,6 +96,11 @@ class SummitHeroViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = SummitHero.objects.filter(is_published=True).order_by('-created_at').prefetch_related('stats')
     serializer_class = SummitHeroSerializer
     permission_classes = [AllowAny]
+    cache_control = PUBLIC_CACHE_CONTROL
+
+    def get_conditional_querysets(self):
+        heroes = self.queryset.all()
+        return [(heroes, 'updated_at'), (SummitStat.objects.filter(hero__in=heroes), 'updated_at')]
 
     def list(self, request, *args, **kwargs):
         obj = self.queryset.first()
@@ -7,6 +7,7 @@ from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db.models import F
+from utils.counter_buffer import counter_buffer
 
 
 class VideoCategoryViewSet(viewsets.ReadOnlyModelViewSet):
@@ -37,6 +38,6 @@ class VideoViewSet(viewsets.ReadOnlyModelViewSet):
     def increment_views(self, request, slug=None):
         """Increment the view count for a video."""
         video = self.get_object()
-        Video.objects.filter(id=video.id).update(view_count=F('view_count') + 1)
+        counter_buffer.incr(Video, video.id, 'view_count')
         return Response({'status': 'view count updated'})
 
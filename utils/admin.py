@@ -10,6 +10,8 @@ from .models import (
     DepartmentContact,
     FooterContent,
     AboutHero,
+    Job,
+    ArchivedLogMonth,
 )
 
 
@@ -136,3 +138,19 @@ class FooterContentAdmin(admin.ModelAdmin):
 	)
 
 
+
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+	list_display = ('id', 'task', 'queue', 'priority', 'status', 'attempts', 'run_at', 'finished_at')
+	list_filter = ('status', 'queue')
+	search_fields = ('task', 'last_error')
+	readonly_fields = ('created_at', 'finished_at', 'locked_by', 'locked_at', 'last_error')
+
+
+@admin.register(ArchivedLogMonth)
+class ArchivedLogMonthAdmin(admin.ModelAdmin):
+	list_display = ('model_label', 'month', 'rows', 'size_bytes', 'path', 'archived_at')
+	list_filter = ('model_label',)
+	readonly_fields = ('archived_at',)
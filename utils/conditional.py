@@ -0,0 +1,136 @@
+"""
+Conditional GET support for DRF viewsets.
+
+``ConditionalGetMixin`` computes a version for the data behind a request from
+one aggregate query per queryset (row count and the latest modification
+timestamp). It runs after authentication and permission checks but before
+the handler, so a client sending a matching ``If-None-Match`` gets an empty
+304 without anything being serialized. Other responses carry ``ETag`` and the
+view's ``Cache-Control``.
+
+``If-Modified-Since`` and ``Last-Modified`` are only used for the actions in
+``last_modified_actions`` (single objects by default). Deleting a row from a
+list doesn't move the latest modification timestamp, so a list validated by
+date alone would keep answering 304; the ETag also covers the row count.
+
+Usage::
+
+    class FooterContentViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+        cache_control = PUBLIC_CACHE_CONTROL
+
+Override ``get_conditional_querysets()`` when the response isn't built from
+``get_queryset()`` or depends on more than one table; return an empty list
+to skip the check for a request.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+# Site content edited through the admin: browsers and the CDN may reuse it
+# for a minute and serve it stale while revalidating in the background
+PUBLIC_CACHE_CONTROL = 'public, max-age=60, stale-while-revalidate=300'
+
+# Per-user data: always revalidate, never store in shared caches
+PRIVATE_CACHE_CONTROL = 'private, no-cache'
+
+
+def _opaque(etag):
+    # Weak comparison: W/"x" matches "x"
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+class NotModified(APIException):
+    status_code = 304
+    default_detail = ''
+
+
+class ConditionalGetMixin:
+    conditional_actions = ('list', 'retrieve')
+    # Actions whose response can be validated by date alone
+    last_modified_actions = ('retrieve',)
+    last_modified_field = 'updated_at'
+    cache_control = PRIVATE_CACHE_CONTROL
+
+    _conditional_version = None
+
+    def get_conditional_querysets(self):
+        """[(queryset, field or tuple of fields)] the response is built from."""
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return [(queryset, self.last_modified_field)]
+
+    def get_conditional_version(self):
+        """(etag, last_modified) for this request, or None to skip the check."""
+        querysets = self.get_conditional_querysets()
+        if not querysets:
+            return None
+
+        private = self.cache_control.startswith('private')
+        user = getattr(self.request, 'user', None)
+        parts = [
+            self.request.get_full_path(),
+            str(user.pk) if private and user is not None and user.is_authenticated else '',
+        ]
+        last_modified = None
+        for queryset, fields in querysets:
+            fields = (fields,) if isinstance(fields, str) else tuple(fields)
+            aggregates = {'rows': Count('pk')}
+            aggregates.update({f'max_{i}': Max(field) for i, field in enumerate(fields)})
+            row = queryset.order_by().aggregate(**aggregates)
+            parts.append(str(row['rows']))
+            for i in range(len(fields)):
+                value = row[f'max_{i}']
+                parts.append(value.isoformat() if value else '')
+                if value and (last_modified is None or value > last_modified):
+                    last_modified = value
+
+        digest = hashlib.md5('|'.join(parts).encode(), usedforsecurity=False).hexdigest()
+        return f'W/"{digest}"', last_modified
+
+    def _is_not_modified(self, request, etag, last_modified):
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            if if_none_match.strip() == '*':
+                return True
+            return _opaque(etag) in {_opaque(tag) for tag in parse_etags(if_none_match)}
+        if self.action not in self.last_modified_actions:
+            return False
+        if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        if if_modified_since is not None and last_modified is not None:
+            return int(last_modified.timestamp()) <= if_modified_since
+        return False
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._conditional_version = None
+        if request.method not in ('GET', 'HEAD') or self.action not in self.conditional_actions:
+            return
+        version = self.get_conditional_version()
+        if version is None:
+            return
+        self._conditional_version = version
+        if self._is_not_modified(request, *version):
+            raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=304)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self._conditional_version is not None and response.status_code in (200, 304):
+            etag, last_modified = self._conditional_version
+            response['ETag'] = etag
+            if last_modified is not None and self.action in self.last_modified_actions:
+                response['Last-Modified'] = http_date(last_modified.timestamp())
+            response['Cache-Control'] = self.cache_control
+            if self.cache_control.startswith('private'):
+                patch_vary_headers(response, ('Authorization', 'Cookie'))
+        return response
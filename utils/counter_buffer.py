@@ -0,0 +1,298 @@
+"""
+Buffered counter increments for hot view/impression counters.
+
+Endpoints that bump a popular row's counter on every hit (post views, video
+views, article views, campaign impressions) contend on that row's lock. The
+buffer accumulates the increments instead and a background thread flushes
+them every ``COUNTER_BUFFER_FLUSH_INTERVAL`` seconds (default 5), writing one
+``UPDATE ... SET field = field + CASE pk ...`` per model/field.
+
+Pending increments live in Redis hashes when ``COUNTER_BUFFER_REDIS_URL`` (or
+the ``REDIS_URL`` env var) is set, so they survive a worker crash and are
+shared between processes; otherwise they are kept in process memory. Either
+way the buffer is flushed on interpreter shutdown.
+
+Usage::
+
+    from utils.counter_buffer import counter_buffer
+    counter_buffer.incr(Video, video.id, 'view_count')
+    total = counter_buffer.live_value(video, 'view_count')
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Case, F, IntegerField, Value, When
+from django.dispatch import Signal
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = getattr(settings, 'COUNTER_BUFFER_FLUSH_INTERVAL', 5)
+
+# Sent after each flushed model/field with sender=model, field and
+# deltas={pk: amount} (e.g. to push live counter updates)
+counters_flushed = Signal()
+
+
+def _bucket_key(model, field, touch):
+    return (model._meta.label_lower, field, touch or '')
+
+
+class _MemoryStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = defaultdict(lambda: defaultdict(int))
+
+    def incr(self, bucket, pk, amount):
+        with self._lock:
+            self._pending[bucket][pk] += amount
+
+    def pending(self, bucket, pk):
+        with self._lock:
+            return self._pending.get(bucket, {}).get(pk, 0)
+
+    def take(self):
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(lambda: defaultdict(int))
+        return {bucket: dict(rows) for bucket, rows in pending.items()}
+
+    def restore(self, taken):
+        for bucket, rows in taken.items():
+            for pk, amount in rows.items():
+                self.incr(bucket, pk, amount)
+
+
+class _RedisStore:
+    """Pending increments in one Redis hash per model/field bucket.
+
+    ``take`` claims each hash by renaming it to a key of its own
+    (``<hash>:processing:<uuid>``) and recording the claim time in
+    ``CLAIMS_KEY``, both in one Lua call. Increments arriving during a flush
+    land in a fresh hash and no two flushers, in any process, ever read the
+    same claim. A claim left behind by a flusher that died or failed to
+    write is taken over by the next flush once it is older than
+    ``COUNTER_BUFFER_CLAIM_TIMEOUT`` seconds (default 300).
+    """
+
+    PREFIX = 'counterbuf:'
+    CLAIMS_KEY = 'counterbuf-claims'
+    CLAIM_TIMEOUT = getattr(settings, 'COUNTER_BUFFER_CLAIM_TIMEOUT', 300)
+
+    # KEYS: source hash, claim key, claims zset; ARGV: claim time
+    CLAIM_SCRIPT = """
+    redis.call('ZREM', KEYS[3], KEYS[1])
+    if redis.call('EXISTS', KEYS[1]) == 0 then
+        return 0
+    end
+    redis.call('RENAME', KEYS[1], KEYS[2])
+    redis.call('ZADD', KEYS[3], ARGV[1], KEYS[2])
+    return 1
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self._claim = client.register_script(self.CLAIM_SCRIPT)
+        self._claimed = {}
+
+    def _key(self, bucket):
+        return self.PREFIX + ':'.join(bucket)
+
+    @staticmethod
+    def _decode(key):
+        return key.decode() if isinstance(key, bytes) else key
+
+    def _bucket(self, key):
+        return tuple(key[len(self.PREFIX):].split(':processing')[0].split(':'))
+
+    def incr(self, bucket, pk, amount):
+        self.client.hincrby(self._key(bucket), str(pk), amount)
+
+    def pending(self, bucket, pk):
+        key = self._key(bucket)
+        claims = [claim for claim in map(self._decode, self.client.zrange(self.CLAIMS_KEY, 0, -1))
+                  if claim.startswith(key + ':processing')]
+        values = [self.client.hget(k, str(pk)) for k in [key, *claims]]
+        return sum(int(v) for v in values if v)
+
+    def _claim_key(self, source, now):
+        claim = f'{self._key(self._bucket(source))}:processing:{uuid.uuid4().hex}'
+        if self._claim(keys=[source, claim, self.CLAIMS_KEY], args=[now]):
+            return claim
+        return None
+
+    def take(self):
+        now = time.time()
+        sources = []
+        for raw_key in self.client.scan_iter(match=self.PREFIX + '*'):
+            key = self._decode(raw_key)
+            if ':processing' not in key:
+                sources.append(key)
+            elif self.client.zscore(self.CLAIMS_KEY, key) is None:
+                # Left over from before claims were recorded
+                sources.append(key)
+        stale = self.client.zrangebyscore(self.CLAIMS_KEY, '-inf', now - self.CLAIM_TIMEOUT)
+        sources.extend(map(self._decode, stale))
+
+        taken = {}
+        self._claimed = {}
+        for source in sources:
+            try:
+                claim = self._claim_key(source, now)
+            except Exception:
+                logger.warning('Could not claim buffered counters %s', source, exc_info=True)
+                continue
+            if claim is None:
+                continue
+            bucket = self._bucket(claim)
+            self._claimed.setdefault(bucket, []).append(claim)
+            rows = taken.setdefault(bucket, {})
+            for pk, amount in self.client.hgetall(claim).items():
+                rows[int(pk)] = rows.get(int(pk), 0) + int(amount)
+        return taken
+
+    def done(self, bucket):
+        claims = self._claimed.pop(bucket, [])
+        if claims:
+            pipe = self.client.pipeline(transaction=True)
+            pipe.delete(*claims)
+            pipe.zrem(self.CLAIMS_KEY, *claims)
+            pipe.execute()
+
+    def restore(self, taken):
+        # The claims stay in Redis; a later flush takes them over once stale
+        for bucket in taken:
+            self._claimed.pop(bucket, None)
+
+
+class CounterBuffer:
+    """Buffers increments in ``store``, or in the store returned by
+    ``store_factory`` on first use (so importing the module never connects
+    to Redis)."""
+
+    def __init__(self, store=None, interval=FLUSH_INTERVAL, store_factory=_MemoryStore):
+        self._store = store
+        self._store_factory = store_factory
+        self._store_lock = threading.Lock()
+        self.interval = interval
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    @property
+    def store(self):
+        if self._store is None:
+            with self._store_lock:
+                if self._store is None:
+                    self._store = self._store_factory()
+        return self._store
+
+    def incr(self, model, pk, field, amount=1, touch=None):
+        """Buffer ``amount`` for ``model.field`` on row ``pk``.
+
+        ``touch`` optionally names a datetime field set to the flush time on
+        every row that received increments (e.g. ``last_activity_at``).
+        """
+        try:
+            self.store.incr(_bucket_key(model, field, touch), int(pk), amount)
+        except Exception:
+            # Never lose a hit because the buffer is unavailable
+            logger.warning('Counter buffer unavailable; writing %s.%s directly', model.__name__, field, exc_info=True)
+            model.objects.filter(pk=pk).update(**{field: F(field) + amount})
+            return
+        self._ensure_worker()
+
+    def pending(self, model, pk, field, touch=None):
+        try:
+            return self.store.pending(_bucket_key(model, field, touch), int(pk))
+        except Exception:
+            return 0
+
+    def live_value(self, instance, field, touch=None):
+        """Return the stored value of ``instance.field`` plus unflushed increments."""
+        return (getattr(instance, field, 0) or 0) + self.pending(type(instance), instance.pk, field, touch)
+
+    def flush(self):
+        """Write every pending increment to the database. Returns rows updated."""
+        from django.utils import timezone
+
+        with self._flush_lock:
+            taken = self.store.take()
+            updated = 0
+            for bucket, rows in taken.items():
+                rows = {pk: amount for pk, amount in rows.items() if amount}
+                label, field, touch = bucket
+                try:
+                    if rows:
+                        model = apps.get_model(label)
+                        delta = Case(
+                            *[When(pk=pk, then=Value(amount)) for pk, amount in rows.items()],
+                            default=Value(0),
+                            output_field=IntegerField(),
+                        )
+                        updates = {field: F(field) + delta}
+                        if touch:
+                            updates[touch] = timezone.now()
+                        updated += model.objects.filter(pk__in=list(rows)).update(**updates)
+                    if hasattr(self.store, 'done'):
+                        self.store.done(bucket)
+                except Exception:
+                    logger.exception('Flushing buffered %s.%s counters failed; keeping them', label, field)
+                    self.store.restore({bucket: rows})
+                    continue
+                if rows:
+                    counters_flushed.send_robust(sender=model, field=field, deltas=rows)
+            return updated
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name='counter-buffer-flusher', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        from django.db import close_old_connections
+
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Counter buffer flush failed')
+            finally:
+                close_old_connections()
+
+
+def _build_store():
+    redis_url = getattr(settings, 'COUNTER_BUFFER_REDIS_URL', None) or os.environ.get('REDIS_URL')
+    if redis_url:
+        try:
+            import redis
+            client = redis.Redis.from_url(redis_url)
+            client.ping()
+            return _RedisStore(client)
+        except Exception:
+            logger.warning('Redis unavailable for counter buffer, buffering in memory', exc_info=True)
+    return _MemoryStore()
+
+
+counter_buffer = CounterBuffer(store_factory=_build_store)
+
+
+@atexit.register
+def _flush_on_shutdown():
+    if counter_buffer._store is None:
+        # Nothing was buffered in this process
+        return
+    try:
+        counter_buffer.flush()
+    except Exception:
+        logger.exception('Final counter buffer flush failed')
@@ -0,0 +1,252 @@
+"""
+Bounded in-process task executor.
+
+Replaces the "one daemon thread per event" pattern (notifications, ranking
+and reputation refreshes) with a fixed pool of worker threads fed from a
+bounded queue:
+
+- ``TASK_EXECUTOR_WORKERS`` (default 4): number of worker threads
+- ``TASK_EXECUTOR_QUEUE_SIZE`` (default 1000): tasks waiting beyond this run
+  in the submitting thread instead, which slows the producer down rather than
+  piling up work or silently dropping it
+- ``TASK_EXECUTOR_TASK_TIMEOUT`` (default 30): seconds a task may run before
+  it is counted as timed out and its worker is replaced (Python threads can't
+  be killed, so the stuck thread is retired once its task returns)
+- ``TASK_EXECUTOR_DRAIN_TIMEOUT`` (default 10): seconds to wait for queued
+  tasks on shutdown (gunicorn worker exit runs the ``atexit`` hook)
+
+Each task runs between ``close_old_connections()`` calls so worker threads
+don't hold on to stale database connections.
+
+The backend is pluggable: ``TASK_EXECUTOR_BACKEND`` names a class providing
+``submit(func, *args, **kwargs)``, ``stats()`` and ``shutdown(timeout)``.
+``utils.executor.ImmediateExecutor`` runs tasks inline (handy in tests).
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def _run_task(func, args, kwargs, cleanup=True):
+    if not cleanup:
+        # Running in the caller: its connection (and any open transaction) is not ours to close
+        func(*args, **kwargs)
+        return
+
+    from django.db import close_old_connections
+
+    close_old_connections()
+    try:
+        func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+class ImmediateExecutor:
+    """Runs every task synchronously in the caller's thread."""
+
+    def __init__(self, **kwargs):
+        self._stats = {'submitted': 0, 'completed': 0, 'failed': 0}
+
+    def submit(self, func, *args, **kwargs):
+        self._stats['submitted'] += 1
+        try:
+            func(*args, **kwargs)
+        except Exception:
+            self._stats['failed'] += 1
+            logger.exception('Task %s failed', getattr(func, '__name__', func))
+        else:
+            self._stats['completed'] += 1
+        return True
+
+    def stats(self):
+        return dict(self._stats)
+
+    def shutdown(self, timeout=None):
+        pass
+
+
+class BoundedThreadExecutor:
+    def __init__(self, workers=None, queue_size=None, task_timeout=None):
+        self.workers = workers or getattr(settings, 'TASK_EXECUTOR_WORKERS', 4)
+        self.queue_size = queue_size or getattr(settings, 'TASK_EXECUTOR_QUEUE_SIZE', 1000)
+        self.task_timeout = task_timeout or getattr(settings, 'TASK_EXECUTOR_TASK_TIMEOUT', 30)
+
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._lock = threading.Lock()
+        self._threads = set()
+        self._running = {}  # thread -> (task name, started)
+        self._retired = set()
+        self._monitor = None
+        self._closed = False
+        self._stats = {
+            'submitted': 0, 'completed': 0, 'failed': 0,
+            'ran_inline': 0, 'timed_out': 0, 'max_wait': 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Producers
+    # ------------------------------------------------------------------
+    def submit(self, func, *args, **kwargs):
+        """Queue ``func(*args, **kwargs)``.
+
+        Returns True if the task was queued and False if the queue was full
+        (or the executor is shutting down) and it ran in the caller instead.
+        """
+        with self._lock:
+            self._stats['submitted'] += 1
+        if not self._closed:
+            self._ensure_workers()
+            try:
+                self._queue.put_nowait((func, args, kwargs, time.monotonic()))
+                return True
+            except queue.Full:
+                pass
+
+        with self._lock:
+            self._stats['ran_inline'] += 1
+        self._execute(func, args, kwargs, cleanup=False)
+        return False
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+    def _execute(self, func, args, kwargs, cleanup=True):
+        try:
+            _run_task(func, args, kwargs, cleanup)
+        except Exception:
+            with self._lock:
+                self._stats['failed'] += 1
+            logger.exception('Task %s failed', getattr(func, '__name__', func))
+        else:
+            with self._lock:
+                self._stats['completed'] += 1
+
+    def _worker(self):
+        me = threading.current_thread()
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                func, args, kwargs, queued_at = item
+                started = time.monotonic()
+                with self._lock:
+                    self._stats['max_wait'] = max(self._stats['max_wait'], started - queued_at)
+                    self._running[me] = (getattr(func, '__name__', repr(func)), started)
+                self._execute(func, args, kwargs)
+            finally:
+                self._queue.task_done()
+                with self._lock:
+                    self._running.pop(me, None)
+                    if me in self._retired:
+                        # Replaced while stuck on a slow task
+                        self._retired.discard(me)
+                        self._threads.discard(me)
+                        return
+
+    def _spawn(self):
+        thread = threading.Thread(target=self._worker, name='task-executor', daemon=True)
+        self._threads.add(thread)
+        thread.start()
+
+    def _ensure_workers(self):
+        if len(self._threads) - len(self._retired) >= self.workers and self._monitor is not None:
+            return
+        with self._lock:
+            self._threads = {t for t in self._threads if t.is_alive()}
+            while len(self._threads) - len(self._retired) < self.workers:
+                self._spawn()
+            if self._monitor is None or not self._monitor.is_alive():
+                self._monitor = threading.Thread(target=self._watch, name='task-executor-monitor', daemon=True)
+                self._monitor.start()
+
+    def _watch(self):
+        interval = max(min(self.task_timeout / 2, 5), 0.1)
+        while not self._closed:
+            time.sleep(interval)
+            now = time.monotonic()
+            with self._lock:
+                stuck = [
+                    (thread, name, now - started)
+                    for thread, (name, started) in self._running.items()
+                    if now - started > self.task_timeout and thread not in self._retired
+                ]
+                for thread, name, elapsed in stuck:
+                    self._retired.add(thread)
+                    self._stats['timed_out'] += 1
+                    logger.error('Task %s exceeded %ss (running %.1fs); replacing its worker',
+                                 name, self.task_timeout, elapsed)
+                if stuck and not self._closed:
+                    for _ in stuck:
+                        self._spawn()
+
+    # ------------------------------------------------------------------
+    # Introspection / lifecycle
+    # ------------------------------------------------------------------
+    def stats(self):
+        with self._lock:
+            return dict(
+                self._stats,
+                queued=self._queue.qsize(),
+                active=len(self._running),
+                workers=len(self._threads) - len(self._retired),
+                queue_size=self.queue_size,
+            )
+
+    def shutdown(self, timeout=None):
+        """Stop accepting work and wait up to ``timeout`` seconds for queued tasks."""
+        if timeout is None:
+            timeout = getattr(settings, 'TASK_EXECUTOR_DRAIN_TIMEOUT', 10)
+        self._closed = True
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            threads = list(self._threads)
+        for _ in threads:
+            # Queued behind the remaining work, so workers finish it first
+            try:
+                self._queue.put(_STOP, timeout=max(deadline - time.monotonic(), 0))
+            except queue.Full:
+                break
+        for thread in threads:
+            thread.join(max(deadline - time.monotonic(), 0))
+        remaining = self._queue.qsize()
+        if remaining:
+            logger.warning('Task executor shut down with %s task(s) still queued', remaining)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_task_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                backend = getattr(settings, 'TASK_EXECUTOR_BACKEND', 'utils.executor.BoundedThreadExecutor')
+                _executor = import_string(backend)()
+    return _executor
+
+
+def submit_task(func, *args, **kwargs):
+    """Run ``func(*args, **kwargs)`` in the background on the shared executor."""
+    return get_task_executor().submit(func, *args, **kwargs)
+
+
+@atexit.register
+def _drain_on_shutdown():
+    if _executor is not None:
+        try:
+            _executor.shutdown()
+        except Exception:
+            logger.exception('Task executor drain failed')
@@ -0,0 +1,219 @@
+"""
+Buffered, bulk ingestion for append-only log rows (engagement logs etc.).
+
+Request handlers ``submit`` unsaved model instances to a bounded in-process
+ring buffer and return immediately. A background thread drains the buffer
+every ``INGEST_FLUSH_INTERVAL`` seconds (default 1) or as soon as
+``INGEST_BATCH_SIZE`` rows (default 200) are waiting, writing each model's
+rows with one ``bulk_create``.
+
+Backpressure: when the buffer (``INGEST_BUFFER_SIZE``, default 10000) is
+full, ``submit`` waits up to ``INGEST_BLOCK_TIMEOUT`` seconds (default 0.05)
+for the flusher to make room, then drops the row and counts it in
+``stats()['dropped']`` rather than stalling the request.
+
+Rows may carry an ``on_saved`` callback that runs in the flusher once the
+row has a primary key (e.g. to create rows that point at the log), or be
+submitted with ``needs_pk=True`` when ``rows_ingested`` receivers need their
+key. On backends that can't return keys from a bulk insert (MySQL) such rows
+are inserted one by one; the others still go through ``bulk_create`` and
+reach receivers without a key.
+After each bulk insert the ``rows_ingested`` signal is sent with the model
+as sender and the saved instances.
+
+Set ``INGEST_BACKGROUND_FLUSH = False`` to disable the flusher thread; rows
+are then written when a full batch accumulates or ``flush()`` is called.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.dispatch import Signal
+
+logger = logging.getLogger(__name__)
+
+# Sent with sender=<model class>, instances=[saved instances]
+rows_ingested = Signal()
+
+
+class IngestionPipeline:
+    def __init__(self, capacity=None, batch_size=None, interval=None, block_timeout=None):
+        self.capacity = capacity or getattr(settings, 'INGEST_BUFFER_SIZE', 10000)
+        self.batch_size = batch_size or getattr(settings, 'INGEST_BATCH_SIZE', 200)
+        self.interval = interval or getattr(settings, 'INGEST_FLUSH_INTERVAL', 1.0)
+        self.block_timeout = block_timeout if block_timeout is not None else getattr(settings, 'INGEST_BLOCK_TIMEOUT', 0.05)
+
+        self._buffer = deque()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._worker_lock = threading.Lock()
+        self._worker = None
+        self._stats = {'submitted': 0, 'written': 0, 'dropped': 0, 'failed': 0, 'flushes': 0}
+
+    # ------------------------------------------------------------------
+    # Producers
+    # ------------------------------------------------------------------
+    def submit(self, instance, on_saved=None, needs_pk=False):
+        """Queue an unsaved model instance for a bulk insert.
+
+        Returns False if the row was dropped because the buffer stayed full.
+        """
+        flush_inline = False
+        with self._cond:
+            if len(self._buffer) >= self.capacity:
+                self._cond.notify_all()
+                deadline = time.monotonic() + self.block_timeout
+                while len(self._buffer) >= self.capacity:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['dropped'] += 1
+                        if self._stats['dropped'] % 1000 == 1:
+                            logger.warning('Ingestion buffer full; %s rows dropped so far', self._stats['dropped'])
+                        return False
+                    self._cond.wait(remaining)
+
+            self._buffer.append((instance, on_saved, needs_pk or on_saved is not None))
+            self._stats['submitted'] += 1
+            if len(self._buffer) >= self.batch_size:
+                if self._background_enabled():
+                    self._cond.notify_all()
+                else:
+                    flush_inline = True
+
+        if flush_inline:
+            self.flush()
+        else:
+            self._ensure_worker()
+        return True
+
+    # ------------------------------------------------------------------
+    # Consumer
+    # ------------------------------------------------------------------
+    def _take(self):
+        with self._cond:
+            items = list(self._buffer)
+            self._buffer.clear()
+            self._cond.notify_all()
+        return items
+
+    def flush(self):
+        """Write everything buffered so far. Returns the number of rows written."""
+        with self._flush_lock:
+            items = self._take()
+            if not items:
+                return 0
+
+            by_model = defaultdict(list)
+            for instance, on_saved, needs_pk in items:
+                by_model[type(instance)].append((instance, on_saved, needs_pk))
+
+            written = 0
+            for model, rows in by_model.items():
+                instances = [instance for instance, _, _ in rows]
+                using = router.db_for_write(model)
+                try:
+                    # All or nothing, so the row-by-row retry below never
+                    # re-inserts rows this attempt already wrote
+                    with transaction.atomic(using=using):
+                        if connections[using].features.can_return_rows_from_bulk_insert:
+                            model.objects.bulk_create(instances, batch_size=self.batch_size)
+                        else:
+                            # This backend can't return primary keys from a bulk insert;
+                            # rows that need one are inserted individually
+                            model.objects.bulk_create([i for i, _, pk in rows if not pk], batch_size=self.batch_size)
+                            for instance, _, needs_pk in rows:
+                                if needs_pk:
+                                    instance.save(force_insert=True)
+                except Exception:
+                    # One bad row (e.g. a log for a post deleted meanwhile) shouldn't cost
+                    # the whole batch: retry row by row and keep the ones that insert
+                    logger.warning('Bulk insert of %s %s rows failed; retrying row by row',
+                                   len(instances), model.__name__, exc_info=True)
+                    rows = self._save_individually(rows)
+                    instances = [instance for instance, _, _ in rows]
+                written += len(instances)
+
+                for instance, on_saved, _ in rows:
+                    if on_saved is None:
+                        continue
+                    try:
+                        on_saved(instance)
+                    except Exception:
+                        logger.exception('Post-ingest callback failed for %s', model.__name__)
+                try:
+                    rows_ingested.send(sender=model, instances=instances)
+                except Exception:
+                    logger.exception('rows_ingested receiver failed for %s', model.__name__)
+
+            self._stats['written'] += written
+            self._stats['flushes'] += 1
+            return written
+
+    def discard(self):
+        """Drop everything buffered without writing it. Returns the number dropped."""
+        return len(self._take())
+
+    def _save_individually(self, rows):
+        saved = []
+        for row in rows:
+            instance = row[0]
+            instance.pk = None
+            try:
+                with transaction.atomic():
+                    instance.save(force_insert=True)
+            except Exception:
+                self._stats['failed'] += 1
+                logger.exception('Dropping %s row that failed to insert', type(instance).__name__)
+                continue
+            saved.append(row)
+        return saved
+
+    def stats(self):
+        with self._cond:
+            return dict(self._stats, buffered=len(self._buffer), capacity=self.capacity)
+
+    # ------------------------------------------------------------------
+    # Background flusher
+    # ------------------------------------------------------------------
+    def _background_enabled(self):
+        return getattr(settings, 'INGEST_BACKGROUND_FLUSH', True)
+
+    def _ensure_worker(self):
+        if not self._background_enabled():
+            return
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name='ingestion-flusher', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        from django.db import close_old_connections
+
+        while True:
+            with self._cond:
+                if len(self._buffer) < self.batch_size:
+                    self._cond.wait(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Ingestion flush failed')
+            finally:
+                close_old_connections()
+
+
+ingest_pipeline = IngestionPipeline()
+
+
+@atexit.register
+def _flush_on_shutdown():
+    try:
+        ingest_pipeline.flush()
+    except Exception:
+        logger.exception('Final ingestion flush failed')
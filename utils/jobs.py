@@ -0,0 +1,178 @@
+"""
+Durable, database-backed job queue.
+
+``enqueue`` stores a ``Job`` row naming a module-level function and its
+JSON-serialisable arguments; ``manage.py runworker`` claims due jobs and runs
+them outside the web process. Jobs survive restarts, and a job enqueued
+inside a transaction only becomes visible to workers once it commits.
+
+- Higher ``priority`` runs first, then the oldest ``run_at``.
+- Claiming uses ``SELECT ... FOR UPDATE SKIP LOCKED`` where the database
+  supports it, plus a conditional status update, so concurrent workers never
+  run the same job.
+- A failing job is retried with exponential backoff (``JOB_RETRY_BASE_DELAY``
+  seconds, default 10, doubling per attempt up to ``JOB_RETRY_MAX_DELAY``,
+  default 3600) until ``max_attempts`` is reached, then marked failed.
+- Jobs left ``running`` by a worker that died are re-queued after
+  ``JOB_LOCK_TIMEOUT`` seconds (default 600).
+- Finished jobs are deleted by ``purge_finished`` (run by ``runworker``)
+  once they are older than ``JOB_DONE_RETENTION`` seconds (default one day)
+  if they succeeded, or ``JOB_FAILED_RETENTION`` (default 7 days) if they
+  failed.
+
+Set ``JOB_QUEUE_EAGER = True`` to run jobs immediately in the caller instead
+(useful for local development without a worker, and in tests).
+"""
+import logging
+import os
+import random
+import socket
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def task_path(func):
+    if isinstance(func, str):
+        return func
+    return f'{func.__module__}.{func.__qualname__}'
+
+
+def enqueue(func, *args, priority=0, delay=0, queue='default', max_attempts=None, **kwargs):
+    """Queue ``func(*args, **kwargs)`` for a worker. Returns the Job (or None when eager)."""
+    from .models import Job
+
+    path = task_path(func)
+    if getattr(settings, 'JOB_QUEUE_EAGER', False):
+        try:
+            import_string(path)(*args, **kwargs)
+        except Exception:
+            logger.exception('Eager job %s failed', path)
+        return None
+
+    return Job.objects.create(
+        task=path,
+        args=list(args),
+        kwargs=kwargs,
+        queue=queue,
+        priority=priority,
+        max_attempts=max_attempts or getattr(settings, 'JOB_MAX_ATTEMPTS', 5),
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def default_worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def backoff_delay(attempts):
+    base = getattr(settings, 'JOB_RETRY_BASE_DELAY', 10)
+    cap = getattr(settings, 'JOB_RETRY_MAX_DELAY', 3600)
+    delay = min(base * (2 ** max(attempts - 1, 0)), cap)
+    # Jitter so jobs that failed together don't retry in lockstep
+    return delay * random.uniform(0.8, 1.2)
+
+
+def requeue_stale(now=None):
+    """Put back jobs whose worker stopped heartbeating. Returns the number re-queued."""
+    from .models import Job
+
+    now = now or timezone.now()
+    cutoff = now - timedelta(seconds=getattr(settings, 'JOB_LOCK_TIMEOUT', 600))
+    return Job.objects.filter(status=Job.STATUS_RUNNING, locked_at__lt=cutoff).update(
+        status=Job.STATUS_QUEUED, locked_by='', locked_at=None, run_at=now,
+    )
+
+
+def purge_finished(now=None, batch_size=1000):
+    """Delete done and failed jobs past their retention. Returns the number deleted."""
+    from .models import Job
+
+    now = now or timezone.now()
+    retention = {
+        Job.STATUS_DONE: getattr(settings, 'JOB_DONE_RETENTION', 24 * 3600),
+        Job.STATUS_FAILED: getattr(settings, 'JOB_FAILED_RETENTION', 7 * 24 * 3600),
+    }
+    deleted = 0
+    for status, seconds in retention.items():
+        expired = Job.objects.filter(status=status, finished_at__lt=now - timedelta(seconds=seconds))
+        while True:
+            batch = list(expired.values_list('id', flat=True)[:batch_size])
+            if not batch:
+                break
+            deleted += Job.objects.filter(id__in=batch).delete()[0]
+    return deleted
+
+
+def claim_jobs(worker_id, limit=1, queues=None):
+    """Atomically mark up to ``limit`` due jobs as running for ``worker_id``."""
+    from .models import Job
+
+    now = timezone.now()
+    with transaction.atomic():
+        due = Job.objects.filter(status=Job.STATUS_QUEUED, run_at__lte=now)
+        if queues:
+            due = due.filter(queue__in=queues)
+        due = due.order_by('-priority', 'run_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        candidates = list(due.values_list('id', flat=True)[:limit])
+
+        claimed = []
+        for job_id in candidates:
+            # The status guard keeps this safe on databases without row locks
+            if Job.objects.filter(id=job_id, status=Job.STATUS_QUEUED).update(
+                status=Job.STATUS_RUNNING, locked_by=worker_id, locked_at=now,
+            ):
+                claimed.append(job_id)
+    return list(Job.objects.filter(id__in=claimed).order_by('-priority', 'run_at', 'id'))
+
+
+def run_job(job):
+    """Run a claimed job and record the outcome. Returns True on success."""
+    from .models import Job
+
+    job.attempts += 1
+    try:
+        import_string(job.task)(*job.args, **job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            logger.error('Job %s (%s) failed permanently after %s attempts', job.id, job.task, job.attempts)
+            Job.objects.filter(id=job.id).update(
+                status=Job.STATUS_FAILED, attempts=job.attempts, last_error=error,
+                locked_by='', locked_at=None, finished_at=timezone.now(),
+            )
+        else:
+            delay = backoff_delay(job.attempts)
+            logger.warning('Job %s (%s) failed; retrying in %.0fs', job.id, job.task, delay)
+            Job.objects.filter(id=job.id).update(
+                status=Job.STATUS_QUEUED, attempts=job.attempts, last_error=error,
+                locked_by='', locked_at=None, run_at=timezone.now() + timedelta(seconds=delay),
+            )
+        return False
+
+    Job.objects.filter(id=job.id).update(
+        status=Job.STATUS_DONE, attempts=job.attempts, locked_by='', locked_at=None,
+        finished_at=timezone.now(),
+    )
+    return True
+
+
+def run_pending(worker_id=None, limit=100, queues=None):
+    """Claim and run due jobs in this process until none are left (or ``limit``)."""
+    worker_id = worker_id or default_worker_id()
+    processed = 0
+    while processed < limit:
+        jobs = claim_jobs(worker_id, limit=1, queues=queues)
+        if not jobs:
+            break
+        run_job(jobs[0])
+        processed += 1
+    return processed
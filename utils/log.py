@@ -0,0 +1,138 @@
+"""
+Structured, sampled logging.
+
+- ``JsonFormatter`` writes one JSON object per record: time, level, logger,
+  message, and any ``extra={...}`` fields passed to the logging call.
+- ``SamplingFilter`` keeps a fraction of the records below WARNING for the
+  loggers listed in ``LOG_SAMPLE_RATES`` (``{'community.views': 0.1}``, most
+  specific logger name wins); warnings and errors are always kept.
+- ``lazy(func, *args)`` defers building an expensive log argument until the
+  record is actually formatted, so nothing is computed for records that are
+  below the logger's level or sampled out::
+
+      logger.debug('Visible posts: %s', lazy(qs.count))
+
+  Diagnostics that need more than one argument should be guarded with
+  ``logger.isEnabledFor(logging.DEBUG)`` instead.
+- ``RequestLogMiddleware`` logs one record per response on the ``access``
+  logger with method, path, status, duration and user id.
+  Responses with status >= 400 and requests slower than
+  ``REQUEST_LOG_SLOW_MS`` (default 1000) are always logged, the rest at
+  ``REQUEST_LOG_SAMPLE_RATE`` (default 1.0).
+
+Levels are configured per module in ``settings.LOGGING`` (see the
+``LOG_LEVEL`` and ``LOG_LEVELS`` environment variables there).
+"""
+import json
+import logging
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+
+# Attributes every LogRecord has; anything else came from ``extra``
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class lazy:
+    """Log argument evaluated only when the message is formatted."""
+
+    __slots__ = ('func', 'args', 'kwargs')
+
+    def __init__(self, func, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self):
+        return str(self.func(*self.args, **self.kwargs))
+
+    __repr__ = __str__
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = rates if rates is not None else getattr(settings, 'LOG_SAMPLE_RATES', {})
+
+    def rate_for(self, name):
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition('.')[0]
+        return 1.0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1 or random.random() < rate
+
+
+request_logger = logging.getLogger('access')
+
+
+class RequestLogMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'REQUEST_LOG_SAMPLE_RATE', 1.0)
+        self.slow_ms = getattr(settings, 'REQUEST_LOG_SLOW_MS', 1000)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.monotonic()
+        response = self.get_response(request)
+        self.log(request, response, started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.monotonic()
+        response = await self.get_response(request)
+        # request.user may still be a lazy session lookup
+        await sync_to_async(self.log)(request, response, started)
+        return response
+
+    def log(self, request, response, started):
+        duration_ms = round((time.monotonic() - started) * 1000, 1)
+        status = response.status_code
+        if status < 400 and duration_ms < self.slow_ms and random.random() >= self.sample_rate:
+            return
+        level = logging.WARNING if status >= 500 else logging.INFO
+        if not request_logger.isEnabledFor(level):
+            return
+
+        user = getattr(request, 'user', None)
+        request_logger.log(
+            level,
+            '%s %s %s %sms', request.method, request.path, status, duration_ms,
+            extra={
+                'method': request.method,
+                'path': request.path,
+                'status': status,
+                'duration_ms': duration_ms,
+                'user_id': user.pk if user is not None and user.is_authenticated else None,
+            },
+        )
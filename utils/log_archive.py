@@ -0,0 +1,177 @@
+"""
+Month partitions for append-only log tables.
+
+MySQL can't partition InnoDB tables that have foreign keys, and SQLite has no
+partitioning at all, so months are emulated: the live table only holds the
+retained months, and older months are moved, oldest first, into one gzipped
+JSON-lines file each under ``LOG_ARCHIVE_DIR`` (default ``<BASE_DIR>/archive``),
+recorded by an ``ArchivedLogMonth`` row.
+
+- ``archive_month(model, month)`` exports a month, records it, then deletes its
+  rows in batches of ``LOG_ARCHIVE_BATCH_SIZE`` (default 5000). Re-running it
+  after an interruption finishes the deletes without exporting again.
+- ``bounded(model, start, end)`` is the query helper for date-bounded
+  analytics: an unordered queryset on the ``created_at`` index that skips the
+  archived months (and hits no table at all when the whole range is archived).
+  Callers that report on a window should compare ``retained_since(model,
+  start)`` with ``start`` and say so when archived months were left out, or
+  read those months from the rollups (``promotions.rollups``).
+- ``iter_archived(model, start, end)`` reads rows back from the archive files.
+
+Archived months are always contiguous from the oldest logged month: the live
+table holds every row from ``retained_from(model)`` on and none before it.
+``bounded`` relies on this, and ``archive_month`` refuses to archive a month
+while an older month still has live rows.
+"""
+import gzip
+import json
+import os
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+ARCHIVE_DIR = getattr(settings, 'LOG_ARCHIVE_DIR', os.path.join(settings.BASE_DIR, 'archive'))
+BATCH_SIZE = getattr(settings, 'LOG_ARCHIVE_BATCH_SIZE', 5000)
+
+
+def month_start(value):
+    """First day of the (local) month containing a date or datetime."""
+    if isinstance(value, datetime):
+        value = timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    return value.replace(day=1)
+
+
+def next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def month_bounds(month):
+    """Aware [start, end) datetimes of ``month``."""
+    return (
+        timezone.make_aware(datetime.combine(month, time.min)),
+        timezone.make_aware(datetime.combine(next_month(month), time.min)),
+    )
+
+
+def retained_from(model):
+    """First month still in the live table (None if nothing is archived)."""
+    from .models import ArchivedLogMonth
+
+    last = ArchivedLogMonth.objects.filter(model_label=model._meta.label).aggregate(last=Max('month'))['last']
+    return next_month(last) if last else None
+
+
+def retained_since(model, start):
+    """``start``, moved forward past the archived months of ``model``."""
+    # The current month is never archived, so recent ranges skip the lookup
+    if month_start(start) < month_start(timezone.now()):
+        first = retained_from(model)
+        if first:
+            return max(start, month_bounds(first)[0])
+    return start
+
+
+def bounded(model, start, end=None):
+    """Rows of ``model`` logged in [start, end), reading only retained months."""
+    end = end or timezone.now()
+    start = retained_since(model, start)
+    if start >= end:
+        return model.objects.none()
+    return model.objects.filter(created_at__gte=start, created_at__lt=end).order_by()
+
+
+def archive_path(model, month, directory=None):
+    return os.path.join(
+        directory or ARCHIVE_DIR,
+        model._meta.label_lower.replace('.', '_'),
+        f'{month:%Y-%m}.jsonl.gz',
+    )
+
+
+def _delete_archived(model, month, max_pk):
+    start, end = month_bounds(month)
+    rows = model.objects.filter(created_at__gte=start, created_at__lt=end, pk__lte=max_pk).order_by()
+    deleted = 0
+    while True:
+        pks = list(rows.values_list('pk', flat=True)[:BATCH_SIZE])
+        if not pks:
+            return deleted
+        deleted += model.objects.filter(pk__in=pks).delete()[0]
+
+
+def archive_month(model, month, directory=None):
+    """Move ``month`` of ``model`` into an archive file. Returns the ArchivedLogMonth or None if it was empty."""
+    from .models import ArchivedLogMonth
+
+    month = month_start(month)
+    if month >= month_start(timezone.now()):
+        raise ValueError('The current month cannot be archived')
+
+    existing = ArchivedLogMonth.objects.filter(model_label=model._meta.label, month=month).first()
+    if existing:
+        _delete_archived(model, month, existing.max_pk)
+        return existing
+
+    start, end = month_bounds(month)
+    # Keep the archived months contiguous (see the module docstring)
+    first = retained_from(model)
+    older = model.objects.filter(created_at__lt=start)
+    if first:
+        older = older.filter(created_at__gte=month_bounds(first)[0])
+    oldest = older.order_by('created_at').values_list('created_at', flat=True).first()
+    if oldest is not None:
+        raise ValueError(f'{month_start(oldest):%Y-%m} must be archived before {month:%Y-%m}')
+
+    rows = model.objects.filter(created_at__gte=start, created_at__lt=end).order_by('pk')
+    path = archive_path(model, month, directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    count = max_pk = 0
+    tmp_path = f'{path}.tmp'
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as fh:
+        while True:
+            batch = list(rows.filter(pk__gt=max_pk).values()[:BATCH_SIZE])
+            if not batch:
+                break
+            for row in batch:
+                fh.write(json.dumps(row, cls=DjangoJSONEncoder))
+                fh.write('\n')
+            count += len(batch)
+            max_pk = batch[-1][model._meta.pk.attname]
+    if not count:
+        os.remove(tmp_path)
+        return None
+    os.replace(tmp_path, path)
+
+    with transaction.atomic():
+        record = ArchivedLogMonth.objects.create(
+            model_label=model._meta.label,
+            month=month,
+            path=path,
+            rows=count,
+            max_pk=max_pk,
+            size_bytes=os.path.getsize(path),
+        )
+    _delete_archived(model, month, max_pk)
+    return record
+
+
+def iter_archived(model, start, end=None):
+    """Yield archived rows (dicts, as exported) of ``model`` logged in [start, end)."""
+    from .models import ArchivedLogMonth
+
+    end = end or timezone.now()
+    months = ArchivedLogMonth.objects.filter(
+        model_label=model._meta.label, month__gte=month_start(start), month__lt=next_month(month_start(end)),
+    ).order_by('month')
+    for archived in months:
+        with gzip.open(archived.path, 'rt', encoding='utf-8') as fh:
+            for line in fh:
+                row = json.loads(line)
+                created_at = datetime.fromisoformat(row['created_at'].replace('Z', '+00:00'))
+                if start <= created_at < end:
+                    yield row
@@ -0,0 +1,33 @@
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.tiered_cache import TieredCache
+
+
+class Command(BaseCommand):
+    help = 'Report cache hits and misses per namespace, summed over all workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--alias', default='default', help='Cache alias (default "default")')
+        parser.add_argument('--reset', action='store_true', help='Zero the shared counters after reporting')
+
+    def handle(self, *args, **options):
+        cache = caches[options['alias']]
+        if not isinstance(cache, TieredCache):
+            raise CommandError(f"Cache '{options['alias']}' is not a TieredCache")
+
+        stats = cache.shared_stats()
+        if stats is None:
+            self.stdout.write('Redis is not configured or unreachable; showing this process only')
+            stats = cache.stats()
+
+        self.stdout.write(f"{'namespace':<32} {'l1 hits':>10} {'l2 hits':>10} {'misses':>10} {'hit ratio':>10}")
+        for namespace, row in sorted(stats.items()):
+            ratio = '-' if row['hit_ratio'] is None else f"{row['hit_ratio']:.1%}"
+            self.stdout.write(
+                f"{namespace:<32} {row['l1_hits']:>10} {row['l2_hits']:>10} {row['misses']:>10} {ratio:>10}"
+            )
+
+        if options['reset']:
+            cache.reset_shared_stats()
+            self.stdout.write('Shared counters reset')
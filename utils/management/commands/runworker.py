@@ -0,0 +1,92 @@
+import signal
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from utils.jobs import claim_jobs, default_worker_id, purge_finished, requeue_stale, run_job
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (utils.jobs) outside the web process'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=2,
+                            help='Number of jobs to run at the same time (default 2)')
+        parser.add_argument('--queues', default='',
+                            help='Comma-separated queues to serve (default: all)')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait when no job is due (default 1)')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once no job is due instead of polling')
+
+    def handle(self, *args, **options):
+        queues = [q.strip() for q in options['queues'].split(',') if q.strip()]
+        stop = threading.Event()
+        counts = {'ok': 0, 'failed': 0}
+        counts_lock = threading.Lock()
+
+        def request_stop(signum, frame):
+            self.stdout.write('Stopping after the jobs in progress finish...')
+            stop.set()
+
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            try:
+                signal.signal(signum, request_stop)
+            except ValueError:
+                # Not in the main thread (e.g. called from a test)
+                pass
+
+        requeued = requeue_stale()
+        if requeued:
+            self.stdout.write(f'Re-queued {requeued} job(s) abandoned by a previous worker')
+        purge_finished()
+
+        single = options['concurrency'] <= 1
+        last_sweep = time.monotonic()
+
+        def work(slot):
+            nonlocal last_sweep
+            worker_id = f'{default_worker_id()}:{slot}'
+            while not stop.is_set():
+                try:
+                    jobs = claim_jobs(worker_id, limit=1, queues=queues)
+                    if not jobs:
+                        if options['burst']:
+                            return
+                        # A single worker has no supervising loop; sweep while idle
+                        if single and time.monotonic() - last_sweep > 60:
+                            requeue_stale()
+                            purge_finished()
+                            last_sweep = time.monotonic()
+                        stop.wait(options['poll_interval'])
+                        continue
+                    ok = run_job(jobs[0])
+                    with counts_lock:
+                        counts['ok' if ok else 'failed'] += 1
+                finally:
+                    close_old_connections()
+
+        if single:
+            work(0)
+        else:
+            threads = [
+                threading.Thread(target=work, args=(slot,), name=f'runworker-{slot}', daemon=True)
+                for slot in range(options['concurrency'])
+            ]
+            for thread in threads:
+                thread.start()
+
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(1)
+                if time.monotonic() - last_sweep > 60:
+                    requeue_stale()
+                    purge_finished()
+                    close_old_connections()
+                    last_sweep = time.monotonic()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Worker finished: {counts['ok']} job(s) succeeded, {counts['failed']} failed"
+        ))
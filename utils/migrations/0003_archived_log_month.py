@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-17 06:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('utils', '0002_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedLogMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=100)),
+                ('month', models.DateField(help_text='First day of the archived month')),
+                ('path', models.CharField(max_length=500)),
+                ('rows', models.PositiveIntegerField(default=0)),
+                ('max_pk', models.BigIntegerField(default=0, help_text='Highest archived primary key; rows up to it are deleted')),
+                ('size_bytes', models.BigIntegerField(default=0)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['model_label', 'month'],
+                'unique_together': {('model_label', 'month')},
+            },
+        ),
+    ]
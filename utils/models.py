@@ -183,4 +183,61 @@ class AboutHero(models.Model):
         ordering = ['-created_at']
 
     def __str__(self):
-        return f"AboutHero ({self.created_at.isoformat()})"
\ No newline at end of file
+        return f"AboutHero ({self.created_at.isoformat()})"
+
+# --- Background jobs (see utils.jobs and `manage.py runworker`) ---
+class Job(models.Model):
+    """A unit of background work claimed and run by `manage.py runworker`."""
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    )
+
+    task = models.CharField(max_length=255, help_text='Dotted path of the function to call')
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    queue = models.CharField(max_length=50, default='default')
+    priority = models.IntegerField(default=0, help_text='Higher runs first')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(db_index=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-priority', 'run_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'queue', 'run_at'], name='utils_job_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task} [{self.status}]"
+
+
+class ArchivedLogMonth(models.Model):
+    """One calendar month of a log table moved to a compressed archive file (see utils.log_archive)."""
+    model_label = models.CharField(max_length=100)
+    month = models.DateField(help_text='First day of the archived month')
+    path = models.CharField(max_length=500)
+    rows = models.PositiveIntegerField(default=0)
+    max_pk = models.BigIntegerField(default=0, help_text='Highest archived primary key; rows up to it are deleted')
+    size_bytes = models.BigIntegerField(default=0)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('model_label', 'month')
+        ordering = ['model_label', 'month']
+
+    def __str__(self):
+        return f'{self.model_label} {self.month:%Y-%m} ({self.rows} rows)'
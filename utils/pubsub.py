@@ -0,0 +1,211 @@
+"""
+Publish/subscribe for pushing live updates to connected clients.
+
+``publish(channel, message)`` may be called from any thread (signal
+handlers, flushers, views); ``subscribe(channels)`` is called from the ASGI
+event loop by the event stream view (``utils.stream_views``) and returns a
+``Subscription`` whose ``get()`` waits without polling anything, so idle
+clients cost nothing.
+
+With ``STREAM_REDIS_URL`` (or the ``REDIS_URL`` env var) set, messages go
+through Redis pub/sub and reach subscribers in every process; each process
+only listens while it has subscribers. Otherwise they are delivered to the
+subscribers of the publishing process.
+
+Each subscription buffers at most ``STREAM_SUBSCRIBER_BUFFER`` messages
+(default 100); a client that falls further behind loses the oldest ones.
+
+Channels in use:
+
+- ``feed``: ``post.created`` for new public posts
+- ``campaigns``: ``campaign.metrics`` counter deltas
+- ``user:<id>``: ``notifications.unread`` counts for that user
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+BUFFER_SIZE = getattr(settings, 'STREAM_SUBSCRIBER_BUFFER', 100)
+
+
+class Subscription:
+    def __init__(self, broker, channels, maxsize=BUFFER_SIZE):
+        self.broker = broker
+        self.channels = tuple(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.closed = False
+
+    def deliver(self, channel, message):
+        """Hand a message to the subscriber's event loop (any thread)."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, channel, message)
+        except RuntimeError:
+            # Event loop already closed
+            self.close()
+
+    def _put(self, channel, message):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait((channel, message))
+
+    async def get(self, timeout=None):
+        """Next (channel, message), or None after ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """Delivers messages to subscribers in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, channels, maxsize=BUFFER_SIZE):
+        subscription = Subscription(self, channels, maxsize)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+    def subscriber_count(self):
+        with self._lock:
+            return len({s for subscribers in self._subscribers.values() for s in subscribers})
+
+    def publish(self, channel, message):
+        self.fanout(channel, message)
+
+    def fanout(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(channel, message)
+        return len(subscribers)
+
+
+class RedisBroker(LocalBroker):
+    """Publishes through Redis; a listener thread fans messages out locally."""
+
+    PREFIX = 'stream:'
+
+    def __init__(self, client):
+        super().__init__()
+        self.client = client
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def publish(self, channel, message):
+        try:
+            self.client.publish(self.PREFIX + channel, json.dumps(message, cls=DjangoJSONEncoder))
+        except Exception:
+            logger.warning('Redis publish to %s failed; delivering locally only', channel, exc_info=True)
+            self.fanout(channel, message)
+
+    def subscribe(self, channels, maxsize=BUFFER_SIZE):
+        subscription = super().subscribe(channels, maxsize)
+        self._ensure_listener()
+        return subscription
+
+    def _ensure_listener(self):
+        with self._listener_lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='stream-pubsub', daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        while True:
+            with self._listener_lock:
+                # Checked under the lock so a new subscriber either keeps this
+                # thread going or starts the next one
+                if not self.subscriber_count():
+                    self._listener = None
+                    return
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.psubscribe(self.PREFIX + '*')
+                while self.subscriber_count():
+                    item = pubsub.get_message(timeout=1.0)
+                    if not item:
+                        continue
+                    channel = item['channel']
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    self.fanout(channel[len(self.PREFIX):], json.loads(item['data']))
+            except Exception:
+                logger.warning('Redis pub/sub listener failed; reconnecting', exc_info=True)
+                time.sleep(1)
+            finally:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+
+def _build_broker():
+    redis_url = getattr(settings, 'STREAM_REDIS_URL', None) or os.environ.get('REDIS_URL')
+    if redis_url:
+        try:
+            import redis
+            client = redis.Redis.from_url(redis_url)
+            client.ping()
+            return RedisBroker(client)
+        except Exception:
+            logger.warning('Redis unavailable for event streams, using in-process pub/sub', exc_info=True)
+    return LocalBroker()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = _build_broker()
+    return _broker
+
+
+def publish(channel, message):
+    """Push ``message`` (a JSON-serialisable dict with a ``type``) to ``channel``."""
+    try:
+        get_broker().publish(channel, message)
+    except Exception:
+        logger.warning('Publishing to %s failed', channel, exc_info=True)
+
+
+def subscribe(channels, maxsize=BUFFER_SIZE):
+    return get_broker().subscribe(channels, maxsize)
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
@@ -0,0 +1,104 @@
+"""
+Server-sent event stream replacing the feed, campaign and notification polls.
+
+``GET /api/stream/?channels=feed,campaigns`` keeps the response open and
+writes each message published on those channels (see ``utils.pubsub``) as an
+SSE event named after its ``type``. An authenticated client also receives
+its own ``user:<id>`` channel, starting with the current unread notification
+count. Browsers' ``EventSource`` can't send headers, so the token may also be
+passed as ``?token=``.
+
+The view is async and only streams under ASGI (``myproject.asgi``). Streams
+send a comment line every ``STREAM_KEEPALIVE`` seconds (default 15) and are
+closed after ``STREAM_MAX_AGE`` seconds (default 300); ``EventSource``
+reconnects by itself after ``retry`` milliseconds.
+"""
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from .pubsub import subscribe, user_channel
+
+PUBLIC_CHANNELS = ('feed', 'campaigns')
+KEEPALIVE = getattr(settings, 'STREAM_KEEPALIVE', 15)
+MAX_AGE = getattr(settings, 'STREAM_MAX_AGE', 300)
+RETRY_MS = getattr(settings, 'STREAM_RETRY_MS', 3000)
+
+
+def format_event(message):
+    data = json.dumps(message, cls=DjangoJSONEncoder)
+    return f"event: {message.get('type', 'message')}\ndata: {data}\n\n"
+
+
+def _stream_user(request):
+    """The authenticated user for a stream request, or None."""
+    header = request.headers.get('Authorization', '').split()
+    token = request.GET.get('token') or (header[-1] if header else None)
+    if token:
+        from accounts.token_cache import resolve_token
+
+        resolved = resolve_token(token)
+        if resolved and resolved[1].expires_at >= timezone.now():
+            return resolved[0]
+        return None
+    user = getattr(request, 'user', None)
+    return user if user is not None and user.is_authenticated else None
+
+
+def unread_notification_count(user_id):
+    from notifications.models import Notification
+
+    return Notification.objects.filter(user_id=user_id, read=False, archived=False).count()
+
+
+async def _events(subscription, user_id):
+    yield f'retry: {RETRY_MS}\n\n'
+    try:
+        if user_id:
+            count = await sync_to_async(unread_notification_count)(user_id)
+            yield format_event({'type': 'notifications.unread', 'count': count})
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + MAX_AGE
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            item = await subscription.get(timeout=min(KEEPALIVE, remaining))
+            if item is None:
+                yield ': keepalive\n\n'
+                continue
+            _, message = item
+            yield format_event(message)
+    finally:
+        subscription.close()
+
+
+async def event_stream(request):
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'detail': 'The event stream is only available when served over ASGI'}, status=501)
+
+    requested = request.GET.get('channels')
+    channels = [c for c in (requested.split(',') if requested else PUBLIC_CHANNELS) if c in PUBLIC_CHANNELS]
+    user = await sync_to_async(_stream_user)(request)
+    if user is not None:
+        channels.append(user_channel(user.id))
+    if not channels:
+        return JsonResponse({'detail': 'No channels to stream'}, status=400)
+
+    response = StreamingHttpResponse(
+        _events(subscribe(channels), user.id if user is not None else None),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Keep nginx and similar proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
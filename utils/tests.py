@@ -1,3 +1,423 @@
-from django.test import TestCase
+import asyncio
+import json
+import logging
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from django.utils.http import http_date
+
+from community.engagement import CommunityEngagementLog
+from community.models import Post
+from notifications.models import Notification
+from utils.counter_buffer import CounterBuffer, _MemoryStore
+from utils.executor import BoundedThreadExecutor
+from utils.ingestion import IngestionPipeline
+from utils.jobs import claim_jobs, enqueue, purge_finished, run_pending
+from utils.log import JsonFormatter, SamplingFilter, lazy
+from utils.log_archive import archive_month, bounded, iter_archived
+from utils.models import ArchivedLogMonth, FooterContent, Job
+from utils.pubsub import LocalBroker, publish
+from utils.tiered_cache import TieredCache
+
+
+class CounterBufferTests(TestCase):
+    def setUp(self):
+        self.buffer = CounterBuffer()
+        User = get_user_model()
+        user = User.objects.create_user(username='buffered', email='buffered@e.com', password='pass')
+        self.posts = [Post.objects.create(author=user, content=f'p{i}', feed_visibility='public_global') for i in range(2)]
+
+    def test_increments_are_batched_into_one_update(self):
+        first, second = self.posts
+        for _ in range(3):
+            self.buffer.incr(Post, first.id, 'view_count', touch='last_activity_at')
+        self.buffer.incr(Post, second.id, 'view_count', touch='last_activity_at')
+
+        self.assertEqual(self.buffer.live_value(first, 'view_count', touch='last_activity_at'), 3)
+        first.refresh_from_db()
+        self.assertEqual(first.view_count, 0)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.buffer.flush(), 2)
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.view_count, second.view_count), (3, 1))
+        self.assertEqual(self.buffer.pending(Post, first.id, 'view_count', touch='last_activity_at'), 0)
+
+    def test_flush_with_nothing_pending_is_free(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.buffer.flush(), 0)
+
+    def test_store_is_built_on_first_use(self):
+        factory = mock.Mock(wraps=_MemoryStore)
+        buffer = CounterBuffer(store_factory=factory)
+        factory.assert_not_called()
+
+        buffer.incr(Post, self.posts[0].id, 'view_count')
+        buffer.incr(Post, self.posts[0].id, 'view_count')
+        factory.assert_called_once_with()
+        self.assertEqual(buffer.pending(Post, self.posts[0].id, 'view_count'), 2)
+
+
+@override_settings(INGEST_BACKGROUND_FLUSH=False)
+class IngestionPipelineTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username='ingest', email='ingest@e.com', password='pass')
+        self.post = Post.objects.create(author=self.user, content='p', feed_visibility='public_global')
+
+    def _log(self):
+        return CommunityEngagementLog(user=self.user, action_type='view_post', post=self.post)
+
+    def test_rows_are_written_in_one_bulk_insert_per_batch(self):
+        pipeline = IngestionPipeline(capacity=100, batch_size=5)
+        for _ in range(4):
+            pipeline.submit(self._log())
+        self.assertEqual(CommunityEngagementLog.objects.filter(action_type='view_post').count(), 0)
+
+        # The fifth row fills the batch and triggers the write
+        pipeline.submit(self._log())
+        self.assertEqual(CommunityEngagementLog.objects.filter(action_type='view_post').count(), 5)
+        self.assertEqual(pipeline.stats()['buffered'], 0)
+
+    def test_full_buffer_drops_rows_instead_of_blocking(self):
+        pipeline = IngestionPipeline(capacity=2, batch_size=10, block_timeout=0)
+        results = [pipeline.submit(self._log()) for _ in range(3)]
+        self.assertEqual(results, [True, True, False])
+        self.assertEqual(pipeline.stats()['dropped'], 1)
+
+    def test_callbacks_receive_saved_rows(self):
+        pipeline = IngestionPipeline(capacity=10, batch_size=10)
+        saved = []
+        pipeline.submit(self._log(), on_saved=saved.append)
+        self.assertEqual(pipeline.flush(), 1)
+        self.assertEqual(len(saved), 1)
+        self.assertIsNotNone(saved[0].pk)
+
+    def test_row_by_row_retry_does_not_duplicate_bulk_inserted_rows(self):
+        pipeline = IngestionPipeline(capacity=10, batch_size=10)
+        flaky = self._log()
+        real_save = flaky.save
+        attempts = []
+
+        def save(*args, **kwargs):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise IntegrityError('boom')
+            return real_save(*args, **kwargs)
+
+        flaky.save = save
+        pipeline.submit(self._log())
+        pipeline.submit(self._log())
+        pipeline.submit(flaky, on_saved=lambda log: None)
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert',
+                               new_callable=mock.PropertyMock, return_value=False):
+            self.assertEqual(pipeline.flush(), 3)
+        self.assertEqual(CommunityEngagementLog.objects.filter(action_type='view_post').count(), 3)
+
+
+class BoundedThreadExecutorTests(SimpleTestCase):
+    def test_tasks_run_on_a_fixed_pool(self):
+        executor = BoundedThreadExecutor(workers=2, queue_size=50)
+        names = set()
+        for _ in range(20):
+            executor.submit(lambda: names.add(threading.current_thread().name))
+        executor.shutdown(timeout=5)
+        stats = executor.stats()
+        self.assertEqual(stats['completed'], 20)
+        self.assertEqual(names, {'task-executor'})
+        self.assertLessEqual(stats['workers'], 2)
+
+    def test_full_queue_runs_task_in_caller(self):
+        executor = BoundedThreadExecutor(workers=1, queue_size=1)
+        release = threading.Event()
+        executor.submit(release.wait, 5)  # occupies the only worker
+        time.sleep(0.1)
+        executor.submit(lambda: None)  # fills the queue
+        caller = threading.current_thread().name
+        ran_in = []
+        self.assertFalse(executor.submit(lambda: ran_in.append(threading.current_thread().name)))
+        self.assertEqual(ran_in, [caller])
+        release.set()
+        executor.shutdown(timeout=5)
+        self.assertEqual(executor.stats()['ran_inline'], 1)
+
+    def test_slow_task_is_timed_out_and_worker_replaced(self):
+        executor = BoundedThreadExecutor(workers=1, queue_size=10, task_timeout=0.2)
+        release = threading.Event()
+        done = threading.Event()
+        executor.submit(release.wait, 5)
+        executor.submit(done.set)
+        self.assertTrue(done.wait(3))
+        self.assertEqual(executor.stats()['timed_out'], 1)
+        release.set()
+        executor.shutdown(timeout=5)
+
+
+JOB_CALLS = []
+
+
+def record_job(value):
+    JOB_CALLS.append(value)
+
+
+def failing_job():
+    raise RuntimeError('boom')
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        JOB_CALLS.clear()
+
+    def test_jobs_run_by_priority_then_age(self):
+        enqueue(record_job, 'low')
+        enqueue(record_job, 'high', priority=5)
+        enqueue(record_job, 'later', delay=3600)
+        self.assertEqual(run_pending(), 2)
+        self.assertEqual(JOB_CALLS, ['high', 'low'])
+        self.assertEqual(Job.objects.filter(status=Job.STATUS_DONE).count(), 2)
+        self.assertEqual(Job.objects.get(args=['later']).status, Job.STATUS_QUEUED)
+
+    def test_claimed_job_is_not_claimed_twice(self):
+        enqueue(record_job, 'once')
+        self.assertEqual(len(claim_jobs('a')), 1)
+        self.assertEqual(claim_jobs('b'), [])
+
+    def test_failures_back_off_then_give_up(self):
+        job = enqueue(failing_job, max_attempts=2)
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_QUEUED, 1))
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('RuntimeError', job.last_error)
+
+        Job.objects.filter(id=job.id).update(run_at=timezone.now())
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_FAILED, 2))
+
+    def test_finished_jobs_are_purged_after_retention(self):
+        enqueue(record_job, 'old')
+        enqueue(record_job, 'new')
+        run_pending()
+        Job.objects.filter(args=['old']).update(finished_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(purge_finished(), 1)
+        self.assertEqual(list(Job.objects.values_list('args', flat=True)), [['new']])
+
+    def test_runworker_burst_drains_the_queue(self):
+        for value in range(3):
+            enqueue(record_job, value)
+        call_command('runworker', '--burst', '--concurrency', '1', stdout=StringIO())
+        self.assertEqual(sorted(JOB_CALLS), [0, 1, 2])
+
+
+class LogArchiveTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username='archived', email='archived@e.com', password='pass')
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.old = timezone.now() - timedelta(days=100)
+        for action in ('like_post', 'comment_post'):
+            log = CommunityEngagementLog.objects.create(user=self.user, action_type=action)
+            CommunityEngagementLog.objects.filter(pk=log.pk).update(created_at=self.old)
+        self.recent = CommunityEngagementLog.objects.create(user=self.user, action_type='like_post')
+
+    def test_month_is_moved_to_an_archive_file(self):
+        record = archive_month(CommunityEngagementLog, self.old, directory=self.directory)
+
+        self.assertEqual(record.rows, 2)
+        self.assertEqual(list(CommunityEngagementLog.objects.values_list('pk', flat=True)), [self.recent.pk])
+        archived = list(iter_archived(CommunityEngagementLog, self.old - timedelta(days=1)))
+        self.assertEqual(sorted(row['action_type'] for row in archived), ['comment_post', 'like_post'])
+
+        # Re-running only finishes the deletes
+        self.assertEqual(archive_month(CommunityEngagementLog, self.old, directory=self.directory), record)
+        self.assertEqual(ArchivedLogMonth.objects.count(), 1)
+
+    def test_bounded_queries_skip_archived_months(self):
+        start = self.old - timedelta(days=1)
+        self.assertEqual(bounded(CommunityEngagementLog, start).count(), 3)
+
+        archive_month(CommunityEngagementLog, self.old, directory=self.directory)
+        with self.assertNumQueries(1):
+            self.assertEqual(bounded(CommunityEngagementLog, start, self.old).count(), 0)
+        self.assertEqual(bounded(CommunityEngagementLog, start).count(), 1)
+
+    def test_months_are_archived_oldest_first(self):
+        older = CommunityEngagementLog.objects.create(user=self.user, action_type='like_post')
+        CommunityEngagementLog.objects.filter(pk=older.pk).update(created_at=self.old - timedelta(days=40))
+        with self.assertRaises(ValueError):
+            archive_month(CommunityEngagementLog, self.old, directory=self.directory)
+
+        archive_month(CommunityEngagementLog, self.old - timedelta(days=40), directory=self.directory)
+        self.assertEqual(archive_month(CommunityEngagementLog, self.old, directory=self.directory).rows, 2)
+
+    def test_community_stats_report_archived_months_left_out(self):
+        archive_month(CommunityEngagementLog, self.old, directory=self.directory)
+        self.client.force_login(self.user)
+        data = self.client.get('/api/community/engagement/analytics/community_stats/', {'days': 365}).json()
+        self.assertEqual(data['total_engagements'], 1)
+        self.assertTrue(data['range_truncated'])
+
+        data = self.client.get('/api/community/engagement/analytics/community_stats/', {'days': 1}).json()
+        self.assertFalse(data['range_truncated'])
+
+    def test_current_month_is_never_archived(self):
+        with self.assertRaises(ValueError):
+            archive_month(CommunityEngagementLog, timezone.now(), directory=self.directory)
+
+
+class ConditionalGetTests(TestCase):
+    def test_unchanged_content_is_answered_with_304(self):
+        FooterContent.objects.create(company_name='NAG')
+        response = self.client.get('/api/utils/footer/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Cache-Control'].startswith('public'))
+        etag = response['ETag']
+
+        response = self.client.get('/api/utils/footer/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        FooterContent.objects.update(company_name='New Africa Group', updated_at=timezone.now() + timedelta(seconds=1))
+        response = self.client.get('/api/utils/footer/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['company_name'], 'New Africa Group')
+
+    def test_lists_are_not_validated_by_date_alone(self):
+        older = FooterContent.objects.create(company_name='Old')
+        FooterContent.objects.create(company_name='NAG')
+        footer = FooterContent.objects.latest('updated_at')
+        response = self.client.get('/api/utils/footer/')
+        etag = response['ETag']
+        self.assertNotIn('Last-Modified', response)
+
+        # Deleting a row leaves the latest updated_at where it was
+        older.delete()
+        since = http_date(footer.updated_at.timestamp() + 1)
+        self.assertEqual(self.client.get('/api/utils/footer/', HTTP_IF_MODIFIED_SINCE=since).status_code, 200)
+        self.assertEqual(self.client.get('/api/utils/footer/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_unread_count_changes_with_read_flags(self):
+        user = get_user_model().objects.create_user(username='bell', email='bell@e.com', password='pass')
+        notification = Notification.objects.create(user=user, category='system', title='t', message='m')
+        url = f'/api/notifications/unread_count/?user_id={user.id}'
+        response = self.client.get(url)
+        self.assertEqual(response.json(), {'count': 1})
+        self.assertIn('Authorization', response['Vary'])
+        etag = response['ETag']
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Notification.objects.filter(pk=notification.pk).update(read=True)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'count': 0})
+
+
+class EventStreamTests(SimpleTestCase):
+    async def test_broker_delivers_messages_published_from_other_threads(self):
+        broker = LocalBroker()
+        subscription = broker.subscribe(['feed'])
+        thread = threading.Thread(target=broker.publish, args=('feed', {'type': 'post.created', 'id': 1}))
+        thread.start()
+        thread.join()
+
+        self.assertEqual(await subscription.get(timeout=1), ('feed', {'type': 'post.created', 'id': 1}))
+        self.assertIsNone(await subscription.get(timeout=0.01))
+        subscription.close()
+        self.assertEqual(broker.subscriber_count(), 0)
+
+    async def test_slow_subscribers_keep_the_latest_messages(self):
+        subscription = LocalBroker().subscribe(['campaigns'], maxsize=2)
+        for i in range(3):
+            subscription.deliver('campaigns', {'type': 'campaign.metrics', 'n': i})
+        await asyncio.sleep(0)
+        self.assertEqual(subscription.dropped, 1)
+        self.assertEqual((await subscription.get(timeout=1))[1]['n'], 1)
+
+    async def test_stream_pushes_published_events(self):
+        response = await AsyncClient().get('/api/stream/', {'channels': 'feed'})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = response.streaming_content.__aiter__()
+        self.assertTrue((await chunks.__anext__()).startswith(b'retry:'))
+
+        publish('feed', {'type': 'post.created', 'id': 7})
+        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=2)
+        self.assertEqual(chunk, b'event: post.created\ndata: {"type": "post.created", "id": 7}\n\n')
+        await chunks.aclose()
+
+
+class TieredCacheTests(SimpleTestCase):
+    def make_cache(self, location=''):
+        return TieredCache(location, {'OPTIONS': {
+            'NAMESPACES': {
+                'recommended_campaigns': {'timeout': 600},
+                'feedcache:generation': {'local_timeout': 0},
+            },
+            'RETRY_INTERVAL': 60,
+        }})
+
+    def test_namespaces_and_their_timeouts(self):
+        cache = self.make_cache()
+        self.assertEqual(cache.namespace('feedcache:generation'), 'feedcache:generation')
+        self.assertEqual(cache.namespace('feedcache:response:1:2:anon:abc'), 'feedcache')
+        self.assertEqual(cache.namespace('active_campaigns_metrics'), 'active_campaigns_metrics')
+        self.assertEqual(cache._timeout('recommended_campaigns:1:5', DEFAULT_TIMEOUT), 600)
+        self.assertEqual(cache._local_timeout('recommended_campaigns:1:5', 600), 30)
+        self.assertEqual(cache._local_timeout('feedcache:generation', None), 0)
+
+    def test_falls_back_to_the_local_tier_when_redis_is_unreachable(self):
+        cache = self.make_cache('redis://127.0.0.1:1/0')
+        with self.assertLogs('utils.tiered_cache', 'WARNING'):
+            cache.set('recommended_campaigns:1:5', [1, 2])
+        self.assertIsNone(cache._redis())
+
+        self.assertEqual(cache.get('recommended_campaigns:1:5'), [1, 2])
+        self.assertIsNone(cache.get('recommended_campaigns:2:5'))
+        self.assertTrue(cache.add('feedcache:generation', 1))
+        self.assertEqual(cache.incr('feedcache:generation'), 2)
+        self.assertEqual(cache.stats()['recommended_campaigns'], {
+            'l1_hits': 1, 'l2_hits': 0, 'misses': 1, 'hit_ratio': 0.5,
+        })
+
+
+class LoggingTests(SimpleTestCase):
+    def record(self, name='community.views', level=logging.INFO, **extra):
+        record = logging.LogRecord(name, level, __file__, 1, 'posts=%s', (3,), None)
+        record.__dict__.update(extra)
+        return record
+
+    def test_sampling_uses_most_specific_rate(self):
+        sampler = SamplingFilter({'community': 1.0, 'community.views': 0})
+        self.assertFalse(sampler.filter(self.record()))
+        self.assertTrue(sampler.filter(self.record(level=logging.WARNING)))
+        self.assertTrue(sampler.filter(self.record(name='community.signals')))
+
+    def test_lazy_argument_is_not_evaluated_below_level(self):
+        calls = []
+        logger = logging.getLogger('utils.tests.lazy')
+        logger.setLevel(logging.INFO)
+        logger.debug('count=%s', lazy(calls.append, 1))
+        self.assertEqual(calls, [])
+        with self.assertLogs(logger, logging.INFO) as logs:
+            logger.info('count=%s', lazy(len, [1, 2]))
+        self.assertEqual(logs.records[0].getMessage(), 'count=2')
+
+    def test_json_formatter_includes_extra_fields(self):
+        payload = json.loads(JsonFormatter().format(self.record(status=200)))
+        self.assertEqual(payload['message'], 'posts=3')
+        self.assertEqual(payload['logger'], 'community.views')
+        self.assertEqual(payload['status'], 200)
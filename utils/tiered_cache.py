@@ -0,0 +1,445 @@
+"""
+Two-tier cache backend: a small in-process LRU in front of Redis.
+
+Every gunicorn worker keeps recently read values in its own
+``LocMemCache`` (L1) and shares everything through Redis (L2, via
+``django-redis``). Writes go to Redis first; the key is then dropped from the
+other workers' L1 through a Redis pub/sub message, so a value changed in one
+worker is not served from another worker's L1 for longer than it takes to
+deliver that message. ``add`` and ``incr`` run against Redis, so locks and
+counters stay atomic across workers.
+
+Configuration::
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'utils.tiered_cache.TieredCache',
+            'LOCATION': os.environ.get('REDIS_URL', ''),
+            'OPTIONS': {
+                'L1_MAX_ENTRIES': 2000,
+                'L1_TIMEOUT': 30,
+                'NAMESPACES': {
+                    'recommended_campaigns': {'timeout': 1800, 'local_timeout': 120},
+                    'feedcache:generation': {'local_timeout': 0},
+                },
+            },
+        }
+    }
+
+A key's namespace is the longest configured prefix it starts with (followed by
+``:``), else the part before its first ``:``. ``timeout`` replaces the default
+timeout for keys set without one; ``local_timeout`` caps how long a worker
+keeps its L1 copy (``L1_TIMEOUT`` otherwise; 0 keeps the namespace out of L1).
+
+Without a ``LOCATION``, or while Redis is unreachable, the backend runs on L1
+alone and retries Redis every ``RETRY_INTERVAL`` seconds (default 30). A worker
+reconnecting to Redis empties its L1, since it may have missed invalidations.
+
+Hits and misses are counted per namespace and tier. ``stats()`` returns the
+counts of the current process; with Redis they are also added to a shared
+hash every ``STATS_INTERVAL`` seconds (default 60), which
+``manage.py cache_stats`` reports.
+"""
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+TIERS = ('l1_hits', 'l2_hits', 'misses')
+
+
+class _ProcessState:
+    """State shared by the per-thread instances of one cache in a process."""
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self.down_until = 0.0
+        self.listener = None
+        self.listener_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.stats = Counter()
+        self.unflushed = Counter()
+        self.stats_flushed_at = time.monotonic()
+
+
+# Django creates a cache instance per thread; like LocMemCache they share
+# their in-process data, keyed by location
+_states = {}
+_states_lock = threading.Lock()
+
+
+class TieredCache(BaseCache):
+    def __init__(self, server, params):
+        super().__init__(params)
+        options = dict(params.get('OPTIONS') or {})
+        self.local_timeout = options.pop('L1_TIMEOUT', 30)
+        self.namespaces = options.pop('NAMESPACES', {})
+        self._prefixes = sorted(self.namespaces, key=len, reverse=True)
+        self.retry_interval = options.pop('RETRY_INTERVAL', 30)
+        self.stats_interval = options.pop('STATS_INTERVAL', 60)
+        self.channel = options.pop('INVALIDATION_CHANNEL', 'cache:invalidate')
+        self.stats_key = options.pop('STATS_KEY', 'cache:stats')
+
+        key_params = {name: params[name] for name in ('KEY_PREFIX', 'VERSION', 'KEY_FUNCTION') if name in params}
+        name = f"{server}|{params.get('KEY_PREFIX', '')}"
+        with _states_lock:
+            self._state = _states.setdefault(name, _ProcessState())
+        self._local = LocMemCache(f'tiered:{name}', dict(
+            key_params,
+            TIMEOUT=params.get('TIMEOUT', 300),
+            OPTIONS={'MAX_ENTRIES': options.pop('L1_MAX_ENTRIES', 1000), 'CULL_FREQUENCY': 3},
+        ))
+
+        self._remote = None
+        if server:
+            from django_redis.cache import RedisCache
+
+            redis_options = {
+                'SOCKET_CONNECT_TIMEOUT': 1,
+                'SOCKET_TIMEOUT': 1,
+                **options,
+            }
+            self._remote = RedisCache(server, dict(key_params, TIMEOUT=params.get('TIMEOUT', 300), OPTIONS=redis_options))
+
+    # ------------------------------------------------------------------
+    # Namespaces
+    # ------------------------------------------------------------------
+    def namespace(self, key):
+        for prefix in self._prefixes:
+            if key == prefix or key.startswith(prefix + ':'):
+                return prefix
+        return key.split(':', 1)[0]
+
+    def _config(self, key):
+        return self.namespaces.get(self.namespace(key), {})
+
+    def _timeout(self, key, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            return self._config(key).get('timeout', DEFAULT_TIMEOUT)
+        return timeout
+
+    def _local_timeout(self, key, timeout):
+        """L1 lifetime for ``key`` stored for ``timeout`` seconds in Redis."""
+        local = self._config(key).get('local_timeout', self.local_timeout)
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return local
+        return min(local, timeout)
+
+    def _read_timeout(self, key):
+        """L1 lifetime for a value of ``key`` read back from Redis."""
+        return self._local_timeout(key, self._timeout(key, DEFAULT_TIMEOUT))
+
+    # ------------------------------------------------------------------
+    # Redis availability and invalidation
+    # ------------------------------------------------------------------
+    def _redis(self):
+        """The Redis tier, or None while running on L1 alone."""
+        if self._remote is None:
+            return None
+        if self._state.down_until:
+            if time.monotonic() < self._state.down_until:
+                return None
+            try:
+                self._client().ping()
+            except Exception as exc:
+                self._failed(exc)
+                return None
+            logger.info('Redis cache reachable again')
+            self._state.down_until = 0.0
+            # Invalidations published while Redis was down never reached us
+            self._local.clear()
+        self._ensure_listener()
+        return self._remote
+
+    def _failed(self, exc):
+        if not self._state.down_until:
+            logger.warning('Redis cache unreachable, using the in-process cache only: %s', exc)
+        self._state.down_until = time.monotonic() + self.retry_interval
+
+    def _client(self):
+        return self._remote.client.get_client(write=True)
+
+    def _invalidate_others(self, keys, version=None, clear=False):
+        try:
+            message = {'origin': self._state.origin, 'keys': list(keys), 'version': version, 'clear': clear}
+            self._client().publish(self.channel, json.dumps(message))
+        except Exception as exc:
+            self._failed(exc)
+
+    def _ensure_listener(self):
+        if self._state.listener is not None:
+            return
+        with self._state.listener_lock:
+            if self._state.listener is None:
+                self._state.listener = threading.Thread(target=self._listen, name='cache-invalidation', daemon=True)
+                self._state.listener.start()
+
+    def _listen(self):
+        missed = False
+        while True:
+            pubsub = None
+            try:
+                pubsub = self._client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                if missed:
+                    # Invalidations sent while disconnected are lost
+                    self._local.clear()
+                    missed = False
+                while True:
+                    item = pubsub.get_message(timeout=1.0)
+                    if not item:
+                        continue
+                    message = json.loads(item['data'])
+                    if message['origin'] == self._state.origin:
+                        continue
+                    if message['clear']:
+                        self._local.clear()
+                    else:
+                        self._local.delete_many(message['keys'], version=message['version'])
+            except Exception as exc:
+                logger.warning('Cache invalidation listener lost Redis (%s); reconnecting', exc)
+                missed = True
+                time.sleep(self.retry_interval)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+    def _record(self, key, tier, count=1):
+        name = f'{self.namespace(key)}:{tier}'
+        with self._state.stats_lock:
+            self._state.stats[name] += count
+            self._state.unflushed[name] += count
+            due = time.monotonic() - self._state.stats_flushed_at >= self.stats_interval
+            if due:
+                pending, self._state.unflushed = self._state.unflushed, Counter()
+                self._state.stats_flushed_at = time.monotonic()
+        if due:
+            self._flush_stats(pending)
+
+    def _flush_stats(self, pending):
+        if not pending or self._redis() is None:
+            return
+        try:
+            pipe = self._client().pipeline(transaction=False)
+            for name, count in pending.items():
+                pipe.hincrby(self.stats_key, name, count)
+            pipe.execute()
+        except Exception as exc:
+            self._failed(exc)
+
+    @staticmethod
+    def _summarize(counts):
+        summary = {}
+        for name, count in counts.items():
+            namespace, tier = name.rsplit(':', 1)
+            summary.setdefault(namespace, dict.fromkeys(TIERS, 0))[tier] += int(count)
+        for row in summary.values():
+            lookups = sum(row[tier] for tier in TIERS)
+            row['hit_ratio'] = round((row['l1_hits'] + row['l2_hits']) / lookups, 3) if lookups else None
+        return summary
+
+    def stats(self):
+        """{namespace: {'l1_hits', 'l2_hits', 'misses', 'hit_ratio'}} for this process."""
+        with self._state.stats_lock:
+            return self._summarize(self._state.stats)
+
+    def shared_stats(self):
+        """Counts flushed by every worker, or None without Redis."""
+        if self._redis() is None:
+            return None
+        try:
+            counts = self._client().hgetall(self.stats_key)
+        except Exception as exc:
+            self._failed(exc)
+            return None
+        return self._summarize({name.decode(): value for name, value in counts.items()})
+
+    def reset_shared_stats(self):
+        if self._redis() is not None:
+            try:
+                self._client().delete(self.stats_key)
+            except Exception as exc:
+                self._failed(exc)
+
+    # ------------------------------------------------------------------
+    # Cache API
+    # ------------------------------------------------------------------
+    def get(self, key, default=None, version=None):
+        remote = self._redis()
+        cache_locally = remote is None or self._read_timeout(key) > 0
+        if cache_locally:
+            value = self._local.get(key, _MISSING, version=version)
+            if value is not _MISSING:
+                self._record(key, 'l1_hits')
+                return value
+        if remote is not None:
+            try:
+                value = remote.get(key, _MISSING, version=version)
+            except Exception as exc:
+                self._failed(exc)
+                value = _MISSING
+            if value is not _MISSING:
+                self._record(key, 'l2_hits')
+                if cache_locally:
+                    self._local.set(key, value, self._read_timeout(key), version=version)
+                return value
+        self._record(key, 'misses')
+        return default
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        remote = self._redis()
+        found = {}
+        local_keys = [k for k in keys if remote is None or self._read_timeout(k) > 0]
+        if local_keys:
+            found = self._local.get_many(local_keys, version=version)
+            for key in found:
+                self._record(key, 'l1_hits')
+        pending = [k for k in keys if k not in found]
+        if pending and remote is not None:
+            try:
+                fetched = remote.get_many(pending, version=version)
+            except Exception as exc:
+                self._failed(exc)
+                fetched = {}
+            for key, value in fetched.items():
+                self._record(key, 'l2_hits')
+                local = self._read_timeout(key)
+                if local > 0:
+                    self._local.set(key, value, local, version=version)
+            found.update(fetched)
+        for key in keys:
+            if key not in found:
+                self._record(key, 'misses')
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(key, timeout)
+        remote = self._redis()
+        if remote is not None:
+            try:
+                remote.set(key, value, timeout, version=version)
+            except Exception as exc:
+                self._failed(exc)
+            else:
+                self._invalidate_others([key], version)
+                local = self._local_timeout(key, timeout)
+                if local > 0:
+                    self._local.set(key, value, local, version=version)
+                else:
+                    self._local.delete(key, version=version)
+                return
+        self._local.set(key, value, timeout, version=version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        for key, value in data.items():
+            self.set(key, value, timeout, version=version)
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(key, timeout)
+        remote = self._redis()
+        if remote is not None:
+            try:
+                added = remote.add(key, value, timeout, version=version)
+            except Exception as exc:
+                self._failed(exc)
+            else:
+                if added:
+                    local = self._local_timeout(key, timeout)
+                    if local > 0:
+                        self._local.set(key, value, local, version=version)
+                return added
+        return self._local.add(key, value, timeout, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(key, timeout)
+        remote = self._redis()
+        if remote is not None:
+            try:
+                return remote.touch(key, timeout, version=version)
+            except Exception as exc:
+                self._failed(exc)
+        return self._local.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        deleted = self._local.delete(key, version=version)
+        remote = self._redis()
+        if remote is not None:
+            try:
+                deleted = bool(remote.delete(key, version=version))
+            except Exception as exc:
+                self._failed(exc)
+            else:
+                self._invalidate_others([key], version)
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        if not keys:
+            return
+        self._local.delete_many(keys, version=version)
+        remote = self._redis()
+        if remote is not None:
+            try:
+                remote.delete_many(keys, version=version)
+            except Exception as exc:
+                self._failed(exc)
+            else:
+                self._invalidate_others(keys, version)
+
+    def has_key(self, key, version=None):
+        remote = self._redis()
+        if remote is not None:
+            try:
+                return remote.has_key(key, version=version)
+            except Exception as exc:
+                self._failed(exc)
+        return self._local.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        remote = self._redis()
+        if remote is not None:
+            try:
+                value = remote.incr(key, delta, version=version)
+            except ValueError:
+                raise
+            except Exception as exc:
+                self._failed(exc)
+            else:
+                self._local.delete(key, version=version)
+                self._invalidate_others([key], version)
+                return value
+        return self._local.incr(key, delta, version=version)
+
+    def clear(self):
+        self._local.clear()
+        remote = self._redis()
+        if remote is not None:
+            try:
+                remote.clear()
+            except Exception as exc:
+                self._failed(exc)
+            else:
+                self._invalidate_others([], clear=True)
+
+    def close(self, **kwargs):
+        if self._remote is not None:
+            self._remote.close(**kwargs)
@@ -7,6 +7,7 @@ from .models import (
 # Import only non-contact related serializers to avoid circular imports
 from .serializers import FAQSerializer, CareerSerializer, ContactMessageSerializer, AboutHeroSerializer
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from .conditional import ConditionalGetMixin, PUBLIC_CACHE_CONTROL
 
 
 class AboutHeroViewSet(viewsets.ReadOnlyModelViewSet):
@@ -127,9 +128,10 @@ class ContactMessageViewSet(viewsets.ModelViewSet):
 		return self.permission_denied(request, message='Retrieve is restricted.')
 
 
-class FooterContentViewSet(viewsets.ReadOnlyModelViewSet):
+class FooterContentViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """Return the latest published FooterContent instance as a single object."""
     permission_classes = [AllowAny]
+    cache_control = PUBLIC_CACHE_CONTROL
 
     def get_queryset(self):
         from .models import FooterContent